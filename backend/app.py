@@ -16,14 +16,21 @@ load_dotenv()
 # Register PyMySQL as MySQLdb for SQLAlchemy compatibility
 pymysql.install_as_MySQLdb()
 
-def create_app(config_name=None):
-    """Application factory pattern"""
+def create_app(config_name=None, init_database=None):
+    """
+    Application factory pattern
+    init_database: start database initialization now (default: unless running under the flask CLI)
+    """
     app = Flask(__name__)
     
     # Load configuration
     config_name = config_name or os.environ.get('FLASK_ENV', 'default')
     app.config.from_object(config[config_name])
     
+    # Fast JSON (orjson when installed) with the same output as Flask's default provider
+    from utils.json_provider import json_provider_class
+    app.json = json_provider_class(app.config.get('JSON_PROVIDER', 'auto'))(app)
+    
     # Initialize extensions
     CORS(app, resources={r"/api/*": {
         "origins": "*",
@@ -32,6 +39,8 @@ def create_app(config_name=None):
         "supports_credentials": True
     }}, supports_credentials=True)
     jwt = JWTManager(app)
+    from utils.auth import register_token_checks
+    register_token_checks(jwt)
     
     # Handle OPTIONS requests for CORS preflight (before JWT validation)
     # This must run before JWT validation to prevent redirects on preflight requests
@@ -76,7 +85,8 @@ def create_app(config_name=None):
                 'quiz': '/api/quiz/list',
                 'resources': '/api/resources',
                 'notifications': '/api/notifications',
-                'leaderboard': '/api/leaderboard'
+                'leaderboard': '/api/leaderboard',
+                'stream': '/api/stream'
             }
         }), 200
     
@@ -93,6 +103,7 @@ def create_app(config_name=None):
     from routes.chatbot import chatbot_bp
     from routes.posts import posts_bp
     from routes.interview import interview_bp
+    from routes.stream import stream_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(student_bp, url_prefix='/api/student')
@@ -106,67 +117,92 @@ def create_app(config_name=None):
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
     app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
     app.register_blueprint(interview_bp, url_prefix='/api/interview')
+    app.register_blueprint(stream_bp, url_prefix='/api/stream')
+    
+    # Maintenance CLI commands
+    from commands import register_commands
+    register_commands(app)
     
     # Initialize database with error handling
     from models import db
     db.init_app(app)
     
-    # Initialize database lazily (don't connect during build)
-    # This prevents Railway build failures when DATABASE_URL isn't available
-    initialized = False
+    # Per-request query counts/timings, slow-query log, N+1 warnings
+    from utils.query_stats import register_query_instrumentation
+    register_query_instrumentation(app)
+    
+    # Request latency, judge, external call and pool metrics for GET /metrics
+    from utils.metrics import register_metrics, render_metrics
+    register_metrics(app)
+    
+    # brotli/gzip for large responses
+    from utils.compression import register_compression
+    register_compression(app)
+    
+    # Auto-submit of quiz attempts whose time ran out (leader process only)
+    from utils.quiz_timers import register_quiz_timers
+    register_quiz_timers(app)
+    
+    # Initialize the database once in the background, off the request path. A failed
+    # connection never fails the import (keeps builds without DATABASE_URL working).
+    # Under the flask CLI maintenance commands run without it; the first request
+    # starts it if nothing else has.
+    from utils.startup import start_database_init, wait_until_ready, readiness
+    if init_database is None:
+        init_database = not os.environ.get('FLASK_RUN_FROM_CLI')
+    if init_database:
+        start_database_init(app)
     
-    def initialize_database():
-        """Initialize database - called on first request"""
-        nonlocal initialized
-        if initialized:
-            return
-        
-        with app.app_context():
-            try:
-                # Test database connection
-                with db.engine.connect() as conn:
-                    conn.close()
-                print("[OK] Database connection established successfully!")
-                
-                # Create all tables
-                db.create_all()
-                print("[OK] Database tables created/verified!")
-                
-                # Seed initial data (only once)
-                from seed_data import seed_initial_data
-                seed_initial_data()
-                print("[OK] Initial data seeded!")
-                
-                initialized = True
-            except Exception as e:
-                print(f"\n[ERROR] Database connection error: {str(e)}")
-                print("\nPlease ensure:")
-                print("1. MySQL server is running")
-                print("2. Database exists")
-                print("3. Connection credentials are correct")
-                print("4. DATABASE_URL environment variable is set\n")
-                # Don't fail - will retry on next request
-    
-    # Initialize on first request
     @app.before_request
-    def before_request():
-        initialize_database()
+    def wait_for_database():
+        from flask import request, jsonify
+        if request.path in ('/', '/ready', '/metrics'):
+            return
+        if not wait_until_ready(app, app.config['STARTUP_WAIT_SECONDS']):
+            return jsonify({'error': 'Service is starting, please retry'}), 503, {'Retry-After': '5'}
+    
+    @app.route('/ready', methods=['GET'])
+    def readiness_check():
+        """Readiness probe: 200 once the database is initialized and reachable"""
+        from flask import jsonify
+        ready, details = readiness(app)
+        return jsonify(details), 200 if ready else 503
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus scrape endpoint (bearer METRICS_TOKEN when configured)"""
+        from flask import request, jsonify
+        import hmac
+        token = app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
     
     return app
 
-# Create app instance for gunicorn/WSGI servers
-# This is used when running in production (Railway, Render, etc.)
-env = os.environ.get('FLASK_ENV', 'production')
-app = create_app(env)
+def __getattr__(name):
+    """
+    Build the app instance for gunicorn/WSGI servers (Railway, Render, etc.) on first access
+    of `app.app`, so importing create_app (run.py, CLI tooling) constructs nothing extra.
+    """
+    if name == 'app':
+        global app
+        app = create_app(os.environ.get('FLASK_ENV', 'production'))
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
     # Use production config in production, development in dev
     env = os.environ.get('FLASK_ENV', 'development')
-    app = create_app(env)
+    app = create_app(env, init_database=False)
     
     # Get port from environment variable (for Railway/Render) or default to 5000
     port = int(os.environ.get('PORT', 5000))
     debug = env == 'development'
     
+    # With the debug reloader only the serving child process initializes the database
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from utils.startup import start_database_init
+        start_database_init(app)
+    
     app.run(debug=debug, host='0.0.0.0', port=port)
-
@@ -0,0 +1,107 @@
+"""
+Flask CLI commands for maintenance tasks
+Run with: flask --app app <command>
+"""
+import click
+
+def register_commands(app):
+    """Attach maintenance commands to the app's CLI"""
+    
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create/upgrade tables and seed initial data (normally done at server startup)"""
+        from utils.startup import initialize_database
+        if not initialize_database(app):
+            raise click.ClickException('Database initialization failed')
+    
+    @app.cli.command('rebuild-student-stats')
+    @click.option('--user-id', 'user_ids', type=int, multiple=True, help='Only rebuild these users (repeatable)')
+    def rebuild_student_stats_command(user_ids):
+        """Backfill/repair the materialized per-student statistics"""
+        from utils.student_stats import rebuild_student_stats
+        count = rebuild_student_stats(list(user_ids) if user_ids else None)
+        click.echo(f'[OK] Rebuilt statistics for {count} user(s)')
+    
+    @app.cli.command('rebuild-tags')
+    def rebuild_tags_command():
+        """Backfill the normalized question tags and recompute tag counters"""
+        from utils.tags import rebuild_tags
+        count = rebuild_tags()
+        click.echo(f'[OK] Rebuilt {count} tag(s)')
+    
+    @app.cli.command('repair-notification-counters')
+    @click.option('--user-id', 'user_ids', type=int, multiple=True, help='Only repair these users (repeatable)')
+    def repair_notification_counters_command(user_ids):
+        """Recount the maintained unread-notification counters and fix any drift"""
+        from utils.notifications import repair_notification_counters
+        count = repair_notification_counters(list(user_ids) if user_ids else None)
+        click.echo(f'[OK] Repaired {count} notification counter(s)')
+    
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """EXPLAIN the hot queries and fail if any falls back to a full table scan"""
+        from utils.query_plans import check_query_plans
+        results = check_query_plans()
+        for result in results:
+            status = 'FULL SCAN' if result['full_scan'] else 'OK'
+            click.echo(f"[{status}] {result['name']} ({result['table']})")
+            for line in result['plan']:
+                click.echo(f'    {line}')
+        
+        regressions = [result for result in results if result['full_scan']]
+        if regressions:
+            raise click.ClickException(f'{len(regressions)} hot query(s) use a full table scan')
+        click.echo(f'[OK] All {len(results)} hot queries use an index')
+    
+    @app.cli.command('check-query-budgets')
+    def check_query_budgets_command():
+        """Request the hot GET endpoints and fail if any issues more queries than its budget"""
+        from utils.query_stats import check_query_budgets
+        results = check_query_budgets(app)
+        failures = 0
+        for result in results:
+            if result['count'] is None:
+                click.echo(f"[SKIP] {result['path']} (no active {result['role']} user)")
+                continue
+            over = result['count'] > result['budget']
+            failures += over
+            click.echo(f"[{'OVER' if over else 'OK'}] {result['path']} as {result['role']}: "
+                       f"{result['count']}/{result['budget']} queries (HTTP {result['status']})")
+            if over:
+                for statement, times in result['repeated']:
+                    click.echo(f'    {times}x {statement[:200]}')
+        
+        if failures:
+            raise click.ClickException(f'{failures} endpoint(s) exceed their query budget')
+        click.echo(f'[OK] All endpoints within their query budgets')
+    
+    @app.cli.command('benchmark-payloads')
+    @click.option('--runs', default=50, show_default=True, help='Serializations timed per payload')
+    def benchmark_payloads_command(runs):
+        """Time JSON serialization and measure compressed sizes of the largest real responses"""
+        from utils.json_provider import benchmark_payloads
+        results = benchmark_payloads(app, runs)
+        if not results:
+            raise click.ClickException('No data to benchmark (seed the database first)')
+        for result in results:
+            sizes = result['bytes']
+            orjson_ms = f"{result['orjson_ms']:.2f} ms" if result['orjson_ms'] is not None else 'not installed'
+            brotli_size = f"{sizes['br']} B" if sizes['br'] is not None else 'not installed'
+            click.echo(f"{result['name']} ({result['path']}, HTTP {result['status']})")
+            click.echo(f"    serialize: stdlib {result['stdlib_ms']:.2f} ms, orjson {orjson_ms}")
+            click.echo(f"    bytes: identity {sizes['identity']} B, gzip {sizes['gzip']} B, brotli {brotli_size}")
+    
+    @app.cli.command('benchmark-startup')
+    @click.option('--runs', default=5, show_default=True, help='Fresh interpreter starts to time')
+    def benchmark_startup_command(runs):
+        """Time cold starts: importing and building the app, then until /ready"""
+        from utils.startup import benchmark_startup
+        results = benchmark_startup(runs)
+        for result in results:
+            click.echo(
+                f"import {result['import_ms']:.0f} ms, create_app {result['create_app_ms']:.0f} ms, "
+                f"ready {result['ready_ms']:.0f} ms, heavy modules loaded: {', '.join(result['heavy_modules']) or 'none'}"
+            )
+        for key in ('import_ms', 'create_app_ms', 'ready_ms'):
+            values = sorted(result[key] for result in results)
+            click.echo(f'[OK] {key}: median {values[len(values) // 2]:.0f} ms, max {values[-1]:.0f} ms')
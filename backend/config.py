@@ -58,6 +58,8 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    TOKEN_REVOCATION_TTL = float(os.environ.get('TOKEN_REVOCATION_TTL', 5))  # Seconds between revocation list reloads
+    STARTUP_WAIT_SECONDS = float(os.environ.get('STARTUP_WAIT_SECONDS', 10))  # Max wait for database init before a 503
     
     # File upload settings
     UPLOAD_FOLDER = 'uploads'
@@ -72,6 +74,39 @@ class Config:
     # AI Chatbot settings (using OpenAI or similar)
     AI_API_KEY = os.environ.get('AI_API_KEY') or ''
     AI_API_URL = os.environ.get('AI_API_URL') or 'https://api.openai.com/v1/chat/completions'
+    
+    # Question/company catalog read-through cache (per worker process)
+    CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 512))  # Max cached entries
+    CATALOG_VERSION_TTL = float(os.environ.get('CATALOG_VERSION_TTL', 2))  # Seconds between shared version checks
+    BROADCAST_TOTALS_TTL = float(os.environ.get('BROADCAST_TOTALS_TTL', 2))  # Seconds between broadcast total reloads
+    
+    # Event stream (server-sent events)
+    PUBSUB_BACKEND = os.environ.get('PUBSUB_BACKEND', 'local')  # 'local' (one process) or 'database' (all workers)
+    PUBSUB_POLL_INTERVAL = float(os.environ.get('PUBSUB_POLL_INTERVAL', 1))  # Seconds between polls ('database')
+    STREAM_HEARTBEAT_SECONDS = float(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))
+    STREAM_MAX_SECONDS = float(os.environ.get('STREAM_MAX_SECONDS', 300))  # Clients reconnect after this
+    
+    # Quiz autosave
+    QUIZ_DRAFT_FLUSH_SECONDS = float(os.environ.get('QUIZ_DRAFT_FLUSH_SECONDS', 5))  # Max seconds a buffered draft waits for its database write
+    QUIZ_SUBMIT_GRACE_SECONDS = float(os.environ.get('QUIZ_SUBMIT_GRACE_SECONDS', 30))  # Saves/submits still accepted this long after a deadline
+    
+    # Quiz timers (auto-submit of expired attempts; one leader process does the work)
+    QUIZ_TIMERS_ENABLED = os.environ.get('QUIZ_TIMERS_ENABLED', 'true').lower() == 'true'
+    QUIZ_TIMER_LEASE_SECONDS = float(os.environ.get('QUIZ_TIMER_LEASE_SECONDS', 30))  # Leader lease; a dead leader is replaced after this
+    QUIZ_TIMER_RELOAD_SECONDS = float(os.environ.get('QUIZ_TIMER_RELOAD_SECONDS', 30))  # Seconds between reloads of upcoming deadlines
+    QUIZ_FINALIZE_BATCH = int(os.environ.get('QUIZ_FINALIZE_BATCH', 100))  # Attempts submitted per transaction
+    
+    # SQL instrumentation
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))  # Log statements slower than this (0 disables)
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))  # Warn when one statement repeats this often per request
+    QUERY_STATS_HEADERS = os.environ.get('QUERY_STATS_HEADERS', 'false').lower() == 'true'  # Server-Timing outside debug mode
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or ''  # Bearer token required by GET /metrics (empty: open)
+    
+    # Response encoding
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')  # 'auto' (orjson if installed), 'orjson' or 'default'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # Bytes; smaller responses are sent as is (0 disables)
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))  # 4 suits dynamic responses
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -81,8 +116,20 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
 
+class TestingConfig(Config):
+    """Test configuration (in-memory sqlite, no background quiz timers)"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    QUIZ_TIMERS_ENABLED = False
+    # Per-process caches never expire mid-test, so query counts are stable
+    TOKEN_REVOCATION_TTL = 3600
+    CATALOG_VERSION_TTL = 3600
+    BROADCAST_TOTALS_TTL = 3600
+
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
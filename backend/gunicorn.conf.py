@@ -0,0 +1,41 @@
+"""
+Gunicorn settings (read from the working directory; Procfile passes it explicitly)
+
+Most request time here is spent waiting rather than computing: on MySQL, on
+the AI API (an interview answer makes up to two 15-20 s calls), on local
+compilers or the remote compiler API, and on open event streams. A sync
+worker handles one request at a time, so a few slow interview answers used to
+leave nothing free for everyone else. Workers are threaded by default.
+
+Sizing (per instance):
+- requests in flight = WEB_CONCURRENCY workers x GUNICORN_THREADS threads
+- each worker's database pool (pool_size 10 + max_overflow 20 in config.py)
+  should be >= GUNICORN_THREADS; MySQL max_connections >= workers x 30
+- open event streams each hold a thread; with more than one worker,
+  PUBSUB_BACKEND defaults to database so every worker sees every event
+  (an explicit PUBSUB_BACKEND=local then logs a warning at startup)
+GUNICORN_WORKER_CLASS=gevent switches to cooperative workers (pip install
+gevent); GUNICORN_WORKER_CONNECTIONS then bounds requests per worker.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 200))
+
+# In-memory pub/sub only reaches clients of the worker that published the event
+if workers > 1:
+    os.environ.setdefault('PUBSUB_BACKEND', 'database')
+    if os.environ['PUBSUB_BACKEND'] == 'local':
+        print(f"[WARN] PUBSUB_BACKEND=local with {workers} workers: live updates only reach "
+              f"clients connected to the worker that published them")
+
+# Threaded/gevent workers keep heartbeating during slow requests; this only
+# catches a worker that is truly stuck
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
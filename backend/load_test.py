@@ -0,0 +1,100 @@
+"""
+Load test: do slow requests starve fast ones?
+
+Fires --slow concurrent requests that each block for --sleep seconds
+(POST /api/coding/execute running a sleeping Python program, the same kind
+of wait as a compiler or AI call) and, while they are in flight, times
+fast probe requests (GET /api/auth/me). With sync workers the probes queue
+behind the slow requests; with threaded or gevent workers they stay fast.
+
+Usage (against a running server):
+    python load_test.py --url http://localhost:5000 --slow 40 --sleep 3
+Exits non-zero if the probe p95 exceeds --max-probe-ms.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import sys
+import threading
+import time
+import requests
+
+def login(base_url, username, password):
+    response = requests.post(f'{base_url}/api/auth/login', json={'username': username, 'password': password}, timeout=30)
+    response.raise_for_status()
+    return {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+def slow_request(base_url, headers, sleep_seconds):
+    started = time.perf_counter()
+    try:
+        response = requests.post(f'{base_url}/api/coding/execute', headers=headers, timeout=120, json={
+            'language': 'python',
+            'code': f'import time\ntime.sleep({sleep_seconds})\nprint("done")'
+        })
+        ok = response.status_code == 200
+    except requests.RequestException:
+        ok = False
+    return ok, time.perf_counter() - started
+
+def probe(base_url, headers, stop, latencies, failures):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            response = requests.get(f'{base_url}/api/auth/me', headers=headers, timeout=60)
+            if response.status_code != 200:
+                failures.append(response.status_code)
+        except requests.RequestException as e:
+            failures.append(str(e))
+        latencies.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.1)
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--username', default='student1')
+    parser.add_argument('--password', default='student123')
+    parser.add_argument('--slow', type=int, default=40, help='concurrent slow requests')
+    parser.add_argument('--sleep', type=float, default=3.0, help='seconds each slow request blocks')
+    parser.add_argument('--probes', type=int, default=4, help='concurrent probe loops')
+    parser.add_argument('--max-probe-ms', type=float, default=1000.0, help='fail if probe p95 is above this')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    headers = login(base_url, args.username, args.password)
+
+    stop = threading.Event()
+    latencies, failures = [], []
+    probe_threads = [
+        threading.Thread(target=probe, args=(base_url, headers, stop, latencies, failures), daemon=True)
+        for _ in range(args.probes)
+    ]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.slow) as pool:
+        futures = [pool.submit(slow_request, base_url, headers, args.sleep) for _ in range(args.slow)]
+        time.sleep(0.2)
+        for thread in probe_threads:
+            thread.start()
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+    stop.set()
+    for thread in probe_threads:
+        thread.join()
+
+    slow_ok = sum(1 for ok, _ in results if ok)
+    slow_times = [elapsed for _, elapsed in results]
+    print(f'slow requests: {slow_ok}/{len(results)} ok, wall {wall:.1f} s '
+          f'(ideal {args.sleep:.1f} s), slowest {max(slow_times):.1f} s')
+    print(f'probes: {len(latencies)} requests, p50 {percentile(latencies, 0.5):.0f} ms, '
+          f'p95 {percentile(latencies, 0.95):.0f} ms, max {max(latencies or [0]):.0f} ms, {len(failures)} failed')
+
+    if percentile(latencies, 0.95) > args.max_probe_ms or failures:
+        print(f'[FAIL] fast requests were starved by slow ones (p95 > {args.max_probe_ms:.0f} ms or failures)')
+        sys.exit(1)
+    print('[OK] fast requests stayed fast while slow requests were in flight')
+
+if __name__ == '__main__':
+    main()
@@ -26,14 +26,20 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # 'student', 'faculty', 'admin'
     full_name = db.Column(db.String(100))
+    batch = db.Column(db.String(50), index=True)  # Cohort, e.g. graduating year or section
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
     # Relationships
     submissions = db.relationship('CodeSubmission', backref='user', lazy=True, cascade='all, delete-orphan')
     quiz_attempts = db.relationship('QuizAttempt', backref='user', lazy=True, cascade='all, delete-orphan')
+    quiz_drafts = db.relationship('QuizDraft', lazy=True, cascade='all, delete-orphan')
     resources = db.relationship('Resource', backref='user', lazy=True, cascade='all, delete-orphan')
     notifications = db.relationship('Notification', backref='user', lazy=True, cascade='all, delete-orphan')
+    broadcast_receipts = db.relationship('BroadcastReceipt', backref='user', lazy=True, cascade='all, delete-orphan')
+    notification_counter = db.relationship('NotificationCounter', backref='user', uselist=False, cascade='all, delete-orphan')
+    stats = db.relationship('StudentStats', backref='user', uselist=False, cascade='all, delete-orphan')
+    daily_activity = db.relationship('StudentDailyActivity', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password"""
@@ -51,6 +57,7 @@ class User(db.Model):
             'email': self.email,
             'role': self.role,
             'full_name': self.full_name,
+            'batch': self.batch,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'is_active': self.is_active
         }
@@ -89,7 +96,7 @@ class Question(db.Model):
     type = db.Column(db.String(20), nullable=False)  # 'coding', 'mcq', 'fill_blank'
     difficulty = db.Column(db.String(20))  # 'easy', 'medium', 'hard'
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'))
-    tags = db.Column(db.String(200))  # Comma-separated tags
+    tags = db.Column(db.String(200))  # Comma-separated tags (display copy of question_tags)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
@@ -110,12 +117,12 @@ class Question(db.Model):
     # Relationships
     submissions = db.relationship('CodeSubmission', backref='question', lazy=True)
     quiz_questions = db.relationship('QuizQuestion', backref='question', lazy=True)
+    tag_links = db.relationship('QuestionTag', backref='question', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        data = {
+    def _base_dict(self):
+        return {
             'id': self.id,
             'title': self.title,
-            'description': self.description,
             'type': self.type,
             'difficulty': self.difficulty,
             'company_id': self.company_id,
@@ -124,6 +131,23 @@ class Question(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'is_active': self.is_active
         }
+    
+    def to_summary_dict(self):
+        """List projection: skips the coding description, test cases and starter code"""
+        data = self._base_dict()
+        if self.type == 'mcq':
+            data['description'] = self.description
+            data['options'] = json.loads(self.options) if self.options else []
+            data['correct_answer'] = self.correct_answer
+            data['marks'] = self.marks if self.marks else 1
+        elif self.type == 'fill_blank':
+            data['description'] = self.description
+            data['blanks'] = json.loads(self.blanks) if self.blanks else []
+        return data
+    
+    def to_dict(self):
+        data = self._base_dict()
+        data['description'] = self.description
         
         if self.type == 'coding':
             data['test_cases'] = json.loads(self.test_cases) if self.test_cases else []
@@ -137,9 +161,45 @@ class Question(db.Model):
         
         return data
 
+class Tag(db.Model):
+    """Normalized question tag with batch-wide submission counters"""
+    __tablename__ = 'tags'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False, index=True)
+    total_attempts = db.Column(db.Integer, default=0, nullable=False)  # Code submissions to tagged questions
+    accepted_attempts = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    question_links = db.relationship('QuestionTag', backref='tag', lazy=True, cascade='all, delete-orphan')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'total_attempts': self.total_attempts,
+            'accepted_attempts': self.accepted_attempts
+        }
+
+class QuestionTag(db.Model):
+    """Many-to-many relationship between Question and Tag"""
+    __tablename__ = 'question_tags'
+    __table_args__ = (
+        db.Index('ix_question_tags_tag_question', 'tag_id', 'question_id'),
+    )
+    
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+
 class CodeSubmission(db.Model):
     """Code submission model for tracking student coding attempts"""
     __tablename__ = 'code_submissions'
+    __table_args__ = (
+        # Last submission for (user, question, language) and per-user history, newest first
+        db.Index('ix_code_submissions_user_question_language_submitted', 'user_id', 'question_id', 'language', 'submitted_at'),
+        db.Index('ix_code_submissions_user_submitted', 'user_id', 'submitted_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -169,6 +229,21 @@ class CodeSubmission(db.Model):
             'total_test_cases': self.total_test_cases,
             'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None
         }
+    
+    def to_summary_dict(self):
+        """List projection without the submitted code and per-test output"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'question_id': self.question_id,
+            'language': self.language,
+            'status': self.status,
+            'execution_time': self.execution_time,
+            'memory_used': self.memory_used,
+            'test_cases_passed': self.test_cases_passed,
+            'total_test_cases': self.total_test_cases,
+            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None
+        }
 
 class Quiz(db.Model):
     """Quiz model for creating assessments"""
@@ -229,6 +304,10 @@ class QuizQuestion(db.Model):
 class QuizAttempt(db.Model):
     """Quiz attempt model for tracking student quiz submissions"""
     __tablename__ = 'quiz_attempts'
+    __table_args__ = (
+        db.Index('ix_quiz_attempts_user_quiz_submitted', 'user_id', 'quiz_id', 'submitted_at'),
+        db.Index('ix_quiz_attempts_user_submitted', 'user_id', 'submitted_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -253,6 +332,30 @@ class QuizAttempt(db.Model):
             'time_taken_minutes': self.time_taken_minutes
         }
 
+class QuizDraft(db.Model):
+    """Autosaved answers of a quiz attempt in progress (deleted when the attempt is submitted)"""
+    __tablename__ = 'quiz_drafts'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'quiz_id', name='uq_quiz_drafts_user_quiz'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False, index=True)
+    answers = db.Column(db.Text, nullable=False)  # JSON string of answers
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    saved_at = db.Column(db.DateTime, nullable=False)  # When the server received these answers
+    deadline = db.Column(db.DateTime, index=True)  # started_at + duration, capped at the quiz's end_time
+    
+    def to_dict(self):
+        return {
+            'quiz_id': self.quiz_id,
+            'answers': json.loads(self.answers) if self.answers else {},
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'saved_at': self.saved_at.isoformat() if self.saved_at else None,
+            'deadline': self.deadline.isoformat() if self.deadline else None
+        }
+
 class InterviewSession(db.Model):
     """AI Interview Session model - Enhanced for TR/HR types"""
     __tablename__ = 'interview_sessions'
@@ -378,6 +481,9 @@ class JobDescriptionData(db.Model):
 class InterviewAnswer(db.Model):
     """Individual interview answer with evaluation"""
     __tablename__ = 'interview_answers'
+    __table_args__ = (
+        db.Index('ix_interview_answers_session_question', 'session_id', 'question_number'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('interview_sessions.id'), nullable=False)
@@ -505,6 +611,11 @@ class Resource(db.Model):
 class Notification(db.Model):
     """Notification model"""
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Unread lookups and per-user listings, newest first
+        db.Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -524,9 +635,72 @@ class Notification(db.Model):
             'type': self.type,
             'is_read': self.is_read,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'link': self.link
+            'link': self.link,
+            'broadcast': False
+        }
+
+class BroadcastNotification(db.Model):
+    """One notification addressed to every user of a role (optionally one batch), instead of a row per user"""
+    __tablename__ = 'broadcast_notifications'
+    __table_args__ = (
+        db.Index('ix_broadcast_notifications_role_created', 'target_role', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    target_role = db.Column(db.String(20), nullable=False)  # 'student', 'faculty', 'admin'
+    target_batch = db.Column(db.String(50))  # None = every batch
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    type = db.Column(db.String(20))  # 'quiz', 'question', 'resource', 'general'
+    link = db.Column(db.String(255))
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    receipts = db.relationship('BroadcastReceipt', backref='broadcast', lazy=True, cascade='all, delete-orphan')
+    
+    def to_dict(self, user_id=None, is_read=False):
+        """Serialized like a Notification for the given recipient"""
+        return {
+            'id': self.id,
+            'user_id': user_id,
+            'title': self.title,
+            'message': self.message,
+            'type': self.type,
+            'is_read': is_read,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'link': self.link,
+            'broadcast': True
         }
 
+class BroadcastReceipt(db.Model):
+    """Marks a broadcast notification as read by one user"""
+    __tablename__ = 'broadcast_receipts'
+    
+    broadcast_id = db.Column(db.Integer, db.ForeignKey('broadcast_notifications.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, index=True)
+    read_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class BroadcastAudience(db.Model):
+    """Running number of broadcasts sent to an audience (target_batch '' = every batch)"""
+    __tablename__ = 'broadcast_audiences'
+    
+    target_role = db.Column(db.String(20), primary_key=True)
+    target_batch = db.Column(db.String(50), primary_key=True, default='')
+    total = db.Column(db.Integer, default=0, nullable=False)
+
+class NotificationCounter(db.Model):
+    """
+    Materialized unread-notification count for a user
+    unread = personal_unread + (broadcasts sent to the user's audiences - broadcast_offset)
+    """
+    __tablename__ = 'notification_counters'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    personal_unread = db.Column(db.Integer, default=0, nullable=False)
+    # Audience broadcasts that don't count as unread: sent before the account existed, or already read
+    broadcast_offset = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Post(db.Model):
     """Post model for company-related posts (interview experiences, tips, etc.)"""
     __tablename__ = 'posts'
@@ -581,6 +755,9 @@ class Leaderboard(db.Model):
     rank = db.Column(db.Integer)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationships
+    user = db.relationship('User', backref=db.backref('leaderboard_entry', uselist=False, cascade='all, delete-orphan'))
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -596,3 +773,127 @@ class Leaderboard(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class StudentStats(db.Model):
+    """Per-user performance rollup, updated in the same transaction as the raw rows"""
+    __tablename__ = 'student_stats'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=False)
+    
+    # Coding submissions
+    total_submissions = db.Column(db.Integer, default=0, nullable=False)
+    accepted_submissions = db.Column(db.Integer, default=0, nullable=False)
+    code_practice_sum = db.Column(db.Float, default=0, nullable=False)  # Sum of per-submission test pass percentages
+    code_practice_count = db.Column(db.Integer, default=0, nullable=False)  # Submissions that had test cases
+    language_stats = db.Column(db.Text)  # JSON: {language: {total, accepted}}
+    difficulty_stats = db.Column(db.Text)  # JSON: {difficulty: {total, accepted}}
+    
+    # Quizzes
+    total_quizzes = db.Column(db.Integer, default=0, nullable=False)
+    quiz_score_sum = db.Column(db.Float, default=0, nullable=False)  # Sum of percentage scores
+    
+    # Completed AI interviews
+    total_interviews = db.Column(db.Integer, default=0, nullable=False)
+    interview_score_sum = db.Column(db.Float, default=0, nullable=False)
+    
+    # Precomputed placement readiness (weighted average of the components above)
+    readiness_score = db.Column(db.Float, default=0, nullable=False, index=True)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def accuracy(self):
+        return (self.accepted_submissions / self.total_submissions * 100) if self.total_submissions else 0
+    
+    @property
+    def avg_quiz_score(self):
+        return self.quiz_score_sum / self.total_quizzes if self.total_quizzes else 0
+    
+    @property
+    def code_practice_score(self):
+        return self.code_practice_sum / self.code_practice_count if self.code_practice_count else 0
+    
+    @property
+    def interview_score(self):
+        return self.interview_score_sum / self.total_interviews if self.total_interviews else 0
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'total_submissions': self.total_submissions,
+            'accepted_submissions': self.accepted_submissions,
+            'accuracy': round(self.accuracy, 2),
+            'total_quizzes': self.total_quizzes,
+            'avg_quiz_score': round(self.avg_quiz_score, 2),
+            'language_stats': json.loads(self.language_stats) if self.language_stats else {},
+            'difficulty_stats': json.loads(self.difficulty_stats) if self.difficulty_stats else {},
+            'code_practice_score': round(self.code_practice_score, 2),
+            'total_interviews': self.total_interviews,
+            'interview_score': round(self.interview_score, 2),
+            'readiness_score': round(self.readiness_score or 0, 2),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class StudentDailyActivity(db.Model):
+    """Per-user daily activity bucket backing the performance trend series"""
+    __tablename__ = 'student_daily_activity'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_student_daily_activity_user_day'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)  # UTC date
+    
+    submissions = db.Column(db.Integer, default=0, nullable=False)
+    accepted_submissions = db.Column(db.Integer, default=0, nullable=False)
+    quiz_attempts = db.Column(db.Integer, default=0, nullable=False)
+    quiz_score_sum = db.Column(db.Float, default=0, nullable=False)
+    interviews = db.Column(db.Integer, default=0, nullable=False)
+    interview_score_sum = db.Column(db.Float, default=0, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'day': self.day.isoformat(),
+            'submissions': self.submissions,
+            'accepted_submissions': self.accepted_submissions,
+            'quiz_attempts': self.quiz_attempts,
+            'quiz_score_sum': self.quiz_score_sum,
+            'interviews': self.interviews,
+            'interview_score_sum': self.interview_score_sum
+        }
+
+class CacheVersion(db.Model):
+    """Shared version counters used to invalidate per-process caches across workers"""
+    __tablename__ = 'cache_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TokenRevocation(db.Model):
+    """Access tokens issued to a user before revoked_at are rejected (role change, deactivation, deletion)"""
+    __tablename__ = 'token_revocations'
+    
+    # No foreign key: the entry must outlive a deleted user until their tokens expire
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class SchedulerLease(db.Model):
+    """Leader lease of a background job: only the current holder runs it"""
+    __tablename__ = 'scheduler_leases'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)  # host:pid:nonce of the holding process
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class StreamEvent(db.Model):
+    """Event relayed between workers by the 'database' pub/sub backend (short-lived rows)"""
+    __tablename__ = 'stream_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(100), nullable=False)
+    event = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
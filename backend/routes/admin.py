@@ -4,8 +4,15 @@ Admin routes
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import User, Company, Question, CodeSubmission, QuizAttempt, db
-from utils.auth import role_required
-from sqlalchemy import func
+from utils.auth import role_required, revoke_user_tokens
+from utils.analytics import user_counts
+from utils.student_stats import rebuild_student_stats
+from utils.tags import refresh_tag_counters
+from utils.pagination import keyset_paginate, page_size
+from utils.catalog_cache import CATALOG, cached_catalog, catalog_changed, quizzes_changed, posts_changed
+from utils.conditional import conditional
+from utils.notifications import reset_notification_counter
+from sqlalchemy import func, case
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -15,20 +22,26 @@ admin_bp = Blueprint('admin', __name__)
 def dashboard():
     """Get admin dashboard statistics with batch analytics"""
     try:
-        total_students = User.query.filter_by(role='student').count()
-        total_faculty = User.query.filter_by(role='faculty').count()
+        counts = user_counts()
+        total_students = counts.get(('student', True), 0) + counts.get(('student', False), 0)
+        total_faculty = counts.get(('faculty', True), 0) + counts.get(('faculty', False), 0)
+        active_students = counts.get(('student', True), 0)
         total_questions = Question.query.count()
         total_companies = Company.query.count()
-        active_students = User.query.filter_by(role='student', is_active=True).count()
         
-        # Batch Analytics
-        all_students = User.query.filter_by(role='student', is_active=True).all()
-        total_coding_submissions = CodeSubmission.query.count()
-        total_accepted = CodeSubmission.query.filter_by(status='accepted').count()
-        total_quiz_attempts = QuizAttempt.query.count()
+        # Batch Analytics (all submissions and attempts, not just active students)
+        total_coding_submissions, total_accepted = db.session.query(
+            func.count(CodeSubmission.id),
+            func.sum(case((CodeSubmission.status == 'accepted', 1), else_=0))
+        ).one()
+        total_accepted = int(total_accepted or 0)
+        total_quiz_attempts, avg_quiz_score = db.session.query(
+            func.count(QuizAttempt.id),
+            func.avg(QuizAttempt.score)
+        ).one()
+        avg_quiz_score = float(avg_quiz_score or 0)
         
         batch_avg_accuracy = (total_accepted / total_coding_submissions * 100) if total_coding_submissions > 0 else 0
-        avg_quiz_score = db.session.query(func.avg(QuizAttempt.score)).scalar() or 0
         
         return jsonify({
             'total_students': total_students,
@@ -52,7 +65,10 @@ def dashboard():
 @jwt_required()
 @role_required(['admin'])
 def list_users():
-    """List all users"""
+    """
+    List users, oldest first
+    GET /api/admin/users?role=student&is_active=true&limit=50&cursor=<next_cursor>
+    """
     try:
         role = request.args.get('role')
         is_active = request.args.get('is_active')
@@ -64,10 +80,19 @@ def list_users():
         if is_active is not None:
             query = query.filter_by(is_active=is_active.lower() == 'true')
         
-        users = query.all()
+        try:
+            users, next_cursor = keyset_paginate(
+                query, User.created_at, User.id,
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args.get('limit', type=int)),
+                descending=False
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'users': [u.to_dict() for u in users]
+            'users': [u.to_dict() for u in users],
+            'next_cursor': next_cursor
         }), 200
     
     except Exception as e:
@@ -81,6 +106,9 @@ def update_user(user_id):
     try:
         user = User.query.get_or_404(user_id)
         data = request.get_json()
+        previous_access = (user.role, user.is_active)
+        previous_audience = (user.role, user.batch)
+        previous_name = user.full_name
         
         if 'is_active' in data:
             user.is_active = data['is_active']
@@ -88,6 +116,18 @@ def update_user(user_id):
             user.role = data['role']
         if 'full_name' in data:
             user.full_name = data['full_name']
+        if 'batch' in data:
+            user.batch = data['batch'] or None
+        
+        # Tokens carry role/active claims; make the user pick up the new ones
+        if (user.role, user.is_active) != previous_access:
+            revoke_user_tokens(user.id)
+        # Broadcasts are addressed by role/batch, so the unread counter must be recounted
+        if (user.role, user.batch) != previous_audience:
+            reset_notification_counter(user.id)
+        # Posts show their author's name
+        if user.full_name != previous_name:
+            posts_changed()
         
         db.session.commit()
         
@@ -114,6 +154,8 @@ def delete_user(user_id):
             return jsonify({'error': 'Cannot delete your own account'}), 400
         
         db.session.delete(user)
+        revoke_user_tokens(user.id)
+        posts_changed()
         db.session.commit()
         
         return jsonify({
@@ -139,6 +181,7 @@ def create_company():
         )
         
         db.session.add(company)
+        catalog_changed()
         db.session.commit()
         
         return jsonify({
@@ -152,14 +195,39 @@ def create_company():
 
 @admin_bp.route('/companies', methods=['GET'])
 @jwt_required()
+@conditional(CATALOG)
 def list_companies():
-    """List all companies"""
+    """
+    List companies, oldest first
+    GET /api/admin/companies?limit=50&cursor=<next_cursor>
+    GET /api/admin/companies?name=Acme (exact name, case-insensitive)
+    """
     try:
-        companies = Company.query.all()
+        name = request.args.get('name')
+        cursor = request.args.get('cursor')
+        limit = page_size(request.args.get('limit', type=int))
         
-        return jsonify({
-            'companies': [c.to_dict() for c in companies]
-        }), 200
+        def load_page():
+            query = Company.query
+            if name:
+                query = query.filter(db.func.lower(Company.name) == name.lower())
+            companies, next_cursor = keyset_paginate(
+                query, Company.created_at, Company.id,
+                cursor=cursor,
+                limit=limit,
+                descending=False
+            )
+            return {
+                'companies': [c.to_dict() for c in companies],
+                'next_cursor': next_cursor
+            }
+        
+        try:
+            payload = cached_catalog(('companies', name, cursor, limit), load_page)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(payload), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -170,7 +238,7 @@ def list_companies():
 def delete_company(company_id):
     """Delete a company"""
     try:
-        from models import Question, Post, Resource, Quiz, QuizQuestion, CodeSubmission
+        from models import Question, Post, Resource, Quiz, QuizQuestion, QuestionTag, CodeSubmission
         
         company = Company.query.get_or_404(company_id)
         
@@ -178,6 +246,12 @@ def delete_company(company_id):
         questions_with_company = Question.query.filter_by(company_id=company_id).all()
         question_ids = [q.id for q in questions_with_company]
         
+        # Users whose statistics include submissions about to be deleted
+        affected_user_ids = []
+        if question_ids:
+            affected_user_ids = [row[0] for row in db.session.query(CodeSubmission.user_id)
+                                 .filter(CodeSubmission.question_id.in_(question_ids)).distinct().all()]
+        
         # Delete in correct order to avoid foreign key constraint violations
         # 1. Delete code submissions that reference these questions
         if question_ids:
@@ -187,22 +261,34 @@ def delete_company(company_id):
         if question_ids:
             QuizQuestion.query.filter(QuizQuestion.question_id.in_(question_ids)).delete(synchronize_session=False)
         
-        # 3. Delete questions (now safe since code_submissions are deleted)
+        # 3. Delete tag links for these questions
+        if question_ids:
+            QuestionTag.query.filter(QuestionTag.question_id.in_(question_ids)).delete(synchronize_session=False)
+        
+        # 4. Delete questions (now safe since code_submissions are deleted)
         Question.query.filter_by(company_id=company_id).delete(synchronize_session=False)
         
-        # 4. Delete posts
+        # 5. Delete posts
         Post.query.filter_by(company_id=company_id).delete(synchronize_session=False)
         
-        # 5. Delete resources
+        # 6. Delete resources
         Resource.query.filter_by(company_id=company_id).delete(synchronize_session=False)
         
-        # 6. Delete quizzes (this will cascade to quiz_questions)
+        # 7. Delete quizzes (this will cascade to quiz_questions)
         Quiz.query.filter_by(company_id=company_id).delete(synchronize_session=False)
         
-        # 7. Finally, delete the company
+        # 8. Finally, delete the company
         db.session.delete(company)
+        catalog_changed()
+        quizzes_changed()
+        posts_changed()
         db.session.commit()
         
+        # 9. Recompute statistics that included the deleted submissions
+        if affected_user_ids:
+            rebuild_student_stats(affected_user_ids)
+            refresh_tag_counters()
+        
         return jsonify({
             'message': 'Company deleted successfully'
         }), 200
@@ -223,6 +309,7 @@ def approve_question(question_id):
         question = Question.query.get_or_404(question_id)
         question.is_active = True
         
+        catalog_changed()
         db.session.commit()
         
         return jsonify({
@@ -243,6 +330,7 @@ def reject_question(question_id):
         question = Question.query.get_or_404(question_id)
         question.is_active = False
         
+        catalog_changed()
         db.session.commit()
         
         return jsonify({
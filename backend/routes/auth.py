@@ -4,7 +4,7 @@ Authentication routes
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from models import User, db
-from utils.auth import get_current_user
+from utils.auth import get_current_user, token_claims
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -32,6 +32,7 @@ def register():
         password = data.get('password')
         role = data.get('role', 'student')  # Default to student
         full_name = data.get('full_name', '')
+        batch = data.get('batch')
         
         # Validation
         if not username or not email or not password:
@@ -52,7 +53,8 @@ def register():
             username=username,
             email=email,
             role=role,
-            full_name=full_name
+            full_name=full_name,
+            batch=batch
         )
         user.set_password(password)
         
@@ -60,7 +62,7 @@ def register():
         db.session.commit()
         
         # Create access tokens
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=token_claims(user))
         refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({
@@ -94,7 +96,7 @@ def login():
             return jsonify({'error': 'Account is deactivated'}), 403
         
         # Create tokens
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=token_claims(user))
         refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({
@@ -118,7 +120,7 @@ def refresh():
         if not user or not user.is_active:
             return jsonify({'error': 'Invalid token'}), 401
         
-        access_token = create_access_token(identity=user_id)
+        access_token = create_access_token(identity=user_id, additional_claims=token_claims(user))
         
         return jsonify({
             'access_token': access_token
@@ -11,6 +11,7 @@ from utils.chatbot import (
 )
 from utils.file_extractor import extract_text_from_file
 from models import db, InterviewSession
+from utils.student_stats import record_interview
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import os
@@ -170,6 +171,7 @@ def submit_answer():
             session.is_completed = True
             session.ended_at = datetime.utcnow()
             session.conversation = json.dumps(conversation)
+            record_interview(session)
             db.session.commit()
             
             return jsonify({
@@ -302,6 +304,7 @@ def end_interview(session_id):
         # Mark as completed
         session.is_completed = True
         session.ended_at = datetime.utcnow()
+        record_interview(session)
         db.session.commit()
         
         return jsonify({
@@ -3,8 +3,8 @@ Coding routes for live coding practice
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Question, CodeSubmission, db
-from utils.auth import role_required
+from models import CodeSubmission, db
+from utils.auth import role_required, current_role
 from utils.compiler import execute_code, run_test_cases
 from utils.judge_v2 import (
     ExecutionMode,
@@ -12,6 +12,13 @@ from utils.judge_v2 import (
     execute_submit_mode
 )
 from utils.leaderboard import update_leaderboard
+from utils.student_stats import record_submission
+from utils.tags import record_tag_attempt
+from utils.serializers import with_summary_columns
+from utils.pagination import keyset_paginate, page_size
+from utils.catalog_cache import get_question_data
+from utils.pubsub import publish_to_user
+from utils.metrics import judge_execution
 import json
 
 coding_bp = Blueprint('coding', __name__)
@@ -21,13 +28,15 @@ coding_bp = Blueprint('coding', __name__)
 def get_question(question_id):
     """Get coding question details"""
     try:
-        question = Question.query.get_or_404(question_id)
+        question = get_question_data(question_id)
+        if not question:
+            return jsonify({'error': 'Question not found'}), 404
         
-        if question.type != 'coding':
+        if question['type'] != 'coding':
             return jsonify({'error': 'Not a coding question'}), 400
         
         return jsonify({
-            'question': question.to_dict()
+            'question': question
         }), 200
     
     except Exception as e:
@@ -59,15 +68,16 @@ def execute():
         # Get sample input from first test case if question_id provided
         sample_input = None
         if question_id:
-            question = Question.query.get(question_id)
-            if question and question.test_cases:
-                test_cases = json.loads(question.test_cases) if isinstance(question.test_cases, str) else question.test_cases
-                if test_cases:
-                    sample_input = test_cases[0].get('input')
+            question = get_question_data(question_id)
+            test_cases = question.get('test_cases') if question else None
+            if test_cases:
+                sample_input = test_cases[0].get('input')
         
         # Execute in RUN mode - just execute code, show output
         # Run mode = user program controls input/output (like normal compiler)
-        result = execute_run_mode(code, language, stdin, sample_input)
+        with judge_execution(ExecutionMode.RUN, language) as outcome:
+            result = execute_run_mode(code, language, stdin, sample_input)
+            outcome['status'] = result.get('status')
         
         # Format output - if empty, show "(no output)"
         if not result.get('output') or result.get('output').strip() == '':
@@ -103,19 +113,23 @@ def submit():
         if not question_id or not code or not language:
             return jsonify({'error': 'Missing required fields'}), 400
         
-        question = Question.query.get_or_404(question_id)
+        question = get_question_data(question_id)
+        if not question:
+            return jsonify({'error': 'Question not found'}), 404
         
-        if question.type != 'coding':
+        if question['type'] != 'coding':
             return jsonify({'error': 'Not a coding question'}), 400
         
         # Get test cases
-        test_cases = json.loads(question.test_cases) if question.test_cases else []
+        test_cases = question.get('test_cases') or []
         
         if not test_cases:
             return jsonify({'error': 'No test cases available'}), 400
         
         # Execute in SUBMIT mode (function-based judging)
-        result = execute_submit_mode(code, language, test_cases)
+        with judge_execution(ExecutionMode.SUBMIT, language) as outcome:
+            result = execute_submit_mode(code, language, test_cases)
+            outcome['status'] = result.get('status')
         
         # Create submission record
         submission = CodeSubmission(
@@ -131,6 +145,10 @@ def submit():
         )
         
         db.session.add(submission)
+        record_submission(submission, question['difficulty'])
+        record_tag_attempt(question['id'], submission.status == 'accepted')
+        db.session.flush()
+        publish_to_user(user_id, 'submission', submission.to_summary_dict())
         db.session.commit()
         
         # Update leaderboard
@@ -151,20 +169,69 @@ def submit():
 @coding_bp.route('/submissions', methods=['GET'])
 @jwt_required()
 def get_submissions():
-    """Get user's code submissions"""
+    """
+    Get user's code submissions, newest first (summaries; code and output via /submissions/<id>)
+    GET /api/coding/submissions?question_id=1&limit=50&cursor=<next_cursor>
+    """
     try:
         user_id = get_jwt_identity()
         question_id = request.args.get('question_id')
         
-        query = CodeSubmission.query.filter_by(user_id=user_id)
+        query = with_summary_columns(CodeSubmission.query, CodeSubmission).filter_by(user_id=user_id)
         
         if question_id:
             query = query.filter_by(question_id=question_id)
         
-        submissions = query.order_by(CodeSubmission.submitted_at.desc()).all()
+        try:
+            submissions, next_cursor = keyset_paginate(
+                query, CodeSubmission.submitted_at, CodeSubmission.id,
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args.get('limit', type=int))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'submissions': [s.to_summary_dict() for s in submissions],
+            'next_cursor': next_cursor
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@coding_bp.route('/submissions/solved', methods=['GET'])
+@jwt_required()
+def get_solved_question_ids():
+    """Ids of the questions the user has an accepted submission for"""
+    try:
+        user_id = get_jwt_identity()
+        
+        rows = db.session.query(CodeSubmission.question_id)\
+            .filter_by(user_id=user_id, status='accepted')\
+            .distinct().all()
+        
+        return jsonify({
+            'question_ids': sorted(row.question_id for row in rows)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@coding_bp.route('/submissions/<int:submission_id>', methods=['GET'])
+@jwt_required()
+def get_submission(submission_id):
+    """Get a single submission including its code and per-test output"""
+    try:
+        submission = CodeSubmission.query.get(submission_id)
+        if not submission:
+            return jsonify({'error': 'Submission not found'}), 404
+        
+        # Students can only view their own submissions
+        if submission.user_id != get_jwt_identity() and current_role() not in ['faculty', 'admin']:
+            return jsonify({'error': 'Access denied'}), 403
         
         return jsonify({
-            'submissions': [s.to_dict() for s in submissions]
+            'submission': submission.to_dict()
         }), 200
     
     except Exception as e:
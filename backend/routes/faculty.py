@@ -1,11 +1,23 @@
 """
 Faculty routes
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Quiz, Question, QuizQuestion, QuizAttempt, User, CodeSubmission, Notification, db
-from utils.auth import role_required
+from models import Quiz, Question, QuizQuestion, QuizAttempt, User, CodeSubmission, StudentStats, db
+from utils.auth import role_required, current_role
+from utils.analytics import (
+    batch_totals, submission_stats, topic_stats, quiz_score_stats,
+    cohort_readiness, percentile_rank, score_histogram
+)
+from utils.student_stats import empty_stats, readiness_components
+from utils.tags import set_question_tags, filter_questions_by_tag
+from utils.serializers import with_list_loaders, with_summary_columns
+from utils.pagination import keyset_paginate, page_size
+from utils.catalog_cache import catalog_changed, quizzes_changed
+from utils.notifications import broadcast, notify
+from utils.export import build_export, parse_date_bound, generate_csv, generate_ndjson
 from datetime import datetime
+from statistics import median
 import json
 
 faculty_bp = Blueprint('faculty', __name__)
@@ -19,7 +31,7 @@ def dashboard():
         user_id = get_jwt_identity()
         
         # Get quizzes created by faculty
-        quizzes = Quiz.query.filter_by(created_by=user_id).all()
+        quizzes = with_list_loaders(Quiz.query, Quiz).filter_by(created_by=user_id).all()
         
         # Get total students
         total_students = User.query.filter_by(role='student', is_active=True).count()
@@ -29,23 +41,12 @@ def dashboard():
             .filter(Quiz.created_by == user_id)\
             .order_by(QuizAttempt.submitted_at.desc()).limit(10).all()
         
-        # Batch Analytics - Average scores across all students
-        all_students = User.query.filter_by(role='student', is_active=True).all()
-        
-        # Calculate batch averages
-        total_coding_submissions = 0
-        total_accepted_submissions = 0
-        total_quiz_attempts = 0
-        total_quiz_score = 0
-        
-        for student in all_students:
-            submissions = CodeSubmission.query.filter_by(user_id=student.id).all()
-            quiz_attempts = QuizAttempt.query.filter_by(user_id=student.id).all()
-            
-            total_coding_submissions += len(submissions)
-            total_accepted_submissions += len([s for s in submissions if s.status == 'accepted'])
-            total_quiz_attempts += len(quiz_attempts)
-            total_quiz_score += sum(q.score for q in quiz_attempts)
+        # Batch Analytics - Aggregated across all active students in SQL
+        totals = batch_totals()
+        total_coding_submissions = totals['total_submissions']
+        total_accepted_submissions = totals['accepted_submissions']
+        total_quiz_attempts = totals['total_quiz_attempts']
+        total_quiz_score = totals['total_quiz_score']
         
         batch_avg_accuracy = (total_accepted_submissions / total_coding_submissions * 100) if total_coding_submissions > 0 else 0
         batch_avg_quiz_score = (total_quiz_score / total_quiz_attempts) if total_quiz_attempts > 0 else 0
@@ -124,19 +125,18 @@ def create_quiz():
             )
             db.session.add(qq)
         
+        quizzes_changed()
         db.session.commit()
         
         # Notify all students about the new quiz
-        students = User.query.filter_by(role='student', is_active=True).all()
-        for student in students:
-            notification = Notification(
-                user_id=student.id,
-                title='New Quiz Available',
-                message=f'A new quiz "{quiz.title}" has been added. Check it out!',
-                type='quiz',
-                link=f'/quiz/{quiz.id}'
-            )
-            db.session.add(notification)
+        broadcast(
+            'student',
+            title='New Quiz Available',
+            message=f'A new quiz "{quiz.title}" has been added. Check it out!',
+            type='quiz',
+            link=f'/quiz/{quiz.id}',
+            created_by=user_id
+        )
         db.session.commit()
         
         return jsonify({
@@ -161,13 +161,12 @@ def delete_quiz(quiz_id):
         quiz = Quiz.query.get_or_404(quiz_id)
         
         # Check if user created the quiz or is admin
-        if quiz.created_by != user_id:
-            user = User.query.get(user_id)
-            if not user or user.role != 'admin':
-                return jsonify({'error': 'You do not have permission to delete this quiz'}), 403
+        if quiz.created_by != user_id and current_role() != 'admin':
+            return jsonify({'error': 'You do not have permission to delete this quiz'}), 403
         
         # Soft delete: set is_active to False
         quiz.is_active = False
+        quizzes_changed()
         db.session.commit()
         
         return jsonify({
@@ -186,16 +185,21 @@ def delete_quiz(quiz_id):
 @jwt_required()
 @role_required(['faculty', 'admin'])
 def list_questions():
-    """List all questions (for faculty/admin - includes inactive)"""
+    """
+    List questions, newest first (for faculty/admin - includes inactive)
+    GET /api/faculty/questions?type=coding&per_page=50&cursor=<next_cursor>
+    Passing page=N selects the legacy OFFSET pagination with totals.
+    """
     try:
         question_type = request.args.get('type')  # coding, mcq, fill_blank
         difficulty = request.args.get('difficulty')
         company_id = request.args.get('company_id')
+        tag = request.args.get('tag')
         include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 50))
+        page = request.args.get('page', type=int)
+        per_page = page_size(request.args.get('per_page', type=int))
         
-        query = Question.query
+        query = with_summary_columns(with_list_loaders(Question.query, Question), Question, question_type)
         
         # Faculty can see inactive questions if requested
         if not include_inactive:
@@ -207,15 +211,32 @@ def list_questions():
             query = query.filter_by(difficulty=difficulty)
         if company_id:
             query = query.filter_by(company_id=company_id)
-        
-        questions = query.order_by(Question.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        if tag:
+            query = filter_questions_by_tag(query, tag)
+        
+        if page:
+            questions = query.order_by(Question.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+            return jsonify({
+                'questions': [q.to_summary_dict() for q in questions.items],
+                'total': questions.total,
+                'page': page,
+                'per_page': per_page,
+                'pages': questions.pages
+            }), 200
+        
+        try:
+            questions, next_cursor = keyset_paginate(
+                query, Question.created_at, Question.id,
+                cursor=request.args.get('cursor'),
+                limit=per_page
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'questions': [q.to_dict() for q in questions.items],
-            'total': questions.total,
-            'page': page,
+            'questions': [q.to_summary_dict() for q in questions],
             'per_page': per_page,
-            'pages': questions.pages
+            'next_cursor': next_cursor
         }), 200
     
     except Exception as e:
@@ -257,10 +278,10 @@ def create_question():
             type=data.get('type'),  # coding, mcq, fill_blank
             difficulty=data.get('difficulty', 'medium'),
             company_id=data.get('company_id'),
-            tags=','.join(data.get('tags', [])) if isinstance(data.get('tags'), list) else (data.get('tags') or ''),
             created_by=user_id,
             is_active=True  # Explicitly set as active
         )
+        set_question_tags(question, data.get('tags'))
         
         if question.type == 'coding':
             question.test_cases = json.dumps(data.get('test_cases', []))
@@ -274,22 +295,21 @@ def create_question():
             question.blanks = json.dumps(data.get('blanks', []))
         
         db.session.add(question)
+        catalog_changed()
         db.session.commit()
         
         # Determine question type label
         question_type_label = 'Coding Question' if question.type == 'coding' else 'Non-Technical Question'
         
         # Notify all students about the new question
-        students = User.query.filter_by(role='student', is_active=True).all()
-        for student in students:
-            notification = Notification(
-                user_id=student.id,
-                title=f'New {question_type_label} Added',
-                message=f'A new {question_type_label.lower()} "{question.title}" has been added. Start practicing!',
-                type='question',
-                link=f'/coding/questions/{question.id}' if question.type == 'coding' else f'/non-technical'
-            )
-            db.session.add(notification)
+        broadcast(
+            'student',
+            title=f'New {question_type_label} Added',
+            message=f'A new {question_type_label.lower()} "{question.title}" has been added. Start practicing!',
+            type='question',
+            link=f'/coding/questions/{question.id}' if question.type == 'coding' else f'/non-technical',
+            created_by=user_id
+        )
         db.session.commit()
         
         return jsonify({
@@ -326,7 +346,7 @@ def update_question(question_id):
         if 'company_id' in data:
             question.company_id = data['company_id']
         if 'tags' in data:
-            question.tags = ','.join(data['tags']) if isinstance(data['tags'], list) else data['tags']
+            set_question_tags(question, data['tags'])
         if 'is_active' in data:
             question.is_active = data['is_active']
         
@@ -348,6 +368,7 @@ def update_question(question_id):
             if 'blanks' in data:
                 question.blanks = json.dumps(data['blanks'])
         
+        catalog_changed()
         db.session.commit()
         
         return jsonify({
@@ -369,6 +390,7 @@ def delete_question(question_id):
         
         # Soft delete - set is_active to False
         question.is_active = False
+        catalog_changed()
         db.session.commit()
         
         return jsonify({
@@ -387,51 +409,29 @@ def student_performance():
     try:
         student_id = request.args.get('student_id')
         
+        # One query: each student joined with their materialized stats row
+        query = db.session.query(User, StudentStats)\
+            .outerjoin(StudentStats, StudentStats.user_id == User.id)
+        
         if student_id:
-            students = [User.query.get_or_404(student_id)]
+            rows = query.filter(User.id == student_id).all()
+            if not rows:
+                return jsonify({'error': 'Student not found'}), 404
         else:
-            students = User.query.filter_by(role='student', is_active=True).all()
+            rows = query.filter(User.role == 'student', User.is_active == True).all()
         
         performance_data = []
-        for student in students:
-            submissions = CodeSubmission.query.filter_by(user_id=student.id).all()
-            quiz_attempts = QuizAttempt.query.filter_by(user_id=student.id).all()
-            
-            total_submissions = len(submissions)
-            accepted = len([s for s in submissions if s.status == 'accepted'])
-            accuracy = (accepted / total_submissions * 100) if total_submissions > 0 else 0
-            avg_quiz_score = sum(q.score for q in quiz_attempts) / len(quiz_attempts) if quiz_attempts else 0
-            
-            # Language-wise performance
-            language_stats = {}
-            for submission in submissions:
-                lang = submission.language
-                if lang not in language_stats:
-                    language_stats[lang] = {'total': 0, 'accepted': 0}
-                language_stats[lang]['total'] += 1
-                if submission.status == 'accepted':
-                    language_stats[lang]['accepted'] += 1
-            
-            # Difficulty-wise performance
-            difficulty_stats = {}
-            for submission in submissions:
-                if submission.question:
-                    diff = submission.question.difficulty or 'unknown'
-                    if diff not in difficulty_stats:
-                        difficulty_stats[diff] = {'total': 0, 'accepted': 0}
-                    difficulty_stats[diff]['total'] += 1
-                    if submission.status == 'accepted':
-                        difficulty_stats[diff]['accepted'] += 1
-            
+        for student, stats in rows:
+            stats = stats or empty_stats(student.id)
             performance_data.append({
                 'student': student.to_dict(),
-                'total_submissions': total_submissions,
-                'accepted_submissions': accepted,
-                'accuracy': round(accuracy, 2),
-                'total_quizzes': len(quiz_attempts),
-                'avg_quiz_score': round(avg_quiz_score, 2),
-                'language_stats': language_stats,
-                'difficulty_stats': difficulty_stats
+                'total_submissions': stats.total_submissions,
+                'accepted_submissions': stats.accepted_submissions,
+                'accuracy': round(stats.accuracy, 2),
+                'total_quizzes': stats.total_quizzes,
+                'avg_quiz_score': round(stats.avg_quiz_score, 2),
+                'language_stats': json.loads(stats.language_stats) if stats.language_stats else {},
+                'difficulty_stats': json.loads(stats.difficulty_stats) if stats.difficulty_stats else {}
             })
         
         return jsonify({
@@ -441,60 +441,146 @@ def student_performance():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@faculty_bp.route('/cohort/readiness', methods=['GET'])
+@jwt_required()
+@role_required(['faculty', 'admin'])
+def cohort_readiness_report():
+    """
+    Placement readiness for every student in a cohort, from precomputed scores
+    GET /api/faculty/cohort/readiness?batch=2025&sort=score&order=desc
+        &min_score=40&max_score=100&min_percentile=0&max_percentile=100&bins=10&limit=100
+    """
+    try:
+        batch = request.args.get('batch')
+        sort = request.args.get('sort', 'score')  # score, name, username
+        order = request.args.get('order', 'desc')
+        min_score = request.args.get('min_score', type=float)
+        max_score = request.args.get('max_score', type=float)
+        min_percentile = request.args.get('min_percentile', type=float)
+        max_percentile = request.args.get('max_percentile', type=float)
+        bins = min(max(request.args.get('bins', 10, type=int), 1), 100)
+        limit = request.args.get('limit', type=int)
+        
+        if sort not in ['score', 'name', 'username']:
+            return jsonify({'error': 'Invalid sort field'}), 400
+        
+        rows = cohort_readiness(batch)
+        scores = [stats.readiness_score if stats else 0 for _, stats in rows]
+        
+        students = []
+        for (student, stats), score in zip(rows, scores):
+            percentile = percentile_rank(scores, score)
+            
+            # Threshold filters
+            if min_score is not None and score < min_score:
+                continue
+            if max_score is not None and score > max_score:
+                continue
+            if min_percentile is not None and percentile < min_percentile:
+                continue
+            if max_percentile is not None and percentile > max_percentile:
+                continue
+            
+            components = readiness_components(stats or empty_stats(student.id))
+            students.append({
+                'student': {
+                    'id': student.id,
+                    'username': student.username,
+                    'full_name': student.full_name,
+                    'batch': student.batch
+                },
+                'placement_readiness_score': round(score, 2),
+                'percentile': round(percentile, 2),
+                'breakdown': {
+                    name: round(value, 2) for name, (value, _) in components.items()
+                },
+                'data_available': {
+                    name: has_data for name, (_, has_data) in components.items()
+                }
+            })
+        
+        # Rows arrive sorted by score ascending
+        reverse = order != 'asc'
+        if sort == 'name':
+            students.sort(key=lambda x: (x['student']['full_name'] or '').lower(), reverse=reverse)
+        elif sort == 'username':
+            students.sort(key=lambda x: x['student']['username'].lower(), reverse=reverse)
+        elif reverse:
+            students.reverse()
+        
+        matched = len(students)
+        if limit:
+            students = students[:limit]
+        
+        total = len(scores)
+        return jsonify({
+            'cohort': {
+                'batch': batch,
+                'total_students': total,
+                'average_score': round(sum(scores) / total, 2) if total else 0,
+                'median_score': round(median(scores), 2) if total else 0
+            },
+            'histogram': score_histogram(scores, bins),
+            'matched_students': matched,
+            'students': students
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@faculty_bp.route('/export/<dataset>', methods=['GET'])
+@jwt_required()
+@role_required(['faculty', 'admin'])
+def export_dataset(dataset):
+    """
+    Stream a cohort dataset as CSV or NDJSON
+    dataset: submissions, quiz-attempts, interviews or readiness
+    GET /api/faculty/export/submissions?format=csv&from=2025-01-01&to=2025-03-31&company_id=1&batch=2025
+    """
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ['csv', 'ndjson']:
+            return jsonify({'error': 'Invalid format. Use csv or ndjson'}), 400
+        
+        try:
+            filters = {
+                'from': parse_date_bound(request.args.get('from')),
+                'to': parse_date_bound(request.args.get('to'), end=True),
+                'company_id': request.args.get('company_id', type=int),
+                'batch': request.args.get('batch') or None
+            }
+            statement = build_export(dataset, filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if export_format == 'csv':
+            body, mimetype = generate_csv(statement), 'text/csv'
+        else:
+            body, mimetype = generate_ndjson(statement), 'application/x-ndjson'
+        
+        filename = f"{dataset}-{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @faculty_bp.route('/batch/weak-areas', methods=['GET'])
 @jwt_required()
 @role_required(['faculty', 'admin'])
 def batch_weak_areas():
     """Identify weak areas across the batch"""
     try:
-        all_students = User.query.filter_by(role='student', is_active=True).all()
+        total_students = User.query.filter_by(role='student', is_active=True).count()
         
         # Collect statistics across all students
-        difficulty_stats = {}
-        language_stats = {}
-        topic_stats = {}
-        question_type_stats = {}
-        
-        for student in all_students:
-            submissions = CodeSubmission.query.filter_by(user_id=student.id).all()
-            
-            for submission in submissions:
-                if submission.question:
-                    # Difficulty analysis
-                    diff = submission.question.difficulty or 'unknown'
-                    if diff not in difficulty_stats:
-                        difficulty_stats[diff] = {'total': 0, 'accepted': 0}
-                    difficulty_stats[diff]['total'] += 1
-                    if submission.status == 'accepted':
-                        difficulty_stats[diff]['accepted'] += 1
-                    
-                    # Language analysis
-                    lang = submission.language
-                    if lang not in language_stats:
-                        language_stats[lang] = {'total': 0, 'accepted': 0}
-                    language_stats[lang]['total'] += 1
-                    if submission.status == 'accepted':
-                        language_stats[lang]['accepted'] += 1
-                    
-                    # Question type analysis
-                    q_type = submission.question.type or 'unknown'
-                    if q_type not in question_type_stats:
-                        question_type_stats[q_type] = {'total': 0, 'accepted': 0}
-                    question_type_stats[q_type]['total'] += 1
-                    if submission.status == 'accepted':
-                        question_type_stats[q_type]['accepted'] += 1
-                    
-                    # Topic analysis (from tags)
-                    if submission.question.tags:
-                        tags = submission.question.tags.split(',')
-                        for tag in tags:
-                            tag = tag.strip()
-                            if tag:
-                                if tag not in topic_stats:
-                                    topic_stats[tag] = {'total': 0, 'accepted': 0}
-                                topic_stats[tag]['total'] += 1
-                                if submission.status == 'accepted':
-                                    topic_stats[tag]['accepted'] += 1
+        difficulty_stats = submission_stats('difficulty')
+        language_stats = submission_stats('language')
+        topic_stats_by_tag = topic_stats()
+        question_type_stats = submission_stats('type')
         
         # Calculate accuracy for each category
         def calculate_weak_areas(stats_dict):
@@ -515,30 +601,19 @@ def batch_weak_areas():
         
         weak_difficulties = calculate_weak_areas(difficulty_stats)
         weak_languages = calculate_weak_areas(language_stats)
-        weak_topics = calculate_weak_areas(topic_stats)
+        weak_topics = calculate_weak_areas(topic_stats_by_tag)
         weak_question_types = calculate_weak_areas(question_type_stats)
         
         # Get quiz weak areas
         quiz_weak_areas = []
-        all_quiz_attempts = QuizAttempt.query.all()
-        quiz_scores_by_quiz = {}
-        
-        for attempt in all_quiz_attempts:
-            quiz_id = attempt.quiz_id
-            if quiz_id not in quiz_scores_by_quiz:
-                quiz_scores_by_quiz[quiz_id] = {'scores': [], 'quiz_title': attempt.quiz.title if attempt.quiz else 'Unknown'}
-            quiz_scores_by_quiz[quiz_id]['scores'].append(attempt.score)
-        
-        for quiz_id, data in quiz_scores_by_quiz.items():
-            if data['scores']:
-                avg_score = sum(data['scores']) / len(data['scores'])
-                quiz_weak_areas.append({
-                    'quiz_id': quiz_id,
-                    'quiz_title': data['quiz_title'],
-                    'avg_score': round(avg_score, 2),
-                    'total_attempts': len(data['scores']),
-                    'needs_improvement': avg_score < 50
-                })
+        for data in quiz_score_stats():
+            quiz_weak_areas.append({
+                'quiz_id': data['quiz_id'],
+                'quiz_title': data['quiz_title'],
+                'avg_score': round(data['avg_score'], 2),
+                'total_attempts': data['total_attempts'],
+                'needs_improvement': data['avg_score'] < 50
+            })
         
         quiz_weak_areas.sort(key=lambda x: x['avg_score'])
         
@@ -549,7 +624,7 @@ def batch_weak_areas():
             'weak_question_types': weak_question_types,
             'weak_quizzes': quiz_weak_areas[:10],
             'summary': {
-                'total_students_analyzed': len(all_students),
+                'total_students_analyzed': total_students,
                 'total_weak_areas_identified': len([w for w in weak_difficulties + weak_languages + weak_topics if w['needs_improvement']])
             }
         }), 200
@@ -563,23 +638,19 @@ def batch_weak_areas():
 def provide_feedback():
     """Provide feedback to student"""
     try:
-        from models import Notification
-        
         data = request.get_json()
         student_id = data.get('student_id')
         title = data.get('title')
         message = data.get('message')
         link = data.get('link')
         
-        notification = Notification(
-            user_id=student_id,
+        notification = notify(
+            student_id,
             title=title,
             message=message,
             type='feedback',
             link=link
         )
-        
-        db.session.add(notification)
         db.session.commit()
         
         return jsonify({
@@ -11,7 +11,9 @@ from utils.interview_ai import (
     evaluate_answer, calculate_final_score_tr, calculate_final_score_hr,
     generate_interview_summary, generate_practice_materials
 )
-from models import db, InterviewSession, ResumeData, JobDescriptionData, InterviewAnswer, InterviewResult, Notification
+from models import db, InterviewSession, ResumeData, JobDescriptionData, InterviewAnswer, InterviewResult
+from utils.student_stats import record_interview
+from utils.notifications import notify
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import os
@@ -546,7 +548,8 @@ def complete_interview(session, conversation, resume_data, jd_data, last_answer)
         
         db.session.add(result)
         
-        # Update session
+        # Update session (an interview is only counted in the rollup once)
+        newly_completed = not session.is_completed
         session.final_score = score_result['total_score']
         session.score_breakdown = json.dumps(breakdown)
         # Store full summary data as JSON (including weak_skills) for practice recommendations
@@ -554,20 +557,21 @@ def complete_interview(session, conversation, resume_data, jd_data, last_answer)
         session.is_completed = True
         session.ended_at = datetime.utcnow()
         session.conversation = json.dumps(conversation)
+        if newly_completed:
+            record_interview(session)
         
         # Create notification for interview completion with feedback
         feedback_summary = summary_data.get('summary', '')[:200]  # First 200 chars
         if len(summary_data.get('summary', '')) > 200:
             feedback_summary += '...'
         
-        notification = Notification(
-            user_id=session.user_id,
+        notify(
+            session.user_id,
             title='Interview Completed - Feedback Available',
             message=f'Your {session.interview_type} interview is complete! Score: {score_result["total_score"]:.1f}%. {feedback_summary}',
             type='interview_feedback',
             link=f'/interview/result/{session.id}'
         )
-        db.session.add(notification)
         
         db.session.commit()
         
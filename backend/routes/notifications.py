@@ -3,27 +3,39 @@ Notification routes
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Notification, db
+from models import Notification, User, db
+from utils.pagination import page_size
+from utils.notifications import notification_feed, get_unread_count, mark_read, mark_broadcast_read, mark_all_read
 
 notifications_bp = Blueprint('notifications', __name__)
 
 @notifications_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_notifications():
-    """Get user notifications"""
+    """
+    Get user notifications (personal and broadcast), newest first
+    GET /api/notifications/?is_read=false&limit=50&cursor=<next_cursor>
+    """
     try:
-        user_id = get_jwt_identity()
-        is_read = request.args.get('is_read')
-        
-        query = Notification.query.filter_by(user_id=user_id)
+        user = User.query.get(get_jwt_identity())
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
         
-        if is_read is not None:
-            query = query.filter_by(is_read=is_read.lower() == 'true')
+        is_read = request.args.get('is_read')
         
-        notifications = query.order_by(Notification.created_at.desc()).all()
+        try:
+            notifications, next_cursor = notification_feed(
+                user,
+                is_read=is_read.lower() == 'true' if is_read is not None else None,
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args.get('limit', type=int))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'notifications': [n.to_dict() for n in notifications]
+            'notifications': notifications,
+            'next_cursor': next_cursor
         }), 200
     
     except Exception as e:
@@ -40,7 +52,7 @@ def mark_as_read(notification_id):
         if notification.user_id != user_id:
             return jsonify({'error': 'Access denied'}), 403
         
-        notification.is_read = True
+        mark_read(notification)
         db.session.commit()
         
         return jsonify({
@@ -52,19 +64,37 @@ def mark_as_read(notification_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@notifications_bp.route('/broadcast/<int:broadcast_id>/read', methods=['PUT'])
+@jwt_required()
+def mark_broadcast_as_read(broadcast_id):
+    """Mark a broadcast notification as read for the current user"""
+    try:
+        user = User.query.get(get_jwt_identity())
+        broadcast = mark_broadcast_read(user, broadcast_id) if user else None
+        if not broadcast:
+            return jsonify({'error': 'Notification not found'}), 404
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Notification marked as read',
+            'notification': broadcast.to_dict(user.id, is_read=True)
+        }), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @notifications_bp.route('/read-all', methods=['PUT'])
 @jwt_required()
 def mark_all_as_read():
-    """Mark all notifications as read"""
+    """Mark all notifications (personal and broadcast) as read"""
     try:
-        user_id = get_jwt_identity()
-        
-        # Get count before update for response
-        unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+        user = User.query.get(get_jwt_identity())
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
         
-        # Update all unread notifications
-        updated = Notification.query.filter_by(user_id=user_id, is_read=False)\
-            .update({'is_read': True}, synchronize_session=False)
+        updated = mark_all_read(user)
         db.session.commit()
         
         return jsonify({
@@ -79,11 +109,13 @@ def mark_all_as_read():
 @notifications_bp.route('/unread-count', methods=['GET'])
 @jwt_required()
 def unread_count():
-    """Get count of unread notifications"""
+    """Get count of unread notifications (personal and broadcast)"""
     try:
-        user_id = get_jwt_identity()
-        
-        count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+        # Served from the maintained counter; commits only when it had to be created
+        count = get_unread_count(get_jwt_identity())
+        if count is None:
+            return jsonify({'error': 'User not found'}), 404
+        db.session.commit()
         
         return jsonify({
             'count': count
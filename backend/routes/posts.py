@@ -4,7 +4,10 @@ Posts routes for company-related posts
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, Post, Company, User
-from utils.auth import role_required
+from utils.auth import role_required, current_role
+from utils.serializers import with_list_loaders
+from utils.catalog_cache import CATALOG, POSTS, catalog_changed, posts_changed
+from utils.conditional import conditional
 from werkzeug.utils import secure_filename
 from config import Config
 import os
@@ -45,6 +48,7 @@ def create_post():
             )
             db.session.add(company)
             db.session.flush()  # Get the ID without committing
+            catalog_changed()
         
         company_id = company.id
         
@@ -89,6 +93,7 @@ def create_post():
         )
         
         db.session.add(post)
+        posts_changed()
         db.session.commit()
         
         return jsonify({
@@ -103,6 +108,7 @@ def create_post():
 
 @posts_bp.route('/posts', methods=['GET'])
 @jwt_required()
+@conditional(CATALOG, POSTS)
 def list_posts():
     """List all posts, optionally filtered by company"""
     try:
@@ -110,7 +116,7 @@ def list_posts():
         post_type = request.args.get('post_type')
         limit = request.args.get('limit', type=int, default=50)
         
-        query = Post.query.filter_by(is_active=True)
+        query = with_list_loaders(Post.query, Post).filter_by(is_active=True)
         
         if company_id:
             query = query.filter_by(company_id=company_id)
@@ -173,12 +179,12 @@ def delete_post(post_id):
         post = Post.query.get_or_404(post_id)
         
         # Check if user created the post or is admin
-        user = User.query.get(user_id)
-        if post.user_id != user_id and user.role != 'admin':
+        if post.user_id != user_id and current_role() != 'admin':
             return jsonify({'error': 'You do not have permission to delete this post'}), 403
         
         # Soft delete
         post.is_active = False
+        posts_changed()
         db.session.commit()
         
         return jsonify({
@@ -1,25 +1,35 @@
 """
 Quiz routes
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Quiz, QuizQuestion, QuizAttempt, Question, Notification, db
+from models import Quiz, QuizAttempt, QuizDraft, db
 from utils.auth import role_required
 from utils.leaderboard import update_leaderboard
-from datetime import datetime
+from utils.serializers import with_list_loaders
+from utils.pagination import keyset_paginate, page_size
+from utils.notifications import notify
+from utils.catalog_cache import CATALOG, QUIZZES
+from utils.conditional import conditional
+from utils.answer_keys import get_answer_key, grade_attempt
+from utils.quiz_payloads import get_quiz_payload
+from utils.quiz_drafts import get_draft_buffer, load_draft, discard_draft
+from utils.quiz_timers import attempt_deadline, create_attempt, finalize_draft, is_expired, quiz_closed_reason, start_attempt
+from datetime import datetime, timedelta
 import json
 
 quiz_bp = Blueprint('quiz', __name__)
 
 @quiz_bp.route('/list', methods=['GET'])
 @jwt_required()
+@conditional(CATALOG, QUIZZES)
 def list_quizzes():
     """Get list of available quizzes"""
     try:
         company_id = request.args.get('company_id')
         is_active = request.args.get('is_active', 'true').lower() == 'true'
         
-        query = Quiz.query.filter_by(is_active=is_active)
+        query = with_list_loaders(Quiz.query, Quiz).filter_by(is_active=is_active)
         
         if company_id:
             query = query.filter_by(company_id=company_id)
@@ -35,19 +45,16 @@ def list_quizzes():
 
 @quiz_bp.route('/<int:quiz_id>', methods=['GET'])
 @jwt_required()
+@conditional(CATALOG, QUIZZES)
 def get_quiz(quiz_id):
     """Get quiz details with questions"""
     try:
-        quiz = Quiz.query.get_or_404(quiz_id)
-        quiz_questions = QuizQuestion.query.filter_by(quiz_id=quiz_id)\
-            .order_by(QuizQuestion.order).all()
+        # Pre-rendered, answers stripped; built once per quiz version
+        body = get_quiz_payload(quiz_id)
+        if body is None:
+            return jsonify({'error': 'Quiz not found'}), 404
         
-        quiz_data = quiz.to_dict()
-        quiz_data['questions'] = [q.to_dict() for q in quiz_questions]
-        
-        return jsonify({
-            'quiz': quiz_data
-        }), 200
+        return current_app.response_class(body, mimetype='application/json'), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -62,78 +69,68 @@ def attempt_quiz(quiz_id):
         data = request.get_json()
         answers = data.get('answers', {})  # {question_id: answer}
         
-        quiz = Quiz.query.get_or_404(quiz_id)
-        quiz_questions = QuizQuestion.query.filter_by(quiz_id=quiz_id).all()
-        
-        # Calculate score and track per-question results
-        total_marks = 0
-        obtained_marks = 0
-        question_results = {}
-        
-        for qq in quiz_questions:
-            question = qq.question
-            total_marks += qq.marks
-            question_marks = 0
-            is_correct = False
-            
-            if question.type == 'mcq':
-                user_answer = answers.get(str(question.id))
-                if user_answer == question.correct_answer:
-                    obtained_marks += qq.marks
-                    question_marks = qq.marks
-                    is_correct = True
-            elif question.type == 'fill_blank':
-                user_answers = answers.get(str(question.id), {})
-                blanks = json.loads(question.blanks) if question.blanks else []
-                correct_count = 0
-                for blank in blanks:
-                    blank_id = blank.get('id')
-                    correct_answer = blank.get('answer', '').lower().strip()
-                    user_answer = user_answers.get(str(blank_id), '').lower().strip()
-                    if user_answer == correct_answer:
-                        correct_count += 1
-                
-                if len(blanks) > 0:
-                    partial_marks = (correct_count / len(blanks)) * qq.marks
-                    obtained_marks += partial_marks
-                    question_marks = partial_marks
-                    is_correct = (correct_count == len(blanks))
+        # Compiled key: grading needs no quiz or question queries
+        key = get_answer_key(quiz_id)
+        if key is None:
+            return jsonify({'error': 'Quiz not found'}), 404
+        
+        now = datetime.utcnow()
+        grace = timedelta(seconds=current_app.config['QUIZ_SUBMIT_GRACE_SECONDS'])
+        draft = QuizDraft.query.filter_by(user_id=user_id, quiz_id=quiz_id).first()
+        
+        if draft and is_expired(draft, now, grace.total_seconds()):
+            # Time is up: the saved answers count, not the late ones
+            attempt = finalize_draft(draft, now)
+            if attempt is None:
+                db.session.rollback()
+                return jsonify({'error': 'This attempt was already submitted when time ran out'}), 409
+            db.session.commit()
+            update_leaderboard(user_id)
             
-            question_results[question.id] = {
-                'is_correct': is_correct,
-                'marks_obtained': question_marks,
-                'marks_total': qq.marks,
-                'user_answer': answers.get(str(question.id), ''),
-                'correct_answer': question.correct_answer
-            }
-        
-        score = (obtained_marks / total_marks * 100) if total_marks > 0 else 0
-        
-        # Create quiz attempt
-        attempt = QuizAttempt(
-            user_id=user_id,
-            quiz_id=quiz_id,
-            answers=json.dumps(answers),
-            score=score,
-            total_marks=total_marks,
-            submitted_at=datetime.utcnow()
+            answers = attempt.to_dict()['answers']
+            obtained_marks, question_results = grade_attempt(key, answers)
+            return jsonify({
+                'attempt': attempt.to_dict(),
+                'score': attempt.score,
+                'obtained_marks': obtained_marks,
+                'total_marks': attempt.total_marks,
+                'question_results': question_results,
+                'answers': answers,
+                'auto_submitted': True
+            }), 200
+        
+        if not draft:
+            # Without /start nothing has checked the quiz's window or time limit
+            quiz = db.session.query(Quiz.is_active, Quiz.start_time, Quiz.end_time, Quiz.duration_minutes)\
+                .filter(Quiz.id == quiz_id).first()
+            reason = quiz_closed_reason(quiz, now)
+            if reason:
+                return jsonify({'error': reason}), 403
+            if attempt_deadline(quiz, now):
+                return jsonify({'error': 'Start the quiz before submitting it'}), 409
+        
+        attempt, obtained_marks, question_results = create_attempt(
+            user_id, key, answers, now, started_at=draft.started_at if draft else None
         )
-        
-        db.session.add(attempt)
+        if not discard_draft(user_id, quiz_id) and draft:
+            # The timer scheduler submitted this attempt in the meantime
+            db.session.rollback()
+            return jsonify({'error': 'This attempt was already submitted when time ran out'}), 409
         db.session.commit()
+        score = attempt.score
+        total_marks = attempt.total_marks
         
         # Update leaderboard
         update_leaderboard(user_id)
         
         # Create notification
-        notification = Notification(
-            user_id=user_id,
+        notify(
+            user_id,
             title='Quiz Submitted',
-            message=f'Your quiz "{quiz.title}" has been submitted. Score: {score:.2f}%',
+            message=f'Your quiz "{key["title"]}" has been submitted. Score: {score:.2f}%',
             type='quiz_result',
             link=f'/quiz/{quiz_id}/result/{attempt.id}'
         )
-        db.session.add(notification)
         db.session.commit()
         
         return jsonify({
@@ -149,10 +146,87 @@ def attempt_quiz(quiz_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@quiz_bp.route('/<int:quiz_id>/start', methods=['POST'])
+@jwt_required()
+@role_required(['student', 'faculty', 'admin'])
+def start_quiz(quiz_id):
+    """Start (or resume) a timed attempt; returns its draft and the seconds left"""
+    try:
+        user_id = get_jwt_identity()
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            return jsonify({'error': 'Quiz not found'}), 404
+        
+        now = datetime.utcnow()
+        reason = quiz_closed_reason(quiz, now)
+        if reason:
+            return jsonify({'error': reason}), 403
+        
+        draft = start_attempt(user_id, quiz)
+        
+        return jsonify({
+            'draft': load_draft(user_id, quiz_id),
+            'remaining_seconds': max((draft.deadline - now).total_seconds(), 0) if draft.deadline else None
+        }), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@quiz_bp.route('/<int:quiz_id>/draft', methods=['PUT'])
+@jwt_required()
+@role_required(['student', 'faculty', 'admin'])
+def save_draft(quiz_id):
+    """Autosave the answers of an attempt in progress (buffered, written every few seconds)"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        answers = data.get('answers', {})  # {question_id: answer}, the full set
+        if not isinstance(answers, dict):
+            return jsonify({'error': 'answers must be an object'}), 400
+        
+        if get_answer_key(quiz_id) is None:
+            return jsonify({'error': 'Quiz not found'}), 404
+        
+        # Only a started attempt that still has time accepts answers
+        draft = db.session.query(QuizDraft.id, QuizDraft.deadline)\
+            .filter_by(user_id=user_id, quiz_id=quiz_id).first()
+        if draft is None:
+            return jsonify({'error': 'Start the quiz before saving answers'}), 409
+        if is_expired(draft, datetime.utcnow(), current_app.config['QUIZ_SUBMIT_GRACE_SECONDS']):
+            return jsonify({'error': 'Time is up for this attempt'}), 403
+        
+        saved_at = get_draft_buffer().save(user_id, quiz_id, answers)
+        
+        return jsonify({
+            'saved_at': saved_at.isoformat()
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@quiz_bp.route('/<int:quiz_id>/draft', methods=['GET'])
+@jwt_required()
+@role_required(['student', 'faculty', 'admin'])
+def get_draft(quiz_id):
+    """Resume an attempt: the latest autosaved answers, or null"""
+    try:
+        user_id = get_jwt_identity()
+        
+        return jsonify({
+            'draft': load_draft(user_id, quiz_id)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @quiz_bp.route('/attempts', methods=['GET'])
 @jwt_required()
 def get_attempts():
-    """Get user's quiz attempts"""
+    """
+    Get user's quiz attempts, newest first
+    GET /api/quiz/attempts?quiz_id=1&limit=50&cursor=<next_cursor>
+    """
     try:
         user_id = get_jwt_identity()
         quiz_id = request.args.get('quiz_id')
@@ -162,10 +236,18 @@ def get_attempts():
         if quiz_id:
             query = query.filter_by(quiz_id=quiz_id)
         
-        attempts = query.order_by(QuizAttempt.submitted_at.desc()).all()
+        try:
+            attempts, next_cursor = keyset_paginate(
+                query, QuizAttempt.submitted_at, QuizAttempt.id,
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args.get('limit', type=int))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'attempts': [a.to_dict() for a in attempts]
+            'attempts': [a.to_dict() for a in attempts],
+            'next_cursor': next_cursor
         }), 200
     
     except Exception as e:
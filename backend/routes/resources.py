@@ -3,8 +3,9 @@ Learning resources routes
 """
 from flask import Blueprint, request, jsonify, send_from_directory, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Resource, User, Notification, db
-from utils.auth import role_required
+from models import Resource, db
+from utils.auth import role_required, current_role
+from utils.notifications import broadcast
 from werkzeug.utils import secure_filename
 import os
 
@@ -63,16 +64,14 @@ def upload_resource():
         db.session.commit()
         
         # Notify all students about the new resource
-        students = User.query.filter_by(role='student', is_active=True).all()
-        for student in students:
-            notification = Notification(
-                user_id=student.id,
-                title='New Resource Available',
-                message=f'A new resource "{resource.title}" has been uploaded. Check it out!',
-                type='resource',
-                link=f'/resources/{resource.id}'
-            )
-            db.session.add(notification)
+        broadcast(
+            'student',
+            title='New Resource Available',
+            message=f'A new resource "{resource.title}" has been uploaded. Check it out!',
+            type='resource',
+            link=f'/resources/{resource.id}',
+            created_by=user_id
+        )
         db.session.commit()
         
         # Return resource with file_path
@@ -156,11 +155,8 @@ def delete_resource(resource_id):
         resource = Resource.query.get_or_404(resource_id)
         
         # Check ownership
-        if resource.user_id != user_id:
-            from utils.auth import get_current_user
-            user = get_current_user()
-            if not user or user.role != 'admin':
-                return jsonify({'error': 'Access denied'}), 403
+        if resource.user_id != user_id and current_role() != 'admin':
+            return jsonify({'error': 'Access denied'}), 403
         
         # Delete file if exists
         if resource.file_path and os.path.exists(resource.file_path):
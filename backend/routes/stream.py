@@ -0,0 +1,66 @@
+"""
+Event stream routes (server-sent events)
+"""
+from flask import Blueprint, Response, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import User, db
+from utils.pubsub import get_pubsub, channels_for
+import json
+import time
+
+stream_bp = Blueprint('stream', __name__)
+
+def format_event(event, data):
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@stream_bp.route('/', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def events():
+    """
+    Push channel for the current user: 'notification', 'submission' and 'rank' events
+    GET /api/stream/?jwt=<access_token>  (EventSource cannot send an Authorization header)
+    The stream ends after STREAM_MAX_SECONDS; EventSource reconnects on its own.
+    """
+    try:
+        user = User.query.get(get_jwt_identity())
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        user_id = user.id
+        subscription = get_pubsub().subscribe(channels_for(user))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        # Don't hold a database connection for the life of the stream
+        db.session.remove()
+    
+    heartbeat = current_app.config.get('STREAM_HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + current_app.config.get('STREAM_MAX_SECONDS', 300)
+    
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = subscription.get(timeout=min(heartbeat, remaining))
+                if message is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                else:
+                    event, data = message
+                    if event == 'ranks':
+                        # Shared by every student; pass on this user's entry only
+                        data = data.get(str(user_id))
+                        if data is None:
+                            continue
+                        event = 'rank'
+                    yield format_event(event, data)
+        finally:
+            subscription.close()
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -3,9 +3,17 @@ Student routes
 """
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import User, Question, CodeSubmission, Quiz, QuizQuestion, QuizAttempt, Resource, Notification, InterviewSession, db
-from utils.auth import role_required, get_current_user
+from models import User, Question, CodeSubmission, Quiz, QuizQuestion, QuizAttempt, Resource, InterviewSession, db
+from utils.auth import role_required, current_role
 from utils.leaderboard import update_leaderboard
+from utils.student_stats import read_stats, readiness_components, compute_readiness, activity_series, trend_range
+from utils.tags import filter_questions_by_tag
+from utils.serializers import with_list_loaders, with_summary_columns
+from utils.pagination import keyset_paginate, page_size
+from utils.notifications import notification_feed
+from utils.catalog_cache import CATALOG, QUIZZES, cached_catalog, get_question_data
+from utils.conditional import conditional
+import json
 
 student_bp = Blueprint('student', __name__)
 
@@ -18,6 +26,7 @@ def student_info():
             'GET /api/student/dashboard - Get dashboard data (requires auth)',
             'GET /api/student/performance - Get performance metrics (requires auth)',
             'GET /api/student/questions - Get questions (requires auth)',
+            'GET /api/student/questions/<id> - Get one question (requires auth)',
             'GET /api/student/resources - Get resources (requires auth)',
             'GET /api/student/placement-readiness - Get placement readiness score (requires auth)'
         ]
@@ -33,33 +42,33 @@ def dashboard():
         user = User.query.get(user_id)
         
         # Get recent submissions
-        recent_submissions = CodeSubmission.query.filter_by(user_id=user_id)\
+        recent_submissions = with_summary_columns(CodeSubmission.query, CodeSubmission)\
+            .filter_by(user_id=user_id)\
             .order_by(CodeSubmission.submitted_at.desc()).limit(5).all()
         
         # Get recent quiz attempts
         recent_quizzes = QuizAttempt.query.filter_by(user_id=user_id)\
             .order_by(QuizAttempt.submitted_at.desc()).limit(5).all()
         
-        # Get unread notifications
-        unread_notifications = Notification.query.filter_by(
-            user_id=user_id, is_read=False
-        ).order_by(Notification.created_at.desc()).limit(10).all()
+        # Get unread notifications (personal and broadcast)
+        unread_notifications, _ = notification_feed(user, is_read=False, limit=10)
         
         # Get available quizzes
-        available_quizzes = Quiz.query.filter_by(is_active=True).limit(5).all()
+        available_quizzes = with_list_loaders(Quiz.query, Quiz).filter_by(is_active=True).limit(5).all()
         
-        # Get coding questions
-        coding_questions = Question.query.filter_by(
-            type='coding', is_active=True
-        ).limit(10).all()
+        # Get coding questions (served from the catalog cache)
+        coding_questions = cached_catalog(('dashboard_coding_questions',), lambda: [
+            q.to_summary_dict() for q in with_summary_columns(with_list_loaders(Question.query, Question), Question, 'coding')
+            .filter_by(type='coding', is_active=True).limit(10).all()
+        ])
         
         return jsonify({
             'user': user.to_dict(),
-            'recent_submissions': [s.to_dict() for s in recent_submissions],
+            'recent_submissions': [s.to_summary_dict() for s in recent_submissions],
             'recent_quizzes': [q.to_dict() for q in recent_quizzes],
-            'notifications': [n.to_dict() for n in unread_notifications],
+            'notifications': unread_notifications,
             'available_quizzes': [q.to_dict() for q in available_quizzes],
-            'coding_questions': [q.to_dict() for q in coding_questions]
+            'coding_questions': coding_questions
         }), 200
     
     except Exception as e:
@@ -73,45 +82,54 @@ def performance():
     try:
         user_id = get_jwt_identity()
         
-        # Get all submissions
-        submissions = CodeSubmission.query.filter_by(user_id=user_id).all()
-        total_submissions = len(submissions)
-        accepted_submissions = len([s for s in submissions if s.status == 'accepted'])
-        accuracy = (accepted_submissions / total_submissions * 100) if total_submissions > 0 else 0
+        # Single-row read from the materialized rollup
+        stats = read_stats(user_id)
         
-        # Get quiz attempts
-        quiz_attempts = QuizAttempt.query.filter_by(user_id=user_id).all()
-        total_quizzes = len(quiz_attempts)
-        avg_quiz_score = sum(q.score for q in quiz_attempts) / total_quizzes if total_quizzes > 0 else 0
-        
-        # Language-wise performance
-        language_stats = {}
-        for submission in submissions:
-            lang = submission.language
-            if lang not in language_stats:
-                language_stats[lang] = {'total': 0, 'accepted': 0}
-            language_stats[lang]['total'] += 1
-            if submission.status == 'accepted':
-                language_stats[lang]['accepted'] += 1
-        
-        # Difficulty-wise performance
-        difficulty_stats = {}
-        for submission in submissions:
-            diff = submission.question.difficulty if submission.question else 'unknown'
-            if diff not in difficulty_stats:
-                difficulty_stats[diff] = {'total': 0, 'accepted': 0}
-            difficulty_stats[diff]['total'] += 1
-            if submission.status == 'accepted':
-                difficulty_stats[diff]['accepted'] += 1
+        return jsonify({
+            'total_submissions': stats.total_submissions,
+            'accepted_submissions': stats.accepted_submissions,
+            'accuracy': round(stats.accuracy, 2),
+            'total_quizzes': stats.total_quizzes,
+            'avg_quiz_score': round(stats.avg_quiz_score, 2),
+            'language_stats': json.loads(stats.language_stats) if stats.language_stats else {},
+            'difficulty_stats': json.loads(stats.difficulty_stats) if stats.difficulty_stats else {}
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@student_bp.route('/performance/trend', methods=['GET'])
+@jwt_required()
+@role_required(['student', 'faculty', 'admin'])
+def performance_trend():
+    """
+    Daily performance series from the per-day activity buckets
+    GET /api/student/performance/trend?days=90
+    GET /api/student/performance/trend?from=2025-01-01&to=2025-03-31&user_id=5 (faculty/admin)
+    """
+    try:
+        user_id = get_jwt_identity()
+        target_user_id = request.args.get('user_id', type=int)
+        if target_user_id and current_role() in ['faculty', 'admin']:
+            if not User.query.get(target_user_id):
+                return jsonify({'error': 'User not found'}), 404
+            user_id = target_user_id
+        
+        try:
+            start, end = trend_range(
+                days=request.args.get('days', type=int),
+                start=request.args.get('from'),
+                end=request.args.get('to')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'total_submissions': total_submissions,
-            'accepted_submissions': accepted_submissions,
-            'accuracy': round(accuracy, 2),
-            'total_quizzes': total_quizzes,
-            'avg_quiz_score': round(avg_quiz_score, 2),
-            'language_stats': language_stats,
-            'difficulty_stats': difficulty_stats
+            'user_id': user_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': (end - start).days + 1,
+            'series': activity_series(user_id, start, end)
         }), 200
     
     except Exception as e:
@@ -119,40 +137,91 @@ def performance():
 
 @student_bp.route('/questions', methods=['GET'])
 @jwt_required()
+@conditional(CATALOG, QUIZZES)
 def get_questions():
-    """Get questions with filters"""
+    """
+    Get questions with filters, oldest first
+    GET /api/student/questions?type=coding&per_page=20&cursor=<next_cursor>
+    Passing page=N selects the legacy OFFSET pagination with totals.
+    """
     try:
         question_type = request.args.get('type')  # coding, mcq, fill_blank
         difficulty = request.args.get('difficulty')
         company_id = request.args.get('company_id')
+        tag = request.args.get('tag')
         exclude_quiz_questions = request.args.get('exclude_quiz_questions', 'false').lower() == 'true'
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
-        
-        query = Question.query.filter_by(is_active=True)
-        
-        if question_type:
-            query = query.filter_by(type=question_type)
-        if difficulty:
-            query = query.filter_by(difficulty=difficulty)
-        if company_id:
-            query = query.filter_by(company_id=company_id)
-        
-        # Exclude questions that are part of any quiz (for non-technical page)
-        if exclude_quiz_questions:
-            # Get all question IDs that are used in quizzes
-            quiz_question_ids = [q[0] for q in db.session.query(QuizQuestion.question_id).distinct().all()]
-            if quiz_question_ids:
+        page = request.args.get('page', type=int)
+        per_page = page_size(request.args.get('per_page', type=int), default=20)
+        
+        cursor = request.args.get('cursor')
+        
+        def load_page():
+            query = with_summary_columns(with_list_loaders(Question.query, Question), Question, question_type)\
+                .filter_by(is_active=True)
+            
+            if question_type:
+                query = query.filter_by(type=question_type)
+            if difficulty:
+                query = query.filter_by(difficulty=difficulty)
+            if company_id:
+                query = query.filter_by(company_id=company_id)
+            if tag:
+                query = filter_questions_by_tag(query, tag)
+            
+            # Exclude questions that are part of any quiz (for non-technical page)
+            if exclude_quiz_questions:
+                quiz_question_ids = db.session.query(QuizQuestion.question_id)
                 query = query.filter(~Question.id.in_(quiz_question_ids))
+            
+            if page:
+                questions = query.paginate(page=page, per_page=per_page, error_out=False)
+                return {
+                    'questions': [q.to_summary_dict() for q in questions.items],
+                    'total': questions.total,
+                    'page': page,
+                    'per_page': per_page,
+                    'pages': questions.pages
+                }
+            
+            questions, next_cursor = keyset_paginate(
+                query, Question.created_at, Question.id,
+                cursor=cursor,
+                limit=per_page,
+                descending=False
+            )
+            return {
+                'questions': [q.to_summary_dict() for q in questions],
+                'per_page': per_page,
+                'next_cursor': next_cursor
+            }
         
-        questions = query.paginate(page=page, per_page=per_page, error_out=False)
+        try:
+            if exclude_quiz_questions:
+                # Quiz membership is not covered by the catalog version, so always read through
+                payload = load_page()
+            else:
+                key = ('student_questions', question_type, difficulty, company_id, tag, page, per_page, cursor)
+                payload = cached_catalog(key, load_page)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(payload), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@student_bp.route('/questions/<int:question_id>', methods=['GET'])
+@jwt_required()
+@conditional(CATALOG)
+def get_question(question_id):
+    """Get one active question by id (any type)"""
+    try:
+        question = get_question_data(question_id)
+        if not question or not question['is_active']:
+            return jsonify({'error': 'Question not found'}), 404
         
         return jsonify({
-            'questions': [q.to_dict() for q in questions.items],
-            'total': questions.total,
-            'page': page,
-            'per_page': per_page,
-            'pages': questions.pages
+            'question': question
         }), 200
     
     except Exception as e:
@@ -167,17 +236,25 @@ def get_resources():
         company_id = request.args.get('company_id')
         
         # Show all resources to everyone (no filtering by is_public or user_id)
-        query = Resource.query
+        query = with_list_loaders(Resource.query, Resource)
         
         if resource_type:
             query = query.filter_by(type=resource_type)
         if company_id:
             query = query.filter_by(company_id=company_id)
         
-        resources = query.order_by(Resource.created_at.desc()).all()
+        try:
+            resources, next_cursor = keyset_paginate(
+                query, Resource.created_at, Resource.id,
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args.get('limit', type=int))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'resources': [r.to_dict() for r in resources]
+            'resources': [r.to_dict() for r in resources],
+            'next_cursor': next_cursor
         }), 200
     
     except Exception as e:
@@ -192,13 +269,9 @@ def placement_readiness():
         # Allow faculty/admin to view any student's score, or students to view their own
         target_user_id = request.args.get('user_id')
         current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        if not current_user:
-            return jsonify({'error': 'Current user not found'}), 404
         
         # Determine which user's score to calculate
-        if target_user_id and current_user.role in ['faculty', 'admin']:
+        if target_user_id and current_role() in ['faculty', 'admin']:
             user_id = int(target_user_id)
         else:
             user_id = current_user_id
@@ -207,86 +280,23 @@ def placement_readiness():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # 1. Calculate Code Practice Score (from code submissions)
-        # This is the main coding performance metric based on test cases passed
-        coding_submissions = CodeSubmission.query.filter_by(user_id=user_id).all()
-        code_practice_scores = []
-        for submission in coding_submissions:
-            if submission.total_test_cases and submission.total_test_cases > 0:
-                percentage = (submission.test_cases_passed / submission.total_test_cases) * 100
-                code_practice_scores.append(percentage)
-        code_practice_score = sum(code_practice_scores) / len(code_practice_scores) if code_practice_scores else 0
-        
-        # 2. Calculate Non-Technical Score (from ALL quiz attempts)
-        # Include all quiz attempts - both Non-Technical quizzes and regular quizzes
-        # This combines all quiz performance into the Non-Technical score
-        quiz_attempts = QuizAttempt.query.filter_by(user_id=user_id).all()
-        non_technical_scores = []
-        for attempt in quiz_attempts:
-            try:
-                # Include all quiz attempts that have valid scores
-                # The score field is already stored as a percentage (0-100) in QuizAttempt
-                # Score is calculated as: (obtained_marks / total_marks) * 100
-                if attempt.score is not None and attempt.score >= 0:
-                    # Score is already a percentage, use it directly
-                    non_technical_scores.append(attempt.score)
-            except Exception as e:
-                # Skip if attempt has issues
-                print(f"Warning: Could not process quiz attempt {attempt.id}: {str(e)}")
-                continue
-        
-        non_technical_score = sum(non_technical_scores) / len(non_technical_scores) if non_technical_scores else 0
-        
-        # 3. Calculate AI Virtual Interview Score (from completed interviews)
-        completed_interviews = InterviewSession.query.filter_by(
-            user_id=user_id, 
-            is_completed=True
-        ).all()
-        interview_scores = []
-        for interview in completed_interviews:
-            if interview.final_score is not None:
-                interview_scores.append(interview.final_score)
-        interview_score = sum(interview_scores) / len(interview_scores) if interview_scores else 0
-        
-        # Calculate overall Placement Readiness Score (weighted average)
-        # Weights: Code Practice 40%, Non-Technical 30%, AI Virtual Interview 30%
-        weights = {
-            'code_practice': 0.40,
-            'non_technical': 0.30,
-            'interview': 0.30
-        }
-        
-        # Only include components that have data
-        total_weight = 0
-        weighted_sum = 0
-        
-        if code_practice_scores:
-            weighted_sum += code_practice_score * weights['code_practice']
-            total_weight += weights['code_practice']
-        if non_technical_scores:
-            weighted_sum += non_technical_score * weights['non_technical']
-            total_weight += weights['non_technical']
-        if interview_scores:
-            weighted_sum += interview_score * weights['interview']
-            total_weight += weights['interview']
-        
-        # Calculate final score (normalize if some components are missing)
-        if total_weight > 0:
-            placement_readiness_score = weighted_sum / total_weight
-        else:
-            placement_readiness_score = 0
+        # Component averages and the weighted score come from the materialized rollup:
+        # 1. Code Practice Score - average test case pass percentage per submission
+        # 2. Non-Technical Score - average score across ALL quiz attempts
+        # 3. AI Virtual Interview Score - average final score of completed interviews
+        # Weights: Code Practice 40%, Non-Technical 30%, AI Virtual Interview 30%,
+        # normalized over the components that have data
+        stats = read_stats(user_id)
+        components = readiness_components(stats)
+        placement_readiness_score = compute_readiness(stats)
         
         return jsonify({
             'placement_readiness_score': round(placement_readiness_score, 2),
             'breakdown': {
-                'code_practice': round(code_practice_score, 2),
-                'non_technical': round(non_technical_score, 2),
-                'interview': round(interview_score, 2)
+                name: round(score, 2) for name, (score, _) in components.items()
             },
             'data_available': {
-                'code_practice': len(code_practice_scores) > 0,
-                'non_technical': len(non_technical_scores) > 0,
-                'interview': len(interview_scores) > 0
+                name: has_data for name, (_, has_data) in components.items()
             },
             'user': {
                 'id': user.id,
@@ -2,9 +2,16 @@
 Run script for the Flask application
 """
 from app import create_app
+import os
 
 if __name__ == '__main__':
-    app = create_app('development')
+    app = create_app('development', init_database=False)
+    
+    # With the debug reloader only the serving child process initializes the database
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from utils.startup import start_database_init
+        start_database_init(app)
+    
     print("Starting Interview Preparation Platform...")
     print("Backend running on http://localhost:5000")
     print("Open frontend/index.html in your browser or use a local server")
@@ -210,5 +210,9 @@ def seed_initial_data():
         db.session.add(question)
     
     db.session.commit()
+    
+    # Normalize the comma-separated tags into the tags table
+    from utils.tags import rebuild_tags
+    rebuild_tags()
     print("Database seeded successfully!")
 
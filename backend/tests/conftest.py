@@ -0,0 +1,101 @@
+"""
+Shared fixtures: a fresh app on in-memory sqlite per test (seeded like a new
+deployment), a test client, auth headers and bulk student data.
+Run from backend/ with: python -m pytest
+"""
+import os
+
+os.environ.setdefault('FLASK_ENV', 'testing')
+
+from app import create_app
+from models import (
+    User, Question, Quiz, QuizQuestion, QuizAttempt, CodeSubmission, db
+)
+from utils.auth import access_headers
+from utils.query_stats import collect_queries
+from utils.startup import wait_until_ready
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+import pytest
+import random
+
+# Hashed once: hashing per student would dominate the runtime
+_PASSWORD_HASH = generate_password_hash('password')
+
+@pytest.fixture
+def app():
+    app = create_app('testing', init_database=False)
+    assert wait_until_ready(app, 30), 'database initialization failed'
+    yield app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def headers_for(app):
+    """headers_for(username) -> Authorization headers for that user"""
+    def headers_for(username):
+        with app.app_context():
+            return access_headers(User.query.filter_by(username=username).one())
+    return headers_for
+
+@pytest.fixture
+def add_students(app):
+    """
+    add_students(count) -> create `count` more active students, each with coding
+    submissions and quiz attempts, and rebuild the rollups they feed
+    """
+    from utils.student_stats import rebuild_student_stats
+    from utils.tags import rebuild_tags
+    rnd = random.Random(1)
+    created = []
+    
+    def add_students(count):
+        with app.app_context():
+            questions = Question.query.all()
+            coding = [question for question in questions if question.type == 'coding']
+            quiz = Quiz.query.first()
+            if quiz is None:
+                quiz = Quiz(title='Practice quiz', created_by=User.query.filter_by(role='faculty').first().id)
+                db.session.add(quiz)
+                db.session.flush()
+                for order, question in enumerate(q for q in questions if q.type == 'mcq'):
+                    db.session.add(QuizQuestion(quiz_id=quiz.id, question_id=question.id, marks=5, order=order))
+            
+            for _ in range(count):
+                index = len(created)
+                student = User(username=f'student_{index}', email=f'student_{index}@example.com',
+                               role='student', full_name=f'Student {index}', batch='2025')
+                student.password_hash = _PASSWORD_HASH
+                db.session.add(student)
+                db.session.flush()
+                created.append(student.id)
+                
+                for day in range(3):
+                    question = rnd.choice(coding)
+                    db.session.add(CodeSubmission(
+                        user_id=student.id, question_id=question.id, language='python', code='pass',
+                        status=rnd.choice(['accepted', 'wrong_answer']), execution_time=0.1,
+                        test_cases_passed=rnd.randint(0, 3), total_test_cases=3,
+                        submitted_at=datetime.utcnow() - timedelta(days=day)
+                    ))
+                db.session.add(QuizAttempt(user_id=student.id, quiz_id=quiz.id, answers='{}',
+                                           score=rnd.randint(0, 100), total_marks=10,
+                                           submitted_at=datetime.utcnow()))
+            db.session.commit()
+            rebuild_tags()
+            rebuild_student_stats()
+        return list(created)
+    return add_students
+
+@pytest.fixture
+def count_queries(client):
+    """count_queries(path, headers) -> statements issued by GET path, after a warm-up request fills the caches"""
+    def count_queries(path, headers):
+        client.get(path, headers=headers)
+        with collect_queries() as stats:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return stats.count
+    return count_queries
@@ -0,0 +1,32 @@
+"""
+Batch analytics count the same submissions in every report dimension
+"""
+from models import CodeSubmission, db
+from utils.analytics import submission_stats
+
+def totals(stats):
+    return sum(entry['total'] for entry in stats.values())
+
+def test_dimensions_skip_submissions_to_deleted_questions(app, add_students):
+    student_id = add_students(3)[0]
+    with app.app_context():
+        db.session.add(CodeSubmission(user_id=student_id, question_id=10**6, language='python', code='pass',
+                                      status='accepted', test_cases_passed=1, total_test_cases=1))
+        db.session.commit()
+        
+        assert totals(submission_stats('language')) == totals(submission_stats('difficulty')) \
+            == totals(submission_stats('type')) == 9
+
+def test_topics_count_active_students_only(app, add_students):
+    from models import User
+    from utils.analytics import topic_stats
+    student_ids = add_students(4)
+    with app.app_context():
+        before = topic_stats()
+        inactive = db.session.get(User, student_ids[0])
+        inactive.is_active = False
+        db.session.commit()
+        
+        after = topic_stats()
+        assert totals(after) < totals(before)
+        assert after == topic_stats(student_ids[1:])
@@ -0,0 +1,26 @@
+"""
+Query-count regression tests for the faculty and admin analytics endpoints
+
+Each endpoint must issue the same, fixed number of statements whether the
+batch has one student or many; a per-student query (N+1) makes the count grow.
+"""
+import pytest
+
+# (username, path, statements)
+ANALYTICS_ENDPOINTS = [
+    ('faculty1', '/api/faculty/dashboard', 5),
+    ('faculty1', '/api/faculty/students/performance', 1),
+    ('faculty1', '/api/faculty/batch/weak-areas', 6),
+    ('admin', '/api/admin/dashboard', 5),
+]
+
+@pytest.mark.parametrize('username, path, expected', ANALYTICS_ENDPOINTS)
+def test_query_count_does_not_grow_with_students(add_students, headers_for, count_queries, username, path, expected):
+    headers = headers_for(username)
+    
+    add_students(1)
+    with_one = count_queries(path, headers)
+    add_students(24)
+    with_many = count_queries(path, headers)
+    
+    assert with_one == with_many == expected
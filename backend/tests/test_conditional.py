@@ -0,0 +1,43 @@
+"""
+Shared version counters behind the catalog cache and the conditional GET validators
+"""
+from models import CacheVersion, Company, db
+from utils.catalog_cache import CATALOG, get_version_stamps
+
+def test_write_in_another_worker_is_not_served_under_its_etag(app, client, headers_for):
+    headers = headers_for('admin')
+    first = client.get('/api/admin/companies', headers=headers)
+    assert first.status_code == 200
+    
+    with app.app_context():
+        # Another worker adds a company: only the shared counter tells this one
+        db.session.add(Company(name='Another Worker Inc'))
+        CacheVersion.query.filter_by(name=CATALOG).update({CacheVersion.version: CacheVersion.version + 1})
+        db.session.commit()
+        count = Company.query.count()
+        # This worker's stamps reach their TTL and pick up the new version
+        get_version_stamps().invalidate()
+    
+    second = client.get('/api/admin/companies', headers=headers)
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert len(second.get_json()['companies']) == count
+    
+    revalidated = client.get('/api/admin/companies', headers={**headers, 'If-None-Match': second.headers['ETag']})
+    assert revalidated.status_code == 304
+
+def test_counter_created_concurrently_is_still_bumped(app, monkeypatch):
+    from utils import catalog_cache
+    insert_or_select = catalog_cache.insert_or_select
+    
+    def lose_the_race(row, query):
+        # Another worker's first write created the counter
+        db.session.add(CacheVersion(name=row.name, version=1, updated_at=row.updated_at))
+        return insert_or_select(row, query)
+    
+    with app.app_context():
+        monkeypatch.setattr(catalog_cache, 'insert_or_select', lose_the_race)
+        catalog_cache.bump_version('brand-new-counter')
+        db.session.commit()
+        
+        assert CacheVersion.query.filter_by(name='brand-new-counter').one().version == 2
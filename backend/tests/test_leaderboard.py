@@ -0,0 +1,36 @@
+"""
+Rank changes cost one stream event per re-rank, and each stream only sees its own rank
+"""
+from models import Leaderboard, StreamEvent, User, db
+from utils.leaderboard import update_leaderboards, update_ranks
+import json
+
+def test_rerank_writes_one_stream_event(app, add_students):
+    app.config['PUBSUB_BACKEND'] = 'database'
+    student_ids = add_students(20)
+    with app.app_context():
+        update_leaderboards(student_ids)
+        StreamEvent.query.delete()
+        Leaderboard.query.update({Leaderboard.rank: None})
+        db.session.commit()
+        
+        update_ranks()
+        
+        events = StreamEvent.query.all()
+        assert [event.event for event in events] == ['ranks']
+        assert len(json.loads(events[0].payload)) == Leaderboard.query.count()
+
+def test_stream_passes_on_the_users_own_rank(app, client, add_students, headers_for):
+    app.config.update(STREAM_MAX_SECONDS=0.5, STREAM_HEARTBEAT_SECONDS=0.1)
+    student_ids = add_students(3)
+    with app.app_context():
+        username = db.session.get(User, student_ids[0]).username
+    response = client.get('/api/stream/', headers=headers_for(username), buffered=False)
+    
+    with app.app_context():
+        update_leaderboards(student_ids)
+        rank = Leaderboard.query.filter_by(user_id=student_ids[0]).one().rank
+    
+    body = b''.join(response.response).decode()
+    assert body.count('event: rank\n') == 1
+    assert f'"rank": {rank}' in body
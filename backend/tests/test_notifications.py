@@ -0,0 +1,43 @@
+"""
+Unread counters stay exact when another transaction creates the counter row first
+"""
+from models import NotificationCounter, User, db
+from utils import notifications
+from utils.notifications import count_unread_rows, get_unread_count, notify
+
+def test_counter_created_concurrently_still_counts_this_change(app, monkeypatch):
+    insert_or_select = notifications.insert_or_select
+    
+    def lose_the_race(row, query):
+        # The other transaction counted the tables before this one's notification
+        db.session.add(NotificationCounter(user_id=row.user_id, personal_unread=row.personal_unread - 1,
+                                           broadcast_offset=row.broadcast_offset))
+        return insert_or_select(row, query)
+    
+    with app.app_context():
+        user = User.query.filter_by(username='student1').one()
+        monkeypatch.setattr(notifications, 'insert_or_select', lose_the_race)
+        notify(user.id, title='Hello', message='First notification')
+        db.session.commit()
+        monkeypatch.setattr(notifications, 'insert_or_select', insert_or_select)
+        
+        assert NotificationCounter.query.filter_by(user_id=user.id).count() == 1
+        assert get_unread_count(user.id) == sum(count_unread_rows(user)) == 1
+
+def test_mark_all_read_twice_writes_each_receipt_once(app):
+    from models import BroadcastReceipt
+    from utils.notifications import broadcast, mark_all_read
+    with app.app_context():
+        user = User.query.filter_by(username='student1').one()
+        notify(user.id, title='Hello', message='Personal')
+        broadcast('student', title='Everyone', message='Broadcast')
+        db.session.commit()
+        assert get_unread_count(user.id) == 2
+        
+        assert mark_all_read(user) == 2
+        db.session.commit()
+        assert mark_all_read(user) == 0
+        db.session.commit()
+        
+        assert BroadcastReceipt.query.filter_by(user_id=user.id).count() == 1
+        assert get_unread_count(user.id) == sum(count_unread_rows(user)) == 0
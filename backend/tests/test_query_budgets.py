@@ -0,0 +1,77 @@
+"""
+Query budgets of the hot GET endpoints (utils/query_stats.ENDPOINT_BUDGETS)
+
+Each endpoint is requested as the first active user of its role, on a
+database populated at two sizes: questions, companies, quizzes, resources,
+students, and the requesting student's submissions, attempts, notifications
+and leaderboard entry. The count must stay within the budget and be the same
+at both sizes; a per-row query (N+1) makes it grow with the data.
+"""
+from models import Company, Question, Quiz, QuizAttempt, QuizQuestion, CodeSubmission, Resource, User, db
+from utils.auth import access_headers
+from utils.leaderboard import update_leaderboards
+from utils.notifications import broadcast, notify
+from utils.query_stats import ENDPOINT_BUDGETS, query_budget
+from utils.student_stats import rebuild_student_stats
+from utils.tags import set_question_tags
+from datetime import datetime
+import itertools
+import pytest
+
+@pytest.fixture
+def populate(app, add_students):
+    """populate(count) -> add `count` more of every kind of row the hot endpoints list"""
+    serial = itertools.count()
+    
+    def populate(count):
+        student_ids = add_students(count)
+        with app.app_context():
+            student = User.query.filter_by(role='student', is_active=True).order_by(User.id).first()
+            faculty = User.query.filter_by(role='faculty', is_active=True).order_by(User.id).first()
+            for _ in range(count):
+                n = next(serial)
+                company = Company(name=f'Company {n}')
+                db.session.add(company)
+                db.session.flush()
+                question = Question(title=f'Question {n}', description='Pick one', type='mcq', difficulty='easy',
+                                    company_id=company.id, created_by=faculty.id, options='["A", "B"]',
+                                    correct_answer='A')
+                set_question_tags(question, f'topic-{n},shared')
+                db.session.add(question)
+                quiz = Quiz(title=f'Quiz {n}', created_by=faculty.id, company_id=company.id)
+                db.session.add(quiz)
+                db.session.flush()
+                db.session.add(QuizQuestion(quiz_id=quiz.id, question_id=question.id, marks=1, order=0))
+                db.session.add(QuizAttempt(user_id=student.id, quiz_id=quiz.id, answers='{}', score=50,
+                                           total_marks=1, submitted_at=datetime.utcnow()))
+                db.session.add(CodeSubmission(user_id=student.id, question_id=question.id, language='python',
+                                              code='pass', status='accepted', test_cases_passed=1,
+                                              total_test_cases=1, submitted_at=datetime.utcnow()))
+                db.session.add(Resource(title=f'Notes {n}', type='notes', content='...', user_id=student.id,
+                                        company_id=company.id, tags='shared', is_public=n % 2 == 0))
+                notify(student.id, title=f'Notification {n}', message='Hello')
+                broadcast('student', title=f'Broadcast {n}', message='Hello everyone', created_by=faculty.id)
+            db.session.commit()
+            rebuild_student_stats()
+            update_leaderboards([student.id] + student_ids)
+    return populate
+
+@pytest.mark.parametrize('role, path, budget', ENDPOINT_BUDGETS, ids=[f'{role} {path}' for role, path, _ in ENDPOINT_BUDGETS])
+def test_endpoint_stays_within_query_budget(app, client, populate, role, path, budget):
+    with app.app_context():
+        headers = access_headers(User.query.filter_by(role=role, is_active=True).order_by(User.id).first())
+    
+    def count_queries():
+        # Per-process caches are reloaded after each populate; load them outside the budget
+        client.get(path, headers=headers)
+        with query_budget(budget) as stats:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return stats.count
+    
+    populate(2)
+    with_few = count_queries()
+    populate(10)
+    with_many = count_queries()
+    
+    assert with_few == with_many
@@ -0,0 +1,11 @@
+"""
+Query-plan regression tests: every hot query must use an index on its main table
+"""
+from utils.query_plans import explain_query, hot_queries
+import pytest
+
+@pytest.mark.parametrize('name, table, statement', hot_queries(), ids=[name for name, _, _ in hot_queries()])
+def test_hot_query_uses_an_index(app, name, table, statement):
+    with app.app_context():
+        full_scan, plan = explain_query(statement, table)
+    assert not full_scan, f'{name} scans all of {table}:\n' + '\n'.join(plan)
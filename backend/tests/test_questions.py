@@ -0,0 +1,53 @@
+"""
+Lookups the paginated practice pages make instead of loading whole lists:
+one question by id, the solved-question ids and a company by name
+"""
+from models import CodeSubmission, Company, Question, User, db
+from utils.catalog_cache import catalog_changed
+
+def test_question_by_id_returns_active_questions_only(app, client, headers_for):
+    headers = headers_for('student1')
+    with app.app_context():
+        question = Question.query.filter_by(type='mcq', is_active=True).first()
+        question_id = question.id
+    
+    response = client.get(f'/api/student/questions/{question_id}', headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()['question']
+    assert body['id'] == question_id
+    assert body['options']
+    
+    with app.app_context():
+        Question.query.get(question_id).is_active = False
+        catalog_changed()
+        db.session.commit()
+    
+    assert client.get(f'/api/student/questions/{question_id}', headers=headers).status_code == 404
+    assert client.get('/api/student/questions/999999', headers=headers).status_code == 404
+
+def test_solved_question_ids_are_distinct_accepted_questions(app, client, headers_for):
+    headers = headers_for('student1')
+    with app.app_context():
+        student = User.query.filter_by(username='student1').one()
+        coding = Question.query.filter_by(type='coding').order_by(Question.id).limit(2).all()
+        solved, attempted = coding[0].id, coding[1].id
+        for status in ['wrong_answer', 'accepted', 'accepted']:
+            db.session.add(CodeSubmission(user_id=student.id, question_id=solved, language='python',
+                                          code='pass', status=status))
+        db.session.add(CodeSubmission(user_id=student.id, question_id=attempted, language='python',
+                                      code='pass', status='wrong_answer'))
+        db.session.commit()
+    
+    response = client.get('/api/coding/submissions/solved', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['question_ids'] == [solved]
+
+def test_company_lookup_by_name_ignores_case(app, client, headers_for):
+    headers = headers_for('student1')
+    with app.app_context():
+        db.session.add(Company(name='Lookup Corp'))
+        db.session.commit()
+    
+    found = client.get('/api/admin/companies?name=lookup corp', headers=headers).get_json()['companies']
+    assert [c['name'] for c in found] == ['Lookup Corp']
+    assert client.get('/api/admin/companies?name=Nobody', headers=headers).get_json()['companies'] == []
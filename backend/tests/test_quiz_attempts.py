@@ -0,0 +1,41 @@
+"""
+Submitting a quiz without starting it gets the same checks as starting it
+"""
+from models import Question, Quiz, QuizQuestion, User, db
+from datetime import datetime, timedelta
+import pytest
+
+@pytest.fixture
+def make_quiz(app):
+    """make_quiz(**columns) -> id of a one-question MCQ quiz"""
+    def make_quiz(**columns):
+        with app.app_context():
+            question = Question.query.filter_by(type='mcq').first()
+            quiz = Quiz(title='Timed quiz', created_by=User.query.filter_by(username='faculty1').one().id, **columns)
+            db.session.add(quiz)
+            db.session.flush()
+            db.session.add(QuizQuestion(quiz_id=quiz.id, question_id=question.id, marks=5, order=0))
+            db.session.commit()
+            return quiz.id
+    return make_quiz
+
+def submit(client, headers, quiz_id):
+    return client.post(f'/api/quiz/{quiz_id}/attempt', headers=headers, json={'answers': {}})
+
+@pytest.mark.parametrize('columns, status', [
+    ({'start_time': datetime.utcnow() + timedelta(days=1)}, 403),
+    ({'is_active': False}, 403),
+    ({'end_time': datetime.utcnow() - timedelta(minutes=5)}, 403),
+    ({'duration_minutes': 30}, 409),
+    ({'duration_minutes': 0, 'end_time': datetime.utcnow() + timedelta(days=1)}, 409),
+    ({'duration_minutes': 0}, 200),
+])
+def test_submit_without_start(client, headers_for, make_quiz, columns, status):
+    response = submit(client, headers_for('student1'), make_quiz(**columns))
+    assert response.status_code == status, response.get_data(as_text=True)
+
+def test_submit_after_start(client, headers_for, make_quiz):
+    headers = headers_for('student1')
+    quiz_id = make_quiz(duration_minutes=30)
+    assert client.post(f'/api/quiz/{quiz_id}/start', headers=headers).status_code == 200
+    assert submit(client, headers, quiz_id).status_code == 200
@@ -0,0 +1,25 @@
+"""
+Tag counters stay equal to a full recount when a question is retagged
+"""
+from models import CodeSubmission, Question, Tag, db
+from utils.tags import refresh_tag_counters
+
+def tag_counters():
+    return {tag.name: (tag.total_attempts, tag.accepted_attempts) for tag in Tag.query.all()}
+
+def test_retagging_moves_the_question_counts(app, client, add_students, headers_for):
+    add_students(5)
+    with app.app_context():
+        question_id, tags = db.session.query(Question.id, Question.tags)\
+            .join(CodeSubmission, CodeSubmission.question_id == Question.id).first()
+    
+    new_tags = tags.split(',')[:1] + ['brand-new']
+    response = client.put(f'/api/faculty/questions/{question_id}', headers=headers_for('faculty1'),
+                          json={'tags': ','.join(new_tags)})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    
+    with app.app_context():
+        maintained = tag_counters()
+        refresh_tag_counters()
+        assert maintained == tag_counters()
+        assert maintained['brand-new'][0] > 0
@@ -0,0 +1,45 @@
+"""
+insert_or_select(): losing a first-insert race must not fail or undo the caller's transaction
+"""
+from models import StudentStats, StudentDailyActivity, Tag, User, db
+from utils.student_stats import empty_stats, get_daily_activity
+from utils.transactions import after_commit, insert_or_select
+from datetime import datetime
+
+def test_duplicate_insert_returns_the_existing_row(app):
+    with app.app_context():
+        user_id = User.query.filter_by(username='student1').one().id
+        db.session.add(empty_stats(user_id))
+        db.session.commit()
+        existing_id = StudentStats.query.filter_by(user_id=user_id).one().id
+        
+        # Work done earlier in the same transaction
+        db.session.add(Tag(name='earlier-work', total_attempts=0, accepted_attempts=0))
+        committed = []
+        after_commit(lambda: committed.append(True))
+        
+        stats = insert_or_select(empty_stats(user_id), StudentStats.query.filter_by(user_id=user_id))
+        db.session.commit()
+        
+        assert stats.id == existing_id
+        assert StudentStats.query.filter_by(user_id=user_id).count() == 1
+        assert Tag.query.filter_by(name='earlier-work').count() == 1
+        assert committed == [True]
+
+def test_concurrently_created_activity_bucket_is_reused(app):
+    with app.app_context():
+        user_id = User.query.filter_by(username='student1').one().id
+        now = datetime.utcnow()
+        first = get_daily_activity(user_id, now)
+        first.submissions = 1
+        db.session.commit()
+        
+        query = StudentDailyActivity.query.filter_by(user_id=user_id, day=now.date())
+        activity = insert_or_select(StudentDailyActivity(
+            user_id=user_id, day=now.date(), submissions=0, accepted_submissions=0,
+            quiz_attempts=0, quiz_score_sum=0.0, interviews=0, interview_score_sum=0.0
+        ), query.with_for_update())
+        activity.submissions += 1
+        db.session.commit()
+        
+        assert query.one().submissions == 2
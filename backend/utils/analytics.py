@@ -0,0 +1,148 @@
+"""
+Set-based analytics queries for faculty and admin dashboards
+
+Every query helper here issues a single set-based query regardless of how
+many students are involved, so dashboard pages cost a constant number of
+queries.
+"""
+from models import User, Question, CodeSubmission, Quiz, QuizAttempt, Tag, QuestionTag, StudentStats, db
+from sqlalchemy import func, case
+from bisect import bisect_right
+
+def _accepted_sum():
+    """SUM expression counting accepted submissions"""
+    return func.sum(case((CodeSubmission.status == 'accepted', 1), else_=0))
+
+def _restrict_to_students(query, user_column, student_ids=None):
+    """Limit a query to active students, or to an explicit list of user IDs"""
+    if student_ids is not None:
+        return query.filter(user_column.in_(student_ids))
+    return query.join(User, User.id == user_column)\
+        .filter(User.role == 'student', User.is_active == True)
+
+def batch_totals(student_ids=None):
+    """
+    Submission and quiz totals across the batch
+    Returns: dict with total_submissions, accepted_submissions,
+             total_quiz_attempts and total_quiz_score
+    """
+    submission_query = db.session.query(
+        func.count(CodeSubmission.id),
+        _accepted_sum()
+    )
+    submission_query = _restrict_to_students(submission_query, CodeSubmission.user_id, student_ids)
+    total_submissions, accepted = submission_query.one()
+    
+    quiz_query = db.session.query(
+        func.count(QuizAttempt.id),
+        func.sum(QuizAttempt.score)
+    )
+    quiz_query = _restrict_to_students(quiz_query, QuizAttempt.user_id, student_ids)
+    total_attempts, total_score = quiz_query.one()
+    
+    return {
+        'total_submissions': total_submissions or 0,
+        'accepted_submissions': int(accepted or 0),
+        'total_quiz_attempts': total_attempts or 0,
+        'total_quiz_score': float(total_score or 0)
+    }
+
+def submission_stats(dimension, student_ids=None):
+    """
+    Total/accepted submission counts grouped by a dimension
+    dimension: 'language', 'difficulty' or 'type'
+    Returns {key: {'total', 'accepted'}}
+    """
+    if dimension == 'language':
+        key_column = CodeSubmission.language
+    elif dimension == 'difficulty':
+        key_column = func.coalesce(Question.difficulty, 'unknown')
+    elif dimension == 'type':
+        key_column = func.coalesce(Question.type, 'unknown')
+    else:
+        raise ValueError(f'Unknown submission dimension: {dimension}')
+    
+    # Submissions to deleted questions are left out of every dimension
+    query = db.session.query(key_column, func.count(CodeSubmission.id), _accepted_sum())\
+        .join(Question, Question.id == CodeSubmission.question_id)
+    query = _restrict_to_students(query, CodeSubmission.user_id, student_ids)
+    
+    rows = query.group_by(key_column).all()
+    
+    return {
+        key: {'total': total, 'accepted': int(accepted or 0)}
+        for key, total, accepted in rows
+    }
+
+def topic_stats(student_ids=None):
+    """
+    Total/accepted submission counts per tag, for the same students as submission_stats
+    (the counters on the tags table count every student, inactive ones included)
+    Returns {tag name: {'total', 'accepted'}}
+    """
+    query = db.session.query(Tag.name, func.count(CodeSubmission.id), _accepted_sum())\
+        .select_from(CodeSubmission)\
+        .join(QuestionTag, QuestionTag.question_id == CodeSubmission.question_id)\
+        .join(Tag, Tag.id == QuestionTag.tag_id)
+    query = _restrict_to_students(query, CodeSubmission.user_id, student_ids)
+    
+    return {
+        name: {'total': total, 'accepted': int(accepted or 0)}
+        for name, total, accepted in query.group_by(Tag.name).all()
+    }
+
+def quiz_score_stats():
+    """Return a list of {'quiz_id', 'quiz_title', 'avg_score', 'total_attempts'} for every attempted quiz"""
+    rows = db.session.query(
+        QuizAttempt.quiz_id,
+        Quiz.title,
+        func.avg(QuizAttempt.score),
+        func.count(QuizAttempt.id)
+    ).outerjoin(Quiz, Quiz.id == QuizAttempt.quiz_id)\
+        .group_by(QuizAttempt.quiz_id, Quiz.title).all()
+    
+    return [{
+        'quiz_id': quiz_id,
+        'quiz_title': title or 'Unknown',
+        'avg_score': float(avg_score or 0),
+        'total_attempts': attempts
+    } for quiz_id, title, avg_score, attempts in rows]
+
+def user_counts():
+    """Return {(role, is_active): count} for all users in one query"""
+    rows = db.session.query(User.role, User.is_active, func.count(User.id))\
+        .group_by(User.role, User.is_active).all()
+    return {(role, bool(is_active)): count for role, is_active, count in rows}
+
+def cohort_readiness(batch=None):
+    """
+    Active students of a cohort with their precomputed readiness, in one query
+    Returns: list of (user, stats) sorted by readiness score ascending;
+             stats is None for students with no recorded activity
+    """
+    score = func.coalesce(StudentStats.readiness_score, 0)
+    query = db.session.query(User, StudentStats)\
+        .outerjoin(StudentStats, StudentStats.user_id == User.id)\
+        .filter(User.role == 'student', User.is_active == True)
+    if batch:
+        query = query.filter(User.batch == batch)
+    return query.order_by(score.asc(), User.id.asc()).all()
+
+def percentile_rank(sorted_scores, score):
+    """Percentage of the cohort scoring at or below the given score"""
+    if not sorted_scores:
+        return 0
+    return bisect_right(sorted_scores, score) / len(sorted_scores) * 100
+
+def score_histogram(scores, bins=10, low=0, high=100):
+    """Bucket 0-100 scores into equal-width bins (the last bin includes the upper bound)"""
+    width = (high - low) / bins
+    counts = [0] * bins
+    for score in scores:
+        index = int((score - low) // width) if width else 0
+        counts[min(max(index, 0), bins - 1)] += 1
+    return [{
+        'range_start': round(low + i * width, 2),
+        'range_end': round(low + (i + 1) * width, 2),
+        'count': counts[i]
+    } for i in range(bins)]
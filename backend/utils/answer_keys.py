@@ -0,0 +1,92 @@
+"""
+Compiled per-quiz answer keys for grading
+
+compile_answer_key() reads a quiz's questions and answers in one query and
+reduces them to plain data (marks, MCQ answers, normalized blank answers);
+grade_attempt() is then a pure in-memory pass over the submitted answers.
+Keys are held in the catalog cache, which question edits clear, under the
+current quizzes version, which quiz writes bump.
+"""
+from models import Quiz, QuizQuestion, Question, db
+from utils.catalog_cache import QUIZZES, cached_catalog, get_version_stamps
+import json
+
+def _normalize(answer):
+    return str(answer or '').lower().strip()
+
+def compile_answer_key(quiz_id):
+    """Answer key of a quiz as plain data, or None if the quiz does not exist"""
+    quiz = db.session.query(Quiz.id, Quiz.title, Quiz.end_time).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        return None
+    
+    rows = db.session.query(
+        QuizQuestion.question_id, QuizQuestion.marks,
+        Question.type, Question.correct_answer, Question.blanks
+    ).join(Question, Question.id == QuizQuestion.question_id)\
+        .filter(QuizQuestion.quiz_id == quiz_id)\
+        .order_by(QuizQuestion.order, QuizQuestion.id).all()
+    
+    questions = []
+    for question_id, marks, question_type, correct_answer, blanks in rows:
+        questions.append({
+            'id': question_id,
+            'type': question_type,
+            'marks': marks,
+            'correct_answer': correct_answer,
+            # [(blank id as sent by the client, normalized answer)]
+            'blanks': [
+                (str(blank.get('id')), _normalize(blank.get('answer', '')))
+                for blank in (json.loads(blanks) if blanks else [])
+            ] if question_type == 'fill_blank' else []
+        })
+    return {
+        'quiz_id': quiz.id,
+        'title': quiz.title,
+        'end_time': quiz.end_time,
+        'total_marks': sum(question['marks'] for question in questions),
+        'questions': questions
+    }
+
+def get_answer_key(quiz_id):
+    """Cached answer key of a quiz (read-only), or None if the quiz does not exist"""
+    quizzes_version = get_version_stamps().read([QUIZZES])[QUIZZES][0]
+    return cached_catalog(('answer_key', int(quiz_id), quizzes_version),
+                          lambda: compile_answer_key(quiz_id))
+
+def grade_attempt(key, answers):
+    """
+    Grade {question_id: answer} against a compiled key (no database access)
+    MCQ answers must match exactly; blanks earn partial marks, compared case-insensitively.
+    Returns (obtained_marks, question_results)
+    """
+    obtained_marks = 0
+    question_results = {}
+    
+    for question in key['questions']:
+        user_answer = answers.get(str(question['id']))
+        question_marks = 0
+        is_correct = False
+        
+        if question['type'] == 'mcq':
+            if user_answer == question['correct_answer']:
+                question_marks = question['marks']
+                is_correct = True
+        elif question['type'] == 'fill_blank' and question['blanks']:
+            user_blanks = user_answer if isinstance(user_answer, dict) else {}
+            correct_count = sum(
+                1 for blank_id, correct in question['blanks']
+                if _normalize(user_blanks.get(blank_id, '')) == correct
+            )
+            question_marks = (correct_count / len(question['blanks'])) * question['marks']
+            is_correct = correct_count == len(question['blanks'])
+        
+        obtained_marks += question_marks
+        question_results[question['id']] = {
+            'is_correct': is_correct,
+            'marks_obtained': question_marks,
+            'marks_total': question['marks'],
+            'user_answer': answers.get(str(question['id']), ''),
+            'correct_answer': question['correct_answer']
+        }
+    return obtained_marks, question_results
@@ -1,10 +1,40 @@
 """
 Authentication utilities
+
+Access tokens carry the user's role and active flag as claims, so protected
+routes authorize without loading the user. Changes that must take effect
+before a token expires (role change, deactivation, deletion) revoke the
+user's earlier tokens through the token_revocations table, which each
+worker reloads at most every TOKEN_REVOCATION_TTL seconds.
 """
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from models import User, db
+from flask import jsonify, current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from models import User, TokenRevocation, db
+from utils.catalog_cache import invalidate_after_commit
+from datetime import datetime, timezone
+import time
+
+def token_claims(user):
+    """Additional claims for the user's access tokens"""
+    return {'role': user.role, 'active': bool(user.is_active)}
+
+def access_headers(user):
+    """Authorization header with a fresh access token for user (maintenance commands)"""
+    from flask_jwt_extended import create_access_token
+    token = create_access_token(identity=user.id, additional_claims=token_claims(user))
+    return {'Authorization': f'Bearer {token}'}
+
+def current_role():
+    """
+    Role of the authenticated user, None if the account is inactive
+    Read from the token claims; tokens issued before claims existed fall back to the database
+    """
+    claims = get_jwt()
+    if 'role' in claims:
+        return claims['role'] if claims.get('active', True) else None
+    user = User.query.get(get_jwt_identity())
+    return user.role if user and user.is_active else None
 
 def role_required(roles):
     """Decorator to check if user has required role"""
@@ -12,10 +42,8 @@ def role_required(roles):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
             
-            if not user or user.role not in roles:
+            if current_role() not in roles:
                 return jsonify({'error': 'Insufficient permissions'}), 403
             
             return f(*args, **kwargs)
@@ -31,3 +59,65 @@ def get_current_user():
     except:
         return None
 
+class RevocationList:
+    """Per-process copy of the recent token revocations, reloaded on a TTL"""
+    
+    def __init__(self, ttl=5.0, max_age=None):
+        self.ttl = ttl
+        # Revocations older than the access token lifetime cannot match a live token
+        self.max_age = max_age
+        self._revoked = {}
+        self._loaded_at = None
+    
+    def _load(self):
+        query = db.session.query(TokenRevocation.user_id, TokenRevocation.revoked_at)
+        if self.max_age:
+            query = query.filter(TokenRevocation.revoked_at >= datetime.utcnow() - self.max_age)
+        return {
+            user_id: revoked_at.replace(tzinfo=timezone.utc).timestamp()
+            for user_id, revoked_at in query
+        }
+    
+    def revoked_at(self, user_id):
+        """Epoch seconds of the user's latest revocation, or None"""
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.ttl:
+            self._revoked = self._load()
+            self._loaded_at = now
+        return self._revoked.get(user_id)
+    
+    def invalidate(self):
+        self._loaded_at = None
+
+def get_revocation_list():
+    """The revocation list of the current app (one per process)"""
+    revocations = current_app.extensions.get('token_revocations')
+    if revocations is None:
+        revocations = RevocationList(
+            ttl=current_app.config.get('TOKEN_REVOCATION_TTL', 5),
+            max_age=current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES')
+        )
+        revocations = current_app.extensions.setdefault('token_revocations', revocations)
+    return revocations
+
+def revoke_user_tokens(user_id):
+    """
+    Reject the access tokens issued to a user so far (call before commit)
+    The user keeps access through /api/auth/refresh or a new login, which issue fresh claims.
+    """
+    entry = TokenRevocation.query.get(user_id)
+    if entry is None:
+        entry = TokenRevocation(user_id=user_id)
+        db.session.add(entry)
+    entry.revoked_at = datetime.utcnow()
+    invalidate_after_commit(get_revocation_list())
+
+def register_token_checks(jwt):
+    """Reject revoked access tokens on every protected request"""
+    @jwt.token_in_blocklist_loader
+    def token_revoked(jwt_header, jwt_payload):
+        if jwt_payload.get('type') != 'access':
+            return False
+        revoked_at = get_revocation_list().revoked_at(int(jwt_payload['sub']))
+        # iat has one-second resolution, so a token from the revocation second is rejected too
+        return revoked_at is not None and jwt_payload['iat'] <= revoked_at
@@ -0,0 +1,182 @@
+"""
+Read-through cache for the question and company catalog
+
+Each worker process keeps a bounded LRU of serialized catalog data. Writes
+bump a shared version counter in the cache_versions table in the same
+transaction; workers re-read the counters at most every
+CATALOG_VERSION_TTL seconds and drop their entries when the catalog one
+has moved, so all gunicorn workers converge on fresh data within the TTL
+(immediately in the worker that made the change).
+
+Cached values are shared between requests and must be treated as read-only.
+Misses are single-flight: when many requests want the same missing key
+(a quiz opening for a whole batch), one loads it and the rest wait.
+The cache reads the catalog counter through the same per-process
+VersionStamps that back the conditional GET validators in
+utils/conditional.py, so a body is never older than the ETag sent with it.
+"""
+from flask import current_app
+from models import CacheVersion, Question, db
+from utils.transactions import after_commit, insert_or_select
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import time
+
+CATALOG = 'catalog'
+QUIZZES = 'quizzes'
+POSTS = 'posts'
+
+def bump_version(name):
+    """Atomically advance a shared version counter (joins the caller's transaction)"""
+    query = CacheVersion.query.filter_by(name=name)
+    def bump():
+        return query.update({
+            CacheVersion.version: CacheVersion.version + 1,
+            CacheVersion.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+    if not bump():
+        counter = CacheVersion(name=name, version=1, updated_at=datetime.utcnow())
+        # The first write under a new counter may race another worker's
+        if insert_or_select(counter, query.with_for_update()) is not counter:
+            bump()
+    after_commit(get_version_stamps().invalidate)
+
+class VersionStamps:
+    """Per-process copy of all version counters, reloaded on a TTL"""
+    
+    def __init__(self, ttl=2.0):
+        self.ttl = ttl
+        self._stamps = {}
+        self._loaded_at = None
+    
+    def read(self, names):
+        """{name: (version, updated_at)}; counters never bumped are (0, None)"""
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.ttl:
+            # Column query so the values never come from the session identity map
+            self._stamps = {
+                name: (version, updated_at)
+                for name, version, updated_at in db.session.query(
+                    CacheVersion.name, CacheVersion.version, CacheVersion.updated_at
+                )
+            }
+            self._loaded_at = now
+        return {name: self._stamps.get(name, (0, None)) for name in names}
+    
+    def invalidate(self):
+        self._loaded_at = None
+
+def get_version_stamps():
+    """The version stamps of the current app (one per process)"""
+    stamps = current_app.extensions.get('version_stamps')
+    if stamps is None:
+        stamps = VersionStamps(ttl=current_app.config.get('CATALOG_VERSION_TTL', 2))
+        stamps = current_app.extensions.setdefault('version_stamps', stamps)
+    return stamps
+
+class CatalogCache:
+    """Bounded LRU invalidated by a shared version counter (read through VersionStamps)"""
+    
+    def __init__(self, stamps, maxsize=512):
+        self.stamps = stamps
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}  # key -> lock held by the thread loading it
+        self._version = None
+    
+    def _sync_version(self):
+        # Same stamps as the conditional GET validators, which only move forward:
+        # an entry is never older than the version in the response's ETag
+        version = self.stamps.read([CATALOG])[CATALOG][0]
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+        return version
+    
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss"""
+        version = self._sync_version()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            loading = self._loading.setdefault(key, threading.Lock())
+        
+        # Single flight: one thread loads a missing key while concurrent
+        # callers for the same key wait for its result
+        with loading:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+            try:
+                value = loader()
+                self._store(key, value, version)
+            finally:
+                with self._lock:
+                    if self._loading.get(key) is loading:
+                        del self._loading[key]
+        return value
+    
+    def _store(self, key, value, version):
+        with self._lock:
+            # Skip values loaded while an invalidation was in flight
+            if self._version == version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+    
+    def __len__(self):
+        return len(self._entries)
+
+def get_catalog_cache():
+    """The catalog cache of the current app (one per process)"""
+    cache = current_app.extensions.get('catalog_cache')
+    if cache is None:
+        cache = CatalogCache(
+            get_version_stamps(),
+            maxsize=current_app.config.get('CATALOG_CACHE_SIZE', 512)
+        )
+        cache = current_app.extensions.setdefault('catalog_cache', cache)
+    return cache
+
+def cached_catalog(key, loader):
+    """Read-through helper: cached_catalog(('companies',), lambda: [...])"""
+    return get_catalog_cache().get_or_load(key, loader)
+
+def catalog_changed():
+    """
+    Record a question/company catalog write (call before commit)
+    Bumps the shared version in the caller's transaction; this worker's
+    cache is cleared once the transaction commits.
+    """
+    bump_version(CATALOG)
+    invalidate_after_commit(get_catalog_cache())
+
+def quizzes_changed():
+    """Record a quiz or quiz membership write (call before commit)"""
+    bump_version(QUIZZES)
+
+def posts_changed():
+    """Record a post write (call before commit)"""
+    bump_version(POSTS)
+
+def invalidate_after_commit(cache):
+    """Call cache.invalidate() once the current transaction commits (dropped on rollback)"""
+    after_commit(cache.invalidate)
+
+def get_question_data(question_id):
+    """Serialized question (Question.to_dict()) by id, or None"""
+    def load():
+        question = Question.query.get(question_id)
+        return question.to_dict() if question else None
+    return cached_catalog(('question', int(question_id)), load)
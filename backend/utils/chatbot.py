@@ -1,10 +1,10 @@
 """
 AI Chatbot utilities for virtual interviews with structured flow
 """
-import requests
 import json
 import re
 from config import Config
+from utils.metrics import external_call
 
 def get_system_prompt(interview_type='technical', experience_level='fresher', resume_text='', job_description=''):
     """
@@ -92,6 +92,7 @@ def generate_interview_question(resume_text, job_description, phase='introductio
     - phase: 'introduction', 'resume', 'jd', 'general'
     - Adaptive difficulty based on previous_answer_score
     """
+    import requests
     # FIRST QUESTION: Always "Tell me about yourself"
     if question_number == 0:
         if interview_type == 'technical':
@@ -202,8 +203,9 @@ Return ONLY the question, no additional text."""
                 'temperature': 0.7
             }
             
-            response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
-            response.raise_for_status()
+            with external_call('ai'):
+                response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
+                response.raise_for_status()
             data = response.json()
             
             if 'choices' in data and len(data['choices']) > 0:
@@ -284,6 +286,7 @@ def evaluate_answer(question, answer, question_type='technical', resume_text='',
         'overall_score': float (0-10)
     }
     """
+    import requests
     if Config.AI_API_KEY:
         try:
             prompt = f"""Evaluate this interview answer and provide scores.
@@ -326,8 +329,9 @@ Return your response in this EXACT JSON format:
                 'temperature': 0.5
             }
             
-            response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
-            response.raise_for_status()
+            with external_call('ai'):
+                response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
+                response.raise_for_status()
             data = response.json()
             
             if 'choices' in data and len(data['choices']) > 0:
@@ -388,6 +392,7 @@ def generate_interview_summary(conversation_history, resume_text, job_descriptio
     """
     Generate final interview summary with strengths, weaknesses, and suggestions
     """
+    import requests
     if not Config.AI_API_KEY:
         return "Interview completed. Review your answers and continue practicing."
     
@@ -440,8 +445,9 @@ Be constructive, professional, and actionable."""
             'temperature': 0.7
         }
         
-        response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=20)
-        response.raise_for_status()
+        with external_call('ai'):
+            response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=20)
+            response.raise_for_status()
         data = response.json()
         
         if 'choices' in data and len(data['choices']) > 0:
@@ -1,7 +1,6 @@
 """
 Code compiler integration utilities
 """
-import requests
 import json
 import subprocess
 import tempfile
@@ -9,12 +8,14 @@ import os
 import time
 import platform
 from config import Config
+from utils.metrics import external_call
 
 def execute_code(code, language, stdin=''):
     """
     Execute code using online compiler API or local compilation
     Returns: (output, status, execution_time, memory)
     """
+    import requests
     language_map = {
         'c': 'c',
         'cpp': 'cpp17',
@@ -34,7 +35,8 @@ def execute_code(code, language, stdin=''):
         }
         
         try:
-            response = requests.post(Config.COMPILER_API_URL, json=payload, timeout=10)
+            with external_call('compiler'):
+                response = requests.post(Config.COMPILER_API_URL, json=payload, timeout=10)
             data = response.json()
             
             output = data.get('output', '')
@@ -62,31 +64,44 @@ def execute_code(code, language, stdin=''):
         return str(e), 'runtime_error', 0.0, 0.0
 
 def _execute_python(code, stdin=''):
-    """Execute Python code locally"""
-    import io
+    """Execute Python code locally in a separate interpreter"""
     import sys
     
-    # Capture stdout
-    old_stdout = sys.stdout
-    old_stdin = sys.stdin
-    sys.stdout = buffer = io.StringIO()
-    sys.stdin = io.StringIO(stdin)
-    
+    # A child process rather than exec() with a swapped sys.stdout: the swap is
+    # process-wide, so concurrent requests on threaded workers mixed their output
+    temp_dir = tempfile.mkdtemp()
     try:
+        code_file = os.path.join(temp_dir, 'main.py')
+        with open(code_file, 'w', encoding='utf-8') as f:
+            f.write(code)
+        
         start_time = time.time()
-        exec(code)
+        run_result = subprocess.run(
+            [sys.executable, code_file],
+            input=stdin,
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=temp_dir
+        )
         execution_time = time.time() - start_time
         
-        # Get output
-        output = buffer.getvalue()
-        sys.stdout = old_stdout
-        sys.stdin = old_stdin
+        if run_result.returncode != 0:
+            return run_result.stderr or "Runtime error", 'runtime_error', execution_time, 0.0
+        
+        return run_result.stdout, 'accepted', execution_time, 10.0
         
-        return output, 'accepted', execution_time, 10.0
+    except subprocess.TimeoutExpired:
+        return "Execution timeout", 'timeout', 0.0, 0.0
     except Exception as e:
-        sys.stdout = old_stdout
-        sys.stdin = old_stdin
         return str(e), 'runtime_error', 0.0, 0.0
+    finally:
+        # Cleanup
+        try:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        except:
+            pass
 
 def _execute_cpp(code, stdin=''):
     """Execute C++ code locally using g++ or fallback to online API"""
@@ -278,6 +293,7 @@ def _execute_java(code, stdin=''):
 
 def _execute_online(code, language, stdin=''):
     """Execute code using free online compiler API (Piston API)"""
+    import requests
     try:
         # Use Piston API (free, no authentication required)
         piston_url = 'https://emkc.org/api/v2/piston/execute'
@@ -303,7 +319,8 @@ def _execute_online(code, language, stdin=''):
             'stdin': stdin
         }
         
-        response = requests.post(piston_url, json=payload, timeout=15)
+        with external_call('compiler'):
+            response = requests.post(piston_url, json=payload, timeout=15)
         
         if response.status_code == 200:
             data = response.json()
@@ -0,0 +1,58 @@
+"""
+Negotiated response compression (brotli or gzip) for large bodies
+
+Responses of a compressible type and at least COMPRESS_MIN_SIZE bytes are
+compressed with the best encoding the client accepts: brotli when the
+optional brotli package is installed, otherwise gzip. Streamed responses and
+file downloads pass through untouched.
+"""
+from flask import request
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional dependency, see requirements.txt
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'text/html', 'text/plain', 'text/csv', 'text/css'
+}
+
+def compress_body(body, encoding, config):
+    """Compress bytes with 'br' or 'gzip' at the configured level"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=config.get('COMPRESS_BROTLI_QUALITY', 4))
+    return gzip.compress(body, compresslevel=config.get('COMPRESS_GZIP_LEVEL', 6), mtime=0)
+
+def negotiate_encoding():
+    """The encoding to use for the current request, or None"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+def register_compression(app):
+    """Compress eligible responses of the app"""
+    
+    @app.after_request
+    def compress_response(response):
+        min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        if (not min_size
+                or response.direct_passthrough
+                or response.is_streamed
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+        
+        response.set_data(compress_body(body, encoding, app.config))
+        response.headers['Content-Encoding'] = encoding
+        return response
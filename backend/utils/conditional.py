@@ -0,0 +1,68 @@
+"""
+Conditional GET (weak ETag / Last-Modified) for catalog endpoints
+
+Validators are derived from the shared version counters in cache_versions,
+which every write bumps in its own transaction, plus the request's path and
+query string, never from the response body. A client that already holds the
+current representation gets its 304 before the view runs any query or
+serializes anything. Like the catalog cache, other workers see a write
+within CATALOG_VERSION_TTL seconds.
+"""
+from flask import request, make_response
+from utils.catalog_cache import get_version_stamps
+from datetime import datetime, timedelta
+from functools import wraps
+import hashlib
+
+def _etag(names, stamps):
+    versions = '.'.join(f'{name}{stamps[name][0]}' for name in names)
+    variant = hashlib.sha1(request.full_path.encode()).hexdigest()[:12]
+    return f'{versions}-{variant}'
+
+def _last_modified(stamps):
+    """Latest change, or None while it is still within the current second"""
+    changed = [updated_at for _, updated_at in stamps.values() if updated_at]
+    if not changed:
+        return None
+    last = max(changed).replace(microsecond=0)
+    # HTTP dates have one-second resolution; a second write in this same second
+    # would carry the same Last-Modified, so don't offer it yet
+    if last + timedelta(seconds=1) > datetime.utcnow():
+        return None
+    return last
+
+def _with_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    # Authenticated data: browsers may keep it but must revalidate every time
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def conditional(*names):
+    """
+    Answer GETs with 304 while the named version counters are unchanged
+    @conditional(CATALOG, QUIZZES) below the auth decorators
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            stamps = get_version_stamps().read(names)
+            etag = _etag(names, stamps)
+            last_modified = _last_modified(stamps)
+            
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = bool(last_modified and since and since.replace(tzinfo=None) >= last_modified)
+            if not_modified:
+                return _with_validators(make_response('', 304), etag, last_modified)
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _with_validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,191 @@
+"""
+Streaming CSV/NDJSON exports for cohort analytics
+
+Rows are read through a server-side cursor in yield_per batches and written
+out one line at a time, so memory stays constant regardless of cohort size.
+"""
+from models import (
+    User, Company, Question, CodeSubmission, Quiz, QuizAttempt,
+    InterviewSession, InterviewResult, StudentStats, db
+)
+from sqlalchemy import select, case, func
+from datetime import datetime, date, timedelta
+import csv
+import io
+import json
+
+EXPORT_BATCH_SIZE = 500
+
+def _average(total, count):
+    """SQL expression for total / count, or 0 when count is zero"""
+    return case((count > 0, total / count), else_=0)
+
+def _submissions(filters):
+    statement = select(
+        CodeSubmission.id.label('submission_id'),
+        CodeSubmission.user_id,
+        User.username,
+        User.batch,
+        CodeSubmission.question_id,
+        Question.title.label('question_title'),
+        Question.difficulty,
+        Company.name.label('company'),
+        CodeSubmission.language,
+        CodeSubmission.status,
+        CodeSubmission.test_cases_passed,
+        CodeSubmission.total_test_cases,
+        CodeSubmission.execution_time,
+        CodeSubmission.submitted_at
+    ).join(User, User.id == CodeSubmission.user_id)\
+        .join(Question, Question.id == CodeSubmission.question_id)\
+        .outerjoin(Company, Company.id == Question.company_id)\
+        .order_by(CodeSubmission.id)
+    return _apply_filters(statement, filters, CodeSubmission.submitted_at, Question.company_id)
+
+def _quiz_attempts(filters):
+    statement = select(
+        QuizAttempt.id.label('attempt_id'),
+        QuizAttempt.user_id,
+        User.username,
+        User.batch,
+        QuizAttempt.quiz_id,
+        Quiz.title.label('quiz_title'),
+        Company.name.label('company'),
+        QuizAttempt.score,
+        QuizAttempt.total_marks,
+        QuizAttempt.time_taken_minutes,
+        QuizAttempt.started_at,
+        QuizAttempt.submitted_at
+    ).join(User, User.id == QuizAttempt.user_id)\
+        .join(Quiz, Quiz.id == QuizAttempt.quiz_id)\
+        .outerjoin(Company, Company.id == Quiz.company_id)\
+        .order_by(QuizAttempt.id)
+    return _apply_filters(statement, filters, QuizAttempt.submitted_at, Quiz.company_id)
+
+def _interviews(filters):
+    # Chatbot interviews have no InterviewResult row, so start from the session
+    statement = select(
+        InterviewSession.id.label('session_id'),
+        InterviewSession.user_id,
+        User.username,
+        User.batch,
+        InterviewSession.interview_type,
+        InterviewSession.experience_level,
+        InterviewSession.final_score,
+        InterviewResult.introduction_score,
+        InterviewResult.projects_resume_score,
+        InterviewResult.programming_score,
+        InterviewResult.jd_gap_skills_score,
+        InterviewResult.communication_score,
+        InterviewResult.hr_introduction_score,
+        InterviewResult.hr_communication_score,
+        InterviewResult.hr_confidence_score,
+        InterviewResult.hr_behavioral_score,
+        InterviewSession.started_at,
+        InterviewSession.ended_at
+    ).join(User, User.id == InterviewSession.user_id)\
+        .outerjoin(InterviewResult, InterviewResult.session_id == InterviewSession.id)\
+        .where(InterviewSession.is_completed == True)\
+        .order_by(InterviewSession.id)
+    return _apply_filters(statement, filters, InterviewSession.ended_at, None)
+
+def _readiness(filters):
+    statement = select(
+        User.id.label('user_id'),
+        User.username,
+        User.full_name,
+        User.batch,
+        func.coalesce(StudentStats.readiness_score, 0).label('placement_readiness_score'),
+        func.coalesce(_average(StudentStats.code_practice_sum, StudentStats.code_practice_count), 0).label('code_practice'),
+        func.coalesce(_average(StudentStats.quiz_score_sum, StudentStats.total_quizzes), 0).label('non_technical'),
+        func.coalesce(_average(StudentStats.interview_score_sum, StudentStats.total_interviews), 0).label('interview'),
+        func.coalesce(StudentStats.total_submissions, 0).label('total_submissions'),
+        func.coalesce(StudentStats.accepted_submissions, 0).label('accepted_submissions'),
+        func.coalesce(StudentStats.total_quizzes, 0).label('total_quizzes'),
+        func.coalesce(StudentStats.total_interviews, 0).label('total_interviews')
+    ).outerjoin(StudentStats, StudentStats.user_id == User.id)\
+        .where(User.role == 'student', User.is_active == True)\
+        .order_by(User.id)
+    return _apply_filters(statement, filters, None, None)
+
+# Dataset name -> (statement builder, supported filters)
+DATASETS = {
+    'submissions': (_submissions, {'from', 'to', 'company_id', 'batch'}),
+    'quiz-attempts': (_quiz_attempts, {'from', 'to', 'company_id', 'batch'}),
+    'interviews': (_interviews, {'from', 'to', 'batch'}),
+    'readiness': (_readiness, {'batch'})
+}
+
+def _apply_filters(statement, filters, date_column, company_column):
+    if filters.get('from') is not None:
+        statement = statement.where(date_column >= filters['from'])
+    if filters.get('to') is not None:
+        statement = statement.where(date_column < filters['to'])
+    if filters.get('company_id') is not None:
+        statement = statement.where(company_column == filters['company_id'])
+    if filters.get('batch'):
+        statement = statement.where(User.batch == filters['batch'])
+    return statement
+
+def parse_date_bound(value, end=False):
+    """
+    Parse an ISO date/datetime query parameter
+    A bare date used as an end bound covers that whole day.
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def build_export(dataset, filters):
+    """
+    Build the SELECT for a dataset
+    filters: dict with optional 'from'/'to' datetimes, 'company_id' and 'batch'
+    Raises ValueError for unknown datasets or unsupported filters
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f'Unknown dataset: {dataset}')
+    builder, supported = DATASETS[dataset]
+    unsupported = [name for name, value in filters.items() if value is not None and name not in supported]
+    if unsupported:
+        raise ValueError(f'Filter(s) not supported for {dataset}: {", ".join(sorted(unsupported))}')
+    return builder(filters)
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def stream_rows(statement, batch_size=EXPORT_BATCH_SIZE):
+    """Yield result rows from a server-side cursor in batches"""
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    try:
+        for row in result:
+            yield row
+    finally:
+        result.close()
+
+def generate_csv(statement):
+    """Yield a CSV document line by line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+    
+    writer.writerow([column.name for column in statement.selected_columns])
+    yield flush()
+    for row in stream_rows(statement):
+        writer.writerow([_plain(value) for value in row])
+        yield flush()
+
+def generate_ndjson(statement):
+    """Yield one JSON object per line"""
+    columns = [column.name for column in statement.selected_columns]
+    for row in stream_rows(statement):
+        yield json.dumps({name: _plain(value) for name, value in zip(columns, row)}) + '\n'
@@ -1,9 +1,8 @@
 """
 Utility functions for extracting text from files (PDF, images)
+PyPDF2, PIL and pytesseract are imported on first use, not at app startup.
 """
 import os
-from PIL import Image
-import io
 
 def extract_text_from_pdf(file_path):
     """
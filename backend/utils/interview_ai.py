@@ -2,10 +2,10 @@
 Enhanced AI Interview utilities for TR (Technical) and HR interview types
 Supports structured question flow and scoring (out of 100)
 """
-import requests
 import json
 import re
 from config import Config
+from utils.metrics import external_call
 from utils.resume_processor import (
     extract_programming_languages, 
     extract_skills,
@@ -185,6 +185,7 @@ def generate_interview_question(interview_type='TR', resume_text='', job_descrip
     Generate interview question based on interview type (TR or HR) and phase
     FIRST QUESTION must always be "Introduce yourself"
     """
+    import requests
     # FIRST QUESTION: Always "Introduce yourself"
     if question_number == 0:
         if interview_type == 'TR':
@@ -242,8 +243,9 @@ def generate_interview_question(interview_type='TR', resume_text='', job_descrip
                 'temperature': 0.7
             }
             
-            response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
-            response.raise_for_status()
+            with external_call('ai'):
+                response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
+                response.raise_for_status()
             data = response.json()
             
             if 'choices' in data and len(data['choices']) > 0:
@@ -474,6 +476,7 @@ def evaluate_answer(question, answer, interview_type='TR', phase='introduction',
         'overall_score': float (0-10) - weighted average
     }
     """
+    import requests
     if Config.AI_API_KEY:
         try:
             # Different evaluation criteria for TR vs HR
@@ -611,8 +614,9 @@ Return your response in this EXACT JSON format:
                 'temperature': 0.5
             }
             
-            response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
-            response.raise_for_status()
+            with external_call('ai'):
+                response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=15)
+                response.raise_for_status()
             data = response.json()
             
             if 'choices' in data and len(data['choices']) > 0:
@@ -772,6 +776,7 @@ def generate_interview_summary(conversation_history, interview_type='TR', final_
     Generate final interview summary with strengths, weaknesses, and suggestions
     Returns dictionary with summary, strengths, weaknesses, improvements, suggested_resources
     """
+    import requests
     if not Config.AI_API_KEY:
         return {
             'summary': "Interview completed. Review your answers and continue practicing.",
@@ -848,8 +853,9 @@ Return ONLY valid JSON in this format:
             'temperature': 0.7
         }
         
-        response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=20)
-        response.raise_for_status()
+        with external_call('ai'):
+            response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=20)
+            response.raise_for_status()
         data = response.json()
         
         if 'choices' in data and len(data['choices']) > 0:
@@ -897,6 +903,7 @@ def generate_practice_materials(weak_skills, interview_type='TR'):
     Returns:
         Dictionary with practice recommendations for each weak skill
     """
+    import requests
     if not weak_skills or not Config.AI_API_KEY:
         return {}
     
@@ -945,8 +952,9 @@ Return ONLY valid JSON array:
             'temperature': 0.7
         }
         
-        response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=20)
-        response.raise_for_status()
+        with external_call('ai'):
+            response = requests.post(Config.AI_API_URL, headers=headers, json=payload, timeout=20)
+            response.raise_for_status()
         data = response.json()
         
         if 'choices' in data and len(data['choices']) > 0:
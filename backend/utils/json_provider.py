@@ -0,0 +1,141 @@
+"""
+Pluggable JSON provider for the Flask app
+
+OrjsonProvider serializes with orjson, which is several times faster than the
+stdlib json on our large lists (question pages, quiz payloads, submission
+histories), and produces the same documents as Flask's default provider:
+sorted keys, datetimes as HTTP dates, Decimal as strings. Anything orjson
+refuses (e.g. integers beyond 64 bits) falls back to the stdlib.
+JSON_PROVIDER selects it: 'auto' (orjson when installed), 'orjson' or 'default'.
+Run the payload benchmark with: flask --app app benchmark-payloads
+"""
+from flask.json.provider import DefaultJSONProvider
+import time
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see requirements.txt
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson doing the encoding and decoding"""
+    
+    def _encode(self, obj, indent=False):
+        """UTF-8 bytes, or None when orjson cannot encode obj"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            return None
+    
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            encoded = self._encode(obj)
+            if encoded is not None:
+                return encoded.decode()
+        return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        encoded = self._encode(obj, indent)
+        if encoded is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(encoded + b'\n', mimetype=self.mimetype)
+
+def json_provider_class(name='auto'):
+    """Provider class for a JSON_PROVIDER setting"""
+    if name == 'default':
+        return DefaultJSONProvider
+    if name not in ('auto', 'orjson'):
+        raise ValueError(f'Unknown JSON_PROVIDER: {name}')
+    if orjson is None:
+        if name == 'orjson':
+            raise RuntimeError('JSON_PROVIDER=orjson but orjson is not installed')
+        return DefaultJSONProvider
+    return OrjsonProvider
+
+def _largest_payload_requests():
+    """[(name, path, user)] for the biggest real responses in the database"""
+    from models import (
+        User, QuizQuestion, Question, CodeSubmission, InterviewSession, InterviewAnswer, db
+    )
+    from sqlalchemy import func
+    
+    targets = []
+    admin = User.query.filter_by(role='admin', is_active=True).order_by(User.id).first()
+    
+    quiz = db.session.query(QuizQuestion.quiz_id).group_by(QuizQuestion.quiz_id)\
+        .order_by(func.count(QuizQuestion.id).desc()).first()
+    if quiz and admin:
+        targets.append(('quiz with questions', f'/api/quiz/{quiz[0]}', admin))
+    
+    question = db.session.query(Question.id).filter(Question.type == 'coding')\
+        .order_by(func.length(Question.test_cases).desc()).first()
+    if question and admin:
+        targets.append(('coding question with test cases', f'/api/coding/questions/{question[0]}', admin))
+    if admin:
+        targets.append(('question list (200 per page)', '/api/faculty/questions?per_page=200', admin))
+    
+    session = db.session.query(InterviewSession.id, InterviewSession.user_id)\
+        .join(InterviewAnswer, InterviewAnswer.session_id == InterviewSession.id)\
+        .group_by(InterviewSession.id, InterviewSession.user_id)\
+        .order_by(func.count(InterviewAnswer.id).desc()).first()
+    if session:
+        targets.append(('interview session conversation', f'/api/interview/session/{session[0]}',
+                         User.query.get(session[1])))
+    
+    submitter = db.session.query(CodeSubmission.user_id).group_by(CodeSubmission.user_id)\
+        .order_by(func.count(CodeSubmission.id).desc()).first()
+    if submitter:
+        targets.append(('submission history (200 per page)', '/api/coding/submissions?limit=200',
+                         User.query.get(submitter[0])))
+    return targets
+
+def benchmark_payloads(app, runs=50):
+    """
+    Fetch the largest real responses and time their serialization with the stdlib
+    and orjson providers, plus the bytes sent identity/gzip/brotli.
+    Returns [{'name', 'path', 'status', 'stdlib_ms', 'orjson_ms', 'bytes'}]
+    """
+    from utils.auth import access_headers
+    from utils.compression import compress_body, brotli
+    
+    with app.app_context():
+        targets = [(name, path, access_headers(user)) for name, path, user in _largest_payload_requests() if user]
+    
+    client = app.test_client()
+    providers = {'stdlib_ms': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson_ms'] = OrjsonProvider(app)
+    
+    results = []
+    for name, path, headers in targets:
+        response = client.get(path, headers={**headers, 'Accept-Encoding': 'identity'})
+        payload = response.get_json()
+        result = {'name': name, 'path': path, 'status': response.status_code, 'orjson_ms': None}
+        
+        with app.app_context():
+            for key, provider in providers.items():
+                started = time.perf_counter()
+                for _ in range(runs):
+                    provider.response(payload)
+                result[key] = (time.perf_counter() - started) * 1000 / runs
+        
+        body = response.get_data()
+        result['bytes'] = {
+            'identity': len(body),
+            'gzip': len(compress_body(body, 'gzip', app.config)),
+            'br': len(compress_body(body, 'br', app.config)) if brotli is not None else None
+        }
+        results.append(result)
+    return results
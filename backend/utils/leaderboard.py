@@ -2,13 +2,32 @@
 Leaderboard calculation utilities
 """
 from models import Leaderboard, User, CodeSubmission, QuizAttempt, db
+from utils.serializers import with_list_loaders
+from utils.pubsub import publish_to_audience
 from sqlalchemy import func
 
+# Rank changes per 'ranks' event (keeps each stream_events payload well under 64 KB)
+RANK_EVENT_CHUNK = 500
+
 def update_leaderboard(user_id):
     """Update leaderboard entry for a user"""
+    update_leaderboards([user_id])
+
+def update_leaderboards(user_ids):
+    """Update the entries of several users, then re-rank once"""
+    updated = [user_id for user_id in user_ids if _update_entry(user_id)]
+    if not updated:
+        return
+    db.session.commit()
+    
+    # Update ranks
+    update_ranks()
+
+def _update_entry(user_id):
+    """Recompute a student's entry (caller commits); False for other users"""
     user = User.query.get(user_id)
     if not user or user.role != 'student':
-        return
+        return False
     
     # Calculate coding score
     coding_submissions = CodeSubmission.query.filter_by(user_id=user_id).all()
@@ -48,27 +67,40 @@ def update_leaderboard(user_id):
     leaderboard_entry.accuracy = accuracy
     leaderboard_entry.total_submissions = total_submissions
     leaderboard_entry.total_quizzes = total_quizzes
-    
-    db.session.commit()
-    
-    # Update ranks
-    update_ranks()
+    return True
 
 def update_ranks():
-    """Update ranks for all users"""
+    """
+    Update ranks for all users
+    The moved ranks go to the students' audience channel as 'ranks' events
+    ({user_id: {'rank', 'previous_rank', 'total_score'}}); each stream passes
+    its own user's entry on as a 'rank' event.
+    """
     leaderboard_entries = Leaderboard.query.order_by(
         Leaderboard.total_score.desc(),
         Leaderboard.accuracy.desc()
     ).all()
     
+    changes = {}
     for rank, entry in enumerate(leaderboard_entries, start=1):
+        if entry.rank != rank:
+            changes[str(entry.user_id)] = {
+                'rank': rank,
+                'previous_rank': entry.rank,
+                'total_score': entry.total_score
+            }
         entry.rank = rank
     
+    # One event for the whole re-rank instead of one per moved student
+    moved = list(changes.items())
+    for start in range(0, len(moved), RANK_EVENT_CHUNK):
+        publish_to_audience('student', None, 'ranks', dict(moved[start:start + RANK_EVENT_CHUNK]))
+    
     db.session.commit()
 
 def get_leaderboard(limit=100):
     """Get top users from leaderboard"""
-    entries = Leaderboard.query.order_by(
+    entries = with_list_loaders(Leaderboard.query, Leaderboard).order_by(
         Leaderboard.rank.asc()
     ).limit(limit).all()
     
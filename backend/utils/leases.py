@@ -0,0 +1,47 @@
+"""
+Leader election through the database for background jobs
+
+Every process may run a job's loop, but only the holder of its row in
+scheduler_leases acts. The holder renews the lease well before it expires;
+if that process dies another one takes the lease over once it has expired.
+"""
+from models import SchedulerLease, db
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+import os
+import socket
+import uuid
+
+def lease_holder_id():
+    """Identity of this process as a lease holder"""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+def acquire_lease(name, holder, seconds):
+    """Take or renew the lease for `seconds` (commits); True if holder now holds it"""
+    now = datetime.utcnow()
+    updated = SchedulerLease.query.filter(
+        SchedulerLease.name == name,
+        or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now)
+    ).update({'holder': holder, 'expires_at': now + timedelta(seconds=seconds)}, synchronize_session=False)
+    if updated:
+        db.session.commit()
+        return True
+    
+    if db.session.query(SchedulerLease.name).filter_by(name=name).first():
+        db.session.rollback()
+        return False
+    
+    db.session.add(SchedulerLease(name=name, holder=holder, expires_at=now + timedelta(seconds=seconds)))
+    try:
+        db.session.commit()
+        return True
+    except IntegrityError:
+        # Another process created the lease first
+        db.session.rollback()
+        return False
+
+def release_lease(name, holder):
+    """Give the lease up early (commits)"""
+    SchedulerLease.query.filter_by(name=name, holder=holder).delete(synchronize_session=False)
+    db.session.commit()
@@ -0,0 +1,228 @@
+"""
+Runtime metrics in the Prometheus text format (GET /metrics)
+
+Counters, gauges and histograms are kept in memory per process; recording is
+a dict update under a lock, so the request path pays a few microseconds.
+With several gunicorn workers each scrape reads whichever worker answers, so
+every series carries a worker label (the process id); aggregate with
+sum without (worker) (...).
+"""
+from flask import g, request
+from sqlalchemy import event
+from contextlib import contextmanager
+import bisect
+import os
+import threading
+import time
+
+# Seconds; covers fast reads up to slow judge runs and AI calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics = []
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=()):
+    # Read at render time: workers forked from a preloaded app share the import
+    pairs = [('worker', os.getpid())] + list(zip(names, values)) + list(extra)
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric:
+    kind = 'untyped'
+    
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f'{self.name}{_labels(self.label_names, label_values)} {_number(value)}')
+        return lines
+
+class Counter(_Metric):
+    kind = 'counter'
+    
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+    
+    def __init__(self, name, documentation, labels=(), collect=None):
+        super().__init__(name, documentation, labels)
+        # collect() -> {label_values: value}, read at scrape time instead of tracked
+        self._collect = collect
+    
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+    
+    def render(self):
+        if self._collect is not None:
+            try:
+                values = self._collect()
+            except Exception:
+                values = {}
+            with self._lock:
+                self._values = dict(values)
+        return super().render()
+
+class Histogram(_Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                # [per-bucket counts (last is +Inf), sum, count]
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, label_values, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, label_values)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, label_values)} {count}')
+        return lines
+
+def render_metrics():
+    """All metrics of this process in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# HTTP
+HTTP_REQUESTS = Counter('http_requests_total', 'Requests handled', ['blueprint', 'endpoint', 'method', 'status'])
+HTTP_LATENCY = Histogram('http_request_duration_seconds', 'Time to produce the response (streams: until the first byte)',
+                         ['blueprint', 'endpoint', 'method'])
+HTTP_IN_PROGRESS = Gauge('http_requests_in_progress', 'Requests currently being handled', ['blueprint'])
+
+# Code judge (runs inline in the request; in-progress is the judge concurrency)
+JUDGE_LANGUAGES = {'c', 'cpp', 'python', 'java'}
+JUDGE_IN_PROGRESS = Gauge('judge_executions_in_progress', 'Code executions currently running', ['mode'])
+JUDGE_LATENCY = Histogram('judge_execution_duration_seconds', 'Code execution time including compilation',
+                          ['mode', 'language', 'status'])
+
+# External services
+EXTERNAL_LATENCY = Histogram('external_call_duration_seconds', 'Latency of calls to external APIs', ['service', 'outcome'])
+
+# Quiz autosave (saves received vs rows written: the write coalescing ratio)
+QUIZ_DRAFT_SAVES = Counter('quiz_draft_saves_total', 'Quiz draft autosaves received')
+QUIZ_DRAFT_WRITES = Counter('quiz_draft_writes_total', 'Quiz draft rows written to the database')
+
+# Database pool
+DB_POOL_HELD = Histogram('db_pool_checkout_duration_seconds', 'Time a connection stays checked out of the pool',
+                         buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+
+# Engine whose pool is reported by db_pool_connections
+_engine = None
+
+def _pool_connections():
+    pool = _engine.pool if _engine is not None else None
+    if not hasattr(pool, 'checkedout'):
+        return {}
+    return {
+        ('checked_out',): pool.checkedout(),
+        ('idle',): pool.checkedin(),
+        ('overflow',): max(pool.overflow(), 0),
+        ('size',): pool.size()
+    }
+
+DB_POOL_CONNECTIONS = Gauge('db_pool_connections', 'Connection pool state', ['state'], collect=_pool_connections)
+
+def _label(value):
+    return value if value is not None else ''
+
+def register_metrics(app):
+    """Time requests and pool checkouts for the app (call after db.init_app)"""
+    from models import db
+    global _engine
+    
+    with app.app_context():
+        _engine = engine = db.engine
+    
+    # Long checkouts are what exhaust the pool; db_pool_connections shows how close it is
+    @event.listens_for(engine, 'checkout')
+    def start_checkout_timer(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+    
+    @event.listens_for(engine, 'checkin')
+    def record_checkout_time(dbapi_connection, connection_record):
+        started = connection_record.info.pop('checked_out_at', None)
+        if started is not None:
+            DB_POOL_HELD.observe(time.perf_counter() - started)
+    
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_blueprint = _label(request.blueprint)
+        HTTP_IN_PROGRESS.inc(g.metrics_blueprint)
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            HTTP_REQUESTS.inc(g.metrics_blueprint, endpoint, request.method, str(response.status_code))
+            HTTP_LATENCY.observe(time.perf_counter() - started, g.metrics_blueprint, endpoint, request.method)
+        return response
+    
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if g.pop('metrics_started', None) is not None:
+            HTTP_IN_PROGRESS.dec(g.metrics_blueprint)
+
+@contextmanager
+def judge_execution(mode, language):
+    """Time one judge run; set outcome['status'] inside the block"""
+    mode_label = str(mode)
+    language = language if language in JUDGE_LANGUAGES else 'other'
+    outcome = {'status': 'error'}
+    JUDGE_IN_PROGRESS.inc(mode_label)
+    started = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        JUDGE_IN_PROGRESS.dec(mode_label)
+        JUDGE_LATENCY.observe(time.perf_counter() - started, mode_label, language, str(outcome['status']))
+
+@contextmanager
+def external_call(service):
+    """Time a call to an external API ('ai', 'compiler'); exceptions count as errors"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        EXTERNAL_LATENCY.observe(time.perf_counter() - started, service, outcome)
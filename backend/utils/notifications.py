@@ -0,0 +1,324 @@
+"""
+Notification feed: personal notifications merged with broadcasts
+
+A broadcast is stored once for its audience (a role, optionally one batch)
+and read state is tracked per user with receipts, so notifying every
+student is a single insert. Users see the broadcasts for their role and
+batch that were sent after their account was created.
+
+Unread counts are materialized in notification_counters and adjusted by the
+helpers below in the caller's transaction. Broadcasts only bump a running
+total per audience (broadcast_audiences); each worker keeps those totals in
+memory for BROADCAST_TOTALS_TTL seconds, so polling the count is a single
+primary-key read. repair_notification_counters recomputes the counters.
+"""
+from flask import current_app
+from models import (
+    Notification, BroadcastNotification, BroadcastReceipt, BroadcastAudience,
+    NotificationCounter, User, db
+)
+from utils.pagination import DEFAULT_PAGE_SIZE, after_cursor, decode_cursor, encode_cursor
+from utils.catalog_cache import invalidate_after_commit
+from utils.transactions import insert_or_select
+from utils.pubsub import publish_to_user, publish_to_audience
+from sqlalchemy import and_, or_, func
+from datetime import datetime
+import sys
+import time
+
+# Feed order at equal timestamps: personal notifications before broadcasts.
+# Cursors pack the source into the id: row_id * 2 + source
+_PERSONAL, _BROADCAST = 1, 0
+
+def broadcast(role, title, message, type=None, link=None, batch=None, created_by=None):
+    """Notify every user of a role (optionally one batch) with a single row; caller commits"""
+    entry = BroadcastNotification(
+        target_role=role,
+        target_batch=batch,
+        title=title,
+        message=message,
+        type=type,
+        link=link,
+        created_by=created_by
+    )
+    db.session.add(entry)
+    db.session.flush()
+    publish_to_audience(role, batch, 'notification', entry.to_dict(is_read=False))
+    
+    updated = BroadcastAudience.query.filter_by(target_role=role, target_batch=batch or '')\
+        .update({BroadcastAudience.total: BroadcastAudience.total + 1}, synchronize_session=False)
+    if not updated:
+        db.session.add(BroadcastAudience(target_role=role, target_batch=batch or '', total=1))
+    invalidate_after_commit(get_audience_totals())
+    return entry
+
+def notify(user_id, title, message, type=None, link=None):
+    """Create a personal notification and count it as unread; caller commits"""
+    notification = Notification(user_id=user_id, title=title, message=message, type=type, link=link)
+    db.session.add(notification)
+    db.session.flush()
+    _adjust_counter(user_id, personal=1)
+    publish_to_user(user_id, 'notification', notification.to_dict())
+    return notification
+
+def _audience(user):
+    """Filter for the broadcasts addressed to user"""
+    conditions = [
+        BroadcastNotification.target_role == user.role,
+        or_(BroadcastNotification.target_batch.is_(None), BroadcastNotification.target_batch == user.batch)
+    ]
+    if user.created_at:
+        conditions.append(BroadcastNotification.created_at >= user.created_at)
+    return and_(*conditions)
+
+def _broadcasts_with_receipts(user, *columns):
+    """Query broadcasts addressed to user, outer-joined to the user's receipts"""
+    return db.session.query(*columns)\
+        .outerjoin(BroadcastReceipt, and_(
+            BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+            BroadcastReceipt.user_id == user.id
+        ))\
+        .filter(_audience(user))
+
+def notification_feed(user, is_read=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of the user's personal and broadcast notifications, newest first
+    Returns: (list of notification dicts, next_cursor)
+    Raises ValueError for a malformed cursor
+    """
+    personal = Notification.query.filter_by(user_id=user.id)
+    broadcasts = _broadcasts_with_receipts(user, BroadcastNotification, BroadcastReceipt.user_id)
+    
+    if is_read is not None:
+        personal = personal.filter(Notification.is_read == is_read)
+        broadcasts = broadcasts.filter(
+            BroadcastReceipt.user_id.isnot(None) if is_read else BroadcastReceipt.user_id.is_(None)
+        )
+    
+    if cursor:
+        sort_value, packed = decode_cursor(cursor)
+        source, row_id = packed % 2, packed // 2
+        # At sort_value itself: after a personal row come lower personal ids and every
+        # broadcast; after a broadcast come only lower broadcast ids
+        personal = personal.filter(after_cursor(
+            Notification.created_at, Notification.id, sort_value,
+            row_id if source == _PERSONAL else 0, True
+        ))
+        broadcasts = broadcasts.filter(after_cursor(
+            BroadcastNotification.created_at, BroadcastNotification.id, sort_value,
+            row_id if source == _BROADCAST else sys.maxsize, True
+        ))
+    
+    # limit + 1 from each source is enough to fill the merged page and detect a next one
+    personal_rows = personal.order_by(Notification.created_at.desc(), Notification.id.desc())\
+        .limit(limit + 1).all()
+    broadcast_rows = broadcasts.order_by(BroadcastNotification.created_at.desc(), BroadcastNotification.id.desc())\
+        .limit(limit + 1).all()
+    
+    items = [(n.created_at, _PERSONAL, n.id, n.to_dict()) for n in personal_rows]
+    items += [
+        (b.created_at, _BROADCAST, b.id, b.to_dict(user.id, is_read=reader is not None))
+        for b, reader in broadcast_rows
+    ]
+    # Newest first, missing timestamps last
+    items.sort(key=lambda item: (item[0] is not None, item[0] or datetime.min, item[1], item[2]), reverse=True)
+    
+    page = items[:limit]
+    next_cursor = None
+    if len(items) > limit:
+        created_at, source, row_id, _ = page[-1]
+        next_cursor = encode_cursor(created_at, row_id * 2 + source)
+    return [item[-1] for item in page], next_cursor
+
+def _total_for(totals, user):
+    total = totals.get((user.role, ''), 0)
+    if user.batch:
+        total += totals.get((user.role, user.batch), 0)
+    return total
+
+class AudienceTotals:
+    """Per-process copy of the broadcast_audiences totals, reloaded on a TTL"""
+    
+    def __init__(self, ttl=2.0):
+        self.ttl = ttl
+        self._totals = {}
+        self._loaded_at = None
+    
+    def load(self):
+        """Current totals from the database: {(role, batch): total}"""
+        return {
+            (role, batch): total
+            for role, batch, total in db.session.query(
+                BroadcastAudience.target_role, BroadcastAudience.target_batch, BroadcastAudience.total
+            )
+        }
+    
+    def total_for(self, user, fresh=False):
+        """Broadcasts ever sent to the audiences user belongs to"""
+        if fresh:
+            return _total_for(self.load(), user)
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.ttl:
+            self._totals = self.load()
+            self._loaded_at = now
+        return _total_for(self._totals, user)
+    
+    def invalidate(self):
+        self._loaded_at = None
+
+def get_audience_totals():
+    """The audience totals of the current app (one per process)"""
+    totals = current_app.extensions.get('broadcast_totals')
+    if totals is None:
+        totals = AudienceTotals(ttl=current_app.config.get('BROADCAST_TOTALS_TTL', 2))
+        totals = current_app.extensions.setdefault('broadcast_totals', totals)
+    return totals
+
+def count_unread_rows(user):
+    """(unread personal notifications, unread broadcasts) counted from the tables"""
+    personal = Notification.query.filter_by(user_id=user.id, is_read=False).count()
+    broadcasts = _broadcasts_with_receipts(user, func.count(BroadcastNotification.id))\
+        .filter(BroadcastReceipt.user_id.is_(None)).scalar()
+    return personal, broadcasts or 0
+
+def _create_counter(user):
+    """
+    Counter row initialized from the tables (includes changes already made in this transaction)
+    Returns (counter, created); created is False if a concurrent transaction created it first,
+    from tables that did not include this transaction's changes yet
+    """
+    personal, broadcasts = count_unread_rows(user)
+    counter = NotificationCounter(
+        user_id=user.id,
+        personal_unread=personal,
+        broadcast_offset=get_audience_totals().total_for(user, fresh=True) - broadcasts
+    )
+    existing = insert_or_select(counter, NotificationCounter.query.filter_by(user_id=user.id).with_for_update())
+    return existing, existing is counter
+
+def _adjust_counter(user_id, personal=0, offset=0):
+    """Apply a change to a user's counter after the matching rows were changed (call before commit)"""
+    def update():
+        return NotificationCounter.query.filter_by(user_id=user_id).update({
+            NotificationCounter.personal_unread: NotificationCounter.personal_unread + personal,
+            NotificationCounter.broadcast_offset: NotificationCounter.broadcast_offset + offset
+        }, synchronize_session=False)
+    if not update():
+        user = User.query.get(user_id)
+        if user and not _create_counter(user)[1]:
+            update()
+
+def get_unread_count(user_id):
+    """
+    Unread notifications from the maintained counter (created from the tables on first use)
+    Returns None if the user does not exist
+    """
+    row = db.session.query(User, NotificationCounter)\
+        .outerjoin(NotificationCounter, NotificationCounter.user_id == User.id)\
+        .filter(User.id == user_id).first()
+    if row is None:
+        return None
+    user, counter = row
+    if counter is None:
+        counter, _ = _create_counter(user)
+    broadcasts = get_audience_totals().total_for(user) - counter.broadcast_offset
+    return counter.personal_unread + max(broadcasts, 0)
+
+def reset_notification_counter(user_id):
+    """Drop a counter whose audience changed (role or batch); it is rebuilt on next use"""
+    NotificationCounter.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+def mark_read(notification):
+    """Mark a personal notification read; caller commits"""
+    if not notification.is_read:
+        notification.is_read = True
+        _adjust_counter(notification.user_id, personal=-1)
+
+def _lock_counter(user):
+    """
+    Lock the user's counter row, creating it if missing (call before changing receipts)
+    Receipt writers for the same user queue here, so they never insert the same receipt twice.
+    """
+    counter = NotificationCounter.query.filter_by(user_id=user.id).with_for_update().first()
+    if counter is None:
+        counter, _ = _create_counter(user)
+    return counter
+
+def mark_broadcast_read(user, broadcast_id):
+    """Record a read receipt; returns the broadcast, or None if it is not addressed to user"""
+    entry = BroadcastNotification.query.filter(
+        BroadcastNotification.id == broadcast_id, _audience(user)
+    ).first()
+    if entry is None:
+        return None
+    _lock_counter(user)
+    # Locking read: sees a receipt committed by whoever held the lock before us
+    receipt = BroadcastReceipt.query.filter_by(broadcast_id=broadcast_id, user_id=user.id)\
+        .with_for_update(read=True).first()
+    if not receipt:
+        db.session.add(BroadcastReceipt(broadcast_id=broadcast_id, user_id=user.id))
+        _adjust_counter(user.id, offset=1)
+    return entry
+
+def mark_all_read(user):
+    """Mark every personal notification and broadcast read; returns how many were unread"""
+    _lock_counter(user)
+    updated = Notification.query.filter_by(user_id=user.id, is_read=False)\
+        .update({'is_read': True}, synchronize_session=False)
+    # Locking read: sees the receipts of a concurrent call that held the lock before us
+    unread_ids = [row[0] for row in _broadcasts_with_receipts(user, BroadcastNotification.id)
+                  .filter(BroadcastReceipt.user_id.is_(None)).with_for_update(read=True).all()]
+    db.session.add_all([BroadcastReceipt(broadcast_id=broadcast_id, user_id=user.id) for broadcast_id in unread_ids])
+    _adjust_counter(user.id, personal=-updated, offset=len(unread_ids))
+    return updated + len(unread_ids)
+
+def repair_notification_counters(user_ids=None):
+    """
+    Recompute counters from the tables (all users, or only user_ids)
+    Returns: number of counters that were missing or wrong
+    """
+    query = User.query
+    if user_ids:
+        query = query.filter(User.id.in_(user_ids))
+    users = query.all()
+    ids = [user.id for user in users]
+    if not ids:
+        return 0
+    
+    personal = dict(db.session.query(Notification.user_id, func.count(Notification.id))
+                    .filter(Notification.user_id.in_(ids), Notification.is_read == False)
+                    .group_by(Notification.user_id).all())
+    # Unread broadcasts per user in one pass (same audience rules as _audience)
+    unread_broadcasts = dict(db.session.query(User.id, func.count(BroadcastNotification.id))
+        .join(BroadcastNotification, and_(
+            BroadcastNotification.target_role == User.role,
+            or_(BroadcastNotification.target_batch.is_(None), BroadcastNotification.target_batch == User.batch),
+            or_(User.created_at.is_(None), BroadcastNotification.created_at >= User.created_at)
+        ))
+        .outerjoin(BroadcastReceipt, and_(
+            BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+            BroadcastReceipt.user_id == User.id
+        ))
+        .filter(User.id.in_(ids), BroadcastReceipt.user_id.is_(None))
+        .group_by(User.id).all())
+    counters = {counter.user_id: counter for counter in
+                NotificationCounter.query.filter(NotificationCounter.user_id.in_(ids)).with_for_update()}
+    totals = get_audience_totals().load()
+    
+    repaired = 0
+    for user in users:
+        expected_personal = personal.get(user.id, 0)
+        expected_offset = _total_for(totals, user) - unread_broadcasts.get(user.id, 0)
+        counter = counters.get(user.id)
+        if counter is None:
+            db.session.add(NotificationCounter(
+                user_id=user.id, personal_unread=expected_personal, broadcast_offset=expected_offset
+            ))
+            repaired += 1
+        elif (counter.personal_unread, counter.broadcast_offset) != (expected_personal, expected_offset):
+            counter.personal_unread = expected_personal
+            counter.broadcast_offset = expected_offset
+            repaired += 1
+    
+    db.session.commit()
+    return repaired
@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination
+
+Pages are ordered by (timestamp, id) and each page continues from the last
+row of the previous one, so fetching page N costs the same as page 1
+(no OFFSET scan). Cursors are opaque url-safe strings.
+"""
+from sqlalchemy import or_, and_
+from datetime import datetime
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+    if value is None:
+        return default
+    return min(max(value, 1), MAX_PAGE_SIZE)
+
+def encode_cursor(sort_value, row_id):
+    payload = [sort_value.isoformat() if sort_value else None, row_id]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Return (sort_value, id) from a cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value else None), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def after_cursor(sort_column, id_column, sort_value, row_id, descending):
+    """Rows that come after (sort_value, row_id); NULL timestamps sort last when descending"""
+    if descending:
+        if sort_value is None:
+            return and_(sort_column.is_(None), id_column < row_id)
+        return or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id),
+            sort_column.is_(None)
+        )
+    if sort_value is None:
+        return or_(
+            sort_column.isnot(None),
+            and_(sort_column.is_(None), id_column > row_id)
+        )
+    return or_(
+        sort_column > sort_value,
+        and_(sort_column == sort_value, id_column > row_id)
+    )
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=True):
+    """
+    Fetch one page of a query ordered by (sort_column, id_column)
+    Returns: (rows, next_cursor) where next_cursor is None on the last page
+    Raises ValueError for a malformed cursor
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(after_cursor(sort_column, id_column, sort_value, row_id, descending))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # One extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
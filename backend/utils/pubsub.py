@@ -0,0 +1,192 @@
+"""
+Publish/subscribe for the per-user event stream (GET /api/stream/)
+
+publish() is called before the commit that stores the change and subscribers
+receive the event once that transaction commits. PUBSUB_BACKEND picks how
+events reach subscribers:
+- 'local' (default): delivered inside this process only (one worker, development)
+- 'database': written to stream_events in the publishing transaction; every
+  worker with open streams polls the table and delivers to its subscribers
+Any backend exposing publish(channel, event, data) and subscribe(channels)
+can be plugged in through get_pubsub().
+"""
+from flask import current_app
+from models import StreamEvent, db
+from utils.transactions import after_commit
+from collections import defaultdict
+from datetime import datetime, timedelta
+import json
+import queue
+import threading
+import time
+
+# Events buffered per connection before a slow client starts losing them
+SUBSCRIPTION_BUFFER = 100
+
+class Subscription:
+    """Queue of (event, data) for one stream connection"""
+    
+    def __init__(self, hub, channels):
+        self.hub = hub
+        self.channels = list(channels)
+        self._queue = queue.Queue(maxsize=SUBSCRIPTION_BUFFER)
+    
+    def put(self, event, data):
+        try:
+            self._queue.put_nowait((event, data))
+        except queue.Full:
+            pass
+    
+    def get(self, timeout=None):
+        """Next (event, data), or None if nothing arrived within timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def close(self):
+        self.hub.unsubscribe(self)
+
+class LocalHub:
+    """Fans events out to the subscriptions of this process"""
+    
+    def __init__(self):
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+    
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels[channel].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+    
+    def deliver(self, channel, event, data):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event, data)
+    
+    def __len__(self):
+        with self._lock:
+            return len({s for subscribers in self._channels.values() for s in subscribers})
+
+class LocalPubSub:
+    """Single-process backend"""
+    
+    def __init__(self):
+        self.hub = LocalHub()
+    
+    def publish(self, channel, event, data):
+        after_commit(lambda: self.hub.deliver(channel, event, data))
+    
+    def subscribe(self, channels):
+        return self.hub.subscribe(channels)
+
+class DatabasePubSub:
+    """Cross-worker backend relaying events through the stream_events table"""
+    
+    def __init__(self, app, poll_interval=1.0, commit_lag=5.0, retention=600.0):
+        self.app = app
+        self.hub = LocalHub()
+        self.poll_interval = poll_interval
+        # Rows are re-read for commit_lag seconds so late commits are not skipped
+        self.commit_lag = commit_lag
+        self.retention = retention
+        self._poller = None
+        self._lock = threading.Lock()
+    
+    def publish(self, channel, event, data):
+        db.session.add(StreamEvent(channel=channel, event=event, payload=json.dumps(data)))
+    
+    def subscribe(self, channels):
+        self._start_poller()
+        return self.hub.subscribe(channels)
+    
+    def _start_poller(self):
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_forever, name='pubsub-poller', daemon=True)
+                self._poller.start()
+    
+    def _poll_forever(self):
+        seen = {}
+        since = datetime.utcnow()
+        last_prune = 0.0
+        while True:
+            time.sleep(self.poll_interval)
+            if not len(self.hub):
+                # Nobody is listening; don't replay this backlog to the next stream
+                since = datetime.utcnow()
+                seen = {}
+                continue
+            with self.app.app_context():
+                try:
+                    rows = StreamEvent.query.filter(StreamEvent.created_at >= since)\
+                        .order_by(StreamEvent.id).all()
+                    for row in rows:
+                        if row.id not in seen:
+                            seen[row.id] = row.created_at
+                            self.hub.deliver(row.channel, row.event, json.loads(row.payload))
+                    
+                    since = datetime.utcnow() - timedelta(seconds=self.commit_lag)
+                    seen = {row_id: created for row_id, created in seen.items() if created >= since}
+                    
+                    if time.monotonic() - last_prune > self.retention / 10:
+                        cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+                        StreamEvent.query.filter(StreamEvent.created_at < cutoff).delete(synchronize_session=False)
+                        db.session.commit()
+                        last_prune = time.monotonic()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[WARN] Event stream poll failed: {e}")
+                finally:
+                    db.session.remove()
+
+def get_pubsub():
+    """The pub/sub backend of the current app (one per process)"""
+    pubsub = current_app.extensions.get('pubsub')
+    if pubsub is None:
+        backend = current_app.config.get('PUBSUB_BACKEND', 'local')
+        if backend == 'database':
+            pubsub = DatabasePubSub(
+                current_app._get_current_object(),
+                poll_interval=current_app.config.get('PUBSUB_POLL_INTERVAL', 1)
+            )
+        elif backend == 'local':
+            pubsub = LocalPubSub()
+        else:
+            raise ValueError(f'Unknown PUBSUB_BACKEND: {backend}')
+        # setdefault: threads racing on the first stream must share one hub
+        pubsub = current_app.extensions.setdefault('pubsub', pubsub)
+    return pubsub
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+def audience_channel(role, batch=None):
+    return f'role:{role}:batch:{batch}' if batch else f'role:{role}'
+
+def channels_for(user):
+    """Channels a user's stream listens to: personal events and broadcasts to their audiences"""
+    channels = [user_channel(user.id), audience_channel(user.role)]
+    if user.batch:
+        channels.append(audience_channel(user.role, user.batch))
+    return channels
+
+def publish_to_user(user_id, event, data):
+    """Push an event to a user's open streams once the current transaction commits"""
+    get_pubsub().publish(user_channel(user_id), event, data)
+
+def publish_to_audience(role, batch, event, data):
+    """Push an event to every open stream of a role (optionally one batch)"""
+    get_pubsub().publish(audience_channel(role, batch), event, data)
@@ -0,0 +1,113 @@
+"""
+Query-plan regression checks for the hot access paths
+
+Each hot query is run through EXPLAIN on the configured database and
+flagged if the optimizer falls back to a full scan of its main table.
+The checks run under pytest (tests/test_query_plans.py); the CLI runs them
+against a live database.
+Run with: flask --app app check-query-plans
+"""
+from models import (
+    CodeSubmission, QuizAttempt, Notification, InterviewAnswer,
+    QuestionTag, StudentDailyActivity, BroadcastNotification, db
+)
+from sqlalchemy import select, func, text
+from datetime import date
+
+def hot_queries():
+    """Return [(name, table, statement)] mirroring the queries issued by the routes"""
+    return [
+        ('last submission for question/language', CodeSubmission.__tablename__,
+            select(CodeSubmission.id).where(
+                CodeSubmission.user_id == 1,
+                CodeSubmission.question_id == 1,
+                CodeSubmission.language == 'python'
+            ).order_by(CodeSubmission.submitted_at.desc()).limit(1)),
+        ('submission history', CodeSubmission.__tablename__,
+            select(CodeSubmission.id).where(CodeSubmission.user_id == 1)
+            .order_by(CodeSubmission.submitted_at.desc())),
+        ('quiz attempts for quiz', QuizAttempt.__tablename__,
+            select(QuizAttempt.id).where(QuizAttempt.user_id == 1, QuizAttempt.quiz_id == 1)
+            .order_by(QuizAttempt.submitted_at.desc())),
+        ('attempt history', QuizAttempt.__tablename__,
+            select(QuizAttempt.id).where(QuizAttempt.user_id == 1)
+            .order_by(QuizAttempt.submitted_at.desc(), QuizAttempt.id.desc())),
+        ('notification history', Notification.__tablename__,
+            select(Notification.id).where(Notification.user_id == 1)
+            .order_by(Notification.created_at.desc(), Notification.id.desc())),
+        ('unread notifications', Notification.__tablename__,
+            select(Notification.id).where(Notification.user_id == 1, Notification.is_read == False)
+            .order_by(Notification.created_at.desc())),
+        ('unread notification count', Notification.__tablename__,
+            select(func.count(Notification.id)).where(Notification.user_id == 1, Notification.is_read == False)),
+        ('interview answers in order', InterviewAnswer.__tablename__,
+            select(InterviewAnswer.id).where(InterviewAnswer.session_id == 1)
+            .order_by(InterviewAnswer.question_number)),
+        ('broadcasts for role', BroadcastNotification.__tablename__,
+            select(BroadcastNotification.id).where(
+                BroadcastNotification.target_role == 'student',
+                BroadcastNotification.created_at >= date(2025, 1, 1)
+            ).order_by(BroadcastNotification.created_at.desc(), BroadcastNotification.id.desc())),
+        ('questions by tag', QuestionTag.__tablename__,
+            select(QuestionTag.question_id).where(QuestionTag.tag_id == 1)),
+        ('daily activity range', StudentDailyActivity.__tablename__,
+            select(StudentDailyActivity.id).where(
+                StudentDailyActivity.user_id == 1,
+                StudentDailyActivity.day >= date(2025, 1, 1),
+                StudentDailyActivity.day <= date(2025, 3, 31)
+            ))
+    ]
+
+def _explain_sqlite(sql, table):
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    details = [row[-1] for row in rows]
+    # "SCAN <table>" without an index is a full table scan; "SEARCH ..." uses one
+    full_scan = any(
+        detail.startswith(f'SCAN {table}') and 'INDEX' not in detail
+        for detail in details
+    )
+    return full_scan, details
+
+def _explain_mysql(sql, table):
+    result = db.session.execute(text(f'EXPLAIN {sql}'))
+    columns = list(result.keys())
+    rows = [dict(zip(columns, row)) for row in result]
+    # access type ALL is a full table scan
+    full_scan = any(row.get('table') == table and row.get('type') == 'ALL' for row in rows)
+    details = [
+        f"{row.get('table')}: type={row.get('type')} key={row.get('key')} extra={row.get('Extra')}"
+        for row in rows
+    ]
+    return full_scan, details
+
+def explain_query(statement, table):
+    """
+    EXPLAIN one statement on the configured database
+    Returns (full_scan, plan): whether it falls back to a full scan of table, and the plan lines
+    """
+    dialect = db.engine.dialect
+    if dialect.name == 'sqlite':
+        explain = _explain_sqlite
+    elif dialect.name == 'mysql':
+        explain = _explain_mysql
+    else:
+        raise ValueError(f'Query plan checks are not supported on {dialect.name}')
+    
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    return explain(sql, table)
+
+def check_query_plans():
+    """
+    EXPLAIN every hot query
+    Returns: list of {'name', 'table', 'full_scan', 'plan'}
+    """
+    results = []
+    for name, table, statement in hot_queries():
+        full_scan, plan = explain_query(statement, table)
+        results.append({
+            'name': name,
+            'table': table,
+            'full_scan': full_scan,
+            'plan': plan
+        })
+    return results
@@ -0,0 +1,208 @@
+"""
+Per-request SQL instrumentation, slow-query log and query budgets
+
+Every statement executed while handling a request is counted and timed:
+- statements slower than SLOW_QUERY_MS are printed as slow-query warnings
+- a statement repeated N_PLUS_ONE_THRESHOLD times in one request is reported
+  as a likely N+1 (the same SQL issued once per row of an earlier result)
+- in debug mode (or with QUERY_STATS_HEADERS) responses carry Server-Timing
+  and X-Query-Count headers
+query_budget() asserts a maximum statement count around a block of code;
+check_query_budgets() applies it to the hot GET endpoints, and
+tests/test_query_budgets.py does the same under pytest.
+Run with: flask --app app check-query-budgets
+"""
+from flask import g, has_request_context, request
+from models import db
+from sqlalchemy import event
+from collections import Counter
+from contextlib import contextmanager
+import heapq
+import threading
+import time
+
+# Slowest statements kept per request
+SLOWEST_KEPT = 5
+
+class QueryStats:
+    """Statements executed within one request (or one query_budget block)"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = Counter()
+        self._slowest = []
+    
+    def record(self, statement, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.statements[statement] += 1
+        entry = (duration_ms, self.count, statement)
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+    
+    def slowest(self):
+        """[(duration_ms, statement)] slowest first"""
+        return [(duration, statement) for duration, _, statement in sorted(self._slowest, reverse=True)]
+    
+    def repeated(self, threshold):
+        """[(statement, times)] for statements executed at least threshold times"""
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+    
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 2),
+            'slowest': [{'ms': round(duration, 2), 'statement': statement} for duration, statement in self.slowest()]
+        }
+
+# query_budget() blocks open on this thread
+_budgets = threading.local()
+
+def _active_stats():
+    stats = list(getattr(_budgets, 'stack', ()))
+    if has_request_context() and g.get('query_stats') is not None:
+        stats.append(g.query_stats)
+    return stats
+
+def _short(statement, limit=300):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + '...'
+
+def register_query_instrumentation(app):
+    """Hook the app's engine and request cycle (call after db.init_app)"""
+    
+    with app.app_context():
+        engine = db.engine
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+        for stats in _active_stats():
+            stats.record(statement, duration_ms)
+        
+        threshold = app.config.get('SLOW_QUERY_MS', 200)
+        if threshold and duration_ms >= threshold:
+            where = f'{request.method} {request.path}' if has_request_context() else 'background'
+            print(f"[SLOW QUERY] {duration_ms:.1f} ms ({where}): {_short(statement)}")
+    
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+        
+        threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+        if threshold:
+            for statement, times in stats.repeated(threshold):
+                print(f"[N+1] {request.method} {request.path} ran the same statement {times} times: {_short(statement)}")
+        
+        if app.debug or app.config.get('QUERY_STATS_HEADERS'):
+            total_ms = (time.perf_counter() - g.request_started) * 1000
+            response.headers['Server-Timing'] = (
+                f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+            )
+            response.headers['X-Query-Count'] = str(stats.count)
+        return response
+
+@contextmanager
+def collect_queries():
+    """Record the statements this thread runs inside the block into a QueryStats"""
+    stats = QueryStats()
+    stack = getattr(_budgets, 'stack', None)
+    if stack is None:
+        stack = _budgets.stack = []
+    stack.append(stats)
+    try:
+        yield stats
+    finally:
+        stack.remove(stats)
+
+@contextmanager
+def query_budget(max_queries):
+    """
+    Fail with AssertionError if the block runs more than max_queries statements
+    (requests made through app.test_client() inside the block are counted)
+    """
+    with collect_queries() as stats:
+        yield stats
+    
+    if stats.count > max_queries:
+        repeated = ''.join(f'\n  {times}x {_short(statement)}' for statement, times in stats.repeated(2))
+        raise AssertionError(f'{stats.count} queries exceed the budget of {max_queries}{repeated}')
+
+# (role, path, max queries) for the hot read endpoints, measured on a cold process.
+# These don't depend on the amount of data; an N+1 makes the count grow with it.
+ENDPOINT_BUDGETS = [
+    ('student', '/api/auth/me', 2),
+    ('student', '/api/student/dashboard', 10),
+    ('student', '/api/student/performance', 2),
+    ('student', '/api/student/placement-readiness', 3),
+    ('student', '/api/student/questions', 3),
+    ('student', '/api/student/resources', 2),
+    ('student', '/api/coding/submissions', 2),
+    ('student', '/api/coding/submissions/solved', 2),
+    ('student', '/api/quiz/list', 3),
+    ('student', '/api/quiz/attempts', 3),
+    ('student', '/api/notifications/', 4),
+    ('student', '/api/notifications/unread-count', 8),  # first read creates the counter (in a savepoint)
+    ('student', '/api/leaderboard/top', 2),
+    ('student', '/api/leaderboard/my-rank', 3),
+    ('faculty', '/api/faculty/dashboard', 10),
+    ('faculty', '/api/faculty/questions', 3),
+    ('faculty', '/api/faculty/students/performance', 4),
+    ('faculty', '/api/faculty/cohort/readiness', 4),
+    ('admin', '/api/admin/dashboard', 6),
+    ('admin', '/api/admin/users', 2),
+    ('admin', '/api/admin/companies', 3)  # first catalog read loads the version stamps
+]
+
+def check_query_budgets(app, budgets=None):
+    """
+    Request each endpoint as the first active user of its role and compare the
+    statements issued against its budget.
+    Returns [{'role', 'path', 'budget', 'count', 'status', 'repeated'}]
+    """
+    from models import User
+    from utils.auth import access_headers
+    
+    client = app.test_client()
+    headers = {}
+    with app.app_context():
+        for role in {role for role, _, _ in budgets or ENDPOINT_BUDGETS}:
+            user = User.query.filter_by(role=role, is_active=True).order_by(User.id).first()
+            if user:
+                headers[role] = access_headers(user)
+    
+    # Load the per-process caches (revocation list, catalog version) outside the budgets
+    for role_headers in headers.values():
+        client.get('/api/auth/me', headers=role_headers)
+    
+    results = []
+    for role, path, budget in budgets or ENDPOINT_BUDGETS:
+        if role not in headers:
+            results.append({'role': role, 'path': path, 'budget': budget, 'count': None,
+                            'status': None, 'repeated': []})
+            continue
+        with collect_queries() as stats:
+            response = client.get(path, headers=headers[role])
+        results.append({
+            'role': role,
+            'path': path,
+            'budget': budget,
+            'count': stats.count,
+            'status': response.status_code,
+            'repeated': stats.repeated(2)
+        })
+    return results
@@ -0,0 +1,159 @@
+"""
+Write-behind buffer for quiz autosave (PUT /api/quiz/<id>/draft)
+
+POST /api/quiz/<id>/start creates the attempt's draft row. The quiz page
+then autosaves the full answer set a few seconds after every change. Each
+save only replaces the attempt's entry in this process's buffer; a background
+thread writes the buffered entries into their draft rows every
+QUIZ_DRAFT_FLUSH_SECONDS, one transaction per flush, so an attempt costs at
+most one row write per interval however often it saves. A crash loses at
+most that interval.
+
+Rows carry the time the server received the answers and an older save never
+overwrites a newer one, so workers flushing the same attempt converge on the
+latest answers. Saves received after the attempt's deadline plus
+QUIZ_SUBMIT_GRACE_SECONDS are not stored. Submitting an attempt deletes its
+draft in the submit transaction and drops the buffered entry once that
+commits.
+"""
+from models import QuizDraft, db
+from utils.metrics import QUIZ_DRAFT_SAVES, QUIZ_DRAFT_WRITES
+from utils.transactions import after_commit
+from flask import current_app
+from sqlalchemy import or_
+from datetime import datetime, timedelta
+import atexit
+import json
+import threading
+import time
+
+class DraftBuffer:
+    """Per-process buffer of the latest unsaved answers of each attempt"""
+    
+    def __init__(self, app, flush_interval=5.0, grace_seconds=30.0):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.grace_seconds = grace_seconds
+        self._pending = {}  # (user_id, quiz_id) -> {'answers', 'saved_at'}
+        self._lock = threading.Lock()
+        self._flusher = None
+    
+    def save(self, user_id, quiz_id, answers):
+        """Buffer the answers of a started attempt (the caller checks); returns the time they were received"""
+        saved_at = datetime.utcnow()
+        entry = {'answers': json.dumps(answers), 'saved_at': saved_at}
+        with self._lock:
+            self._pending[(user_id, quiz_id)] = entry
+        QUIZ_DRAFT_SAVES.inc()
+        self._start_flusher()
+        return saved_at
+    
+    def get(self, user_id, quiz_id):
+        """The buffered entry of an attempt, or None"""
+        with self._lock:
+            return self._pending.get((user_id, quiz_id))
+    
+    def discard(self, user_id, quiz_id, until=None):
+        """Drop the buffered entry (only if received before `until`, when given)"""
+        with self._lock:
+            entry = self._pending.get((user_id, quiz_id))
+            if entry and (until is None or entry['saved_at'] <= until):
+                del self._pending[(user_id, quiz_id)]
+    
+    def flush(self):
+        """Write every buffered entry (needs an app context); returns rows written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        
+        try:
+            written = sum(
+                1 for (user_id, quiz_id), entry in pending.items()
+                if _write_draft(user_id, quiz_id, entry, self.grace_seconds)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Keep the entries for the next flush unless they were superseded
+            with self._lock:
+                for key, entry in pending.items():
+                    self._pending.setdefault(key, entry)
+            raise
+        QUIZ_DRAFT_WRITES.inc(amount=written)
+        return written
+    
+    def __len__(self):
+        return len(self._pending)
+    
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_forever, name='quiz-draft-flusher', daemon=True)
+                self._flusher.start()
+                # Graceful worker shutdown writes what is still buffered
+                atexit.register(self._flush_in_context)
+    
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._pending:
+                self._flush_in_context()
+    
+    def _flush_in_context(self):
+        with self.app.app_context():
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[WARN] Quiz draft flush failed: {e}")
+            finally:
+                db.session.remove()
+
+def _write_draft(user_id, quiz_id, entry, grace_seconds):
+    """Update the attempt's draft row with a buffered entry (caller commits); True if written"""
+    # Skipped: a newer save is stored, the attempt was never started, or its time is up
+    updated = QuizDraft.query.filter(
+        QuizDraft.user_id == user_id,
+        QuizDraft.quiz_id == quiz_id,
+        QuizDraft.saved_at < entry['saved_at'],
+        or_(QuizDraft.deadline.is_(None),
+            QuizDraft.deadline >= entry['saved_at'] - timedelta(seconds=grace_seconds))
+    ).update({'answers': entry['answers'], 'saved_at': entry['saved_at']}, synchronize_session=False)
+    return bool(updated)
+
+def get_draft_buffer():
+    """The draft buffer of the current app (one per process)"""
+    buffer = current_app.extensions.get('quiz_drafts')
+    if buffer is None:
+        buffer = DraftBuffer(
+            current_app._get_current_object(),
+            flush_interval=current_app.config.get('QUIZ_DRAFT_FLUSH_SECONDS', 5),
+            grace_seconds=current_app.config.get('QUIZ_SUBMIT_GRACE_SECONDS', 30)
+        )
+        buffer = current_app.extensions.setdefault('quiz_drafts', buffer)
+    return buffer
+
+def load_draft(user_id, quiz_id):
+    """Latest draft of a started attempt as a dict (buffered here or stored), or None"""
+    row = QuizDraft.query.filter_by(user_id=user_id, quiz_id=quiz_id).first()
+    if row is None:
+        return None
+    
+    data = row.to_dict()
+    entry = get_draft_buffer().get(user_id, quiz_id)
+    if entry and entry['saved_at'] > row.saved_at:
+        data['answers'] = json.loads(entry['answers'])
+        data['saved_at'] = entry['saved_at'].isoformat()
+    return data
+
+def discard_draft(user_id, quiz_id):
+    """
+    Delete the draft of a submitted attempt (joins the caller's transaction)
+    Returns the number of rows deleted: 0 means there was no draft, or
+    another transaction (the timer scheduler) submitted it first.
+    """
+    submitted_at = datetime.utcnow()
+    deleted = QuizDraft.query.filter_by(user_id=user_id, quiz_id=quiz_id).delete(synchronize_session=False)
+    buffer = get_draft_buffer()
+    after_commit(lambda: buffer.discard(user_id, quiz_id, until=submitted_at))
+    return deleted
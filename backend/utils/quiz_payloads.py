@@ -0,0 +1,48 @@
+"""
+Pre-rendered quiz payloads for GET /api/quiz/<id>
+
+When a quiz opens the whole batch fetches it at once. The student-safe body
+(correct answers, blank answers and test cases stripped) is rendered to JSON
+once per quiz and quizzes version and held in the catalog cache, whose
+single-flight loading means a burst of requests builds it only once.
+"""
+from flask import current_app
+from models import Quiz, QuizQuestion
+from utils.catalog_cache import QUIZZES, cached_catalog, get_version_stamps
+from utils.serializers import with_list_loaders
+
+HIDDEN_QUESTION_FIELDS = ('correct_answer', 'test_cases')
+
+def student_question(data):
+    """Question.to_dict() without anything that gives the answer away"""
+    data = {key: value for key, value in data.items() if key not in HIDDEN_QUESTION_FIELDS}
+    if 'blanks' in data:
+        data['blanks'] = [
+            {key: value for key, value in blank.items() if key != 'answer'}
+            for blank in data['blanks']
+        ]
+    return data
+
+def render_quiz_payload(quiz_id):
+    """JSON body of the quiz with its questions, or None if the quiz does not exist"""
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return None
+    
+    quiz_questions = with_list_loaders(QuizQuestion.query, QuizQuestion)\
+        .filter_by(quiz_id=quiz_id).order_by(QuizQuestion.order).all()
+    
+    quiz_data = quiz.to_dict()
+    quiz_data['questions'] = []
+    for quiz_question in quiz_questions:
+        data = quiz_question.to_dict()
+        if data['question'] is not None:
+            data['question'] = student_question(data['question'])
+        quiz_data['questions'].append(data)
+    return (current_app.json.dumps({'quiz': quiz_data}) + '\n').encode()
+
+def get_quiz_payload(quiz_id):
+    """Cached JSON body of a quiz, or None if the quiz does not exist"""
+    quizzes_version = get_version_stamps().read([QUIZZES])[QUIZZES][0]
+    return cached_catalog(('quiz_payload', int(quiz_id), quizzes_version),
+                          lambda: render_quiz_payload(quiz_id))
@@ -0,0 +1,271 @@
+"""
+Server-side quiz timers and the auto-submit scheduler
+
+POST /api/quiz/<id>/start opens an attempt inside the quiz's start/end
+window and gives its draft a deadline: started_at + duration_minutes, capped
+at end_time. Autosaves are stored until the deadline plus
+QUIZ_SUBMIT_GRACE_SECONDS. After that the attempt is final. A late submit is
+graded from the saved draft instead of the answers it carries.
+
+Pages left open or closed never submit, so every worker runs a
+QuizTimerScheduler thread. Only the holder of the 'quiz-timers' lease does the
+work (utils/leases.py). The leader keeps a heap of due times, sleeps until
+the next one and finalizes expired attempts from their drafts,
+QUIZ_FINALIZE_BATCH per transaction. A whole exam closing in the same minute
+is a few batched writes instead of a submit request per student.
+"""
+from flask import current_app
+from models import QuizAttempt, QuizDraft, db
+from utils.answer_keys import get_answer_key, grade_attempt
+from utils.leaderboard import update_leaderboards
+from utils.leases import acquire_lease, lease_holder_id
+from utils.notifications import notify
+from utils.quiz_drafts import get_draft_buffer
+from utils.student_stats import record_quiz_attempt
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+import heapq
+import json
+import threading
+import time
+
+LEASE_NAME = 'quiz-timers'
+
+def attempt_deadline(quiz, started_at):
+    """When an attempt started at started_at runs out of time (None: untimed)"""
+    deadline = started_at + timedelta(minutes=quiz.duration_minutes) if quiz.duration_minutes else None
+    if quiz.end_time and (deadline is None or quiz.end_time < deadline):
+        deadline = quiz.end_time
+    return deadline
+
+def quiz_closed_reason(quiz, now):
+    """Why the quiz cannot be started at `now`, or None"""
+    if not quiz.is_active:
+        return 'This quiz is no longer available'
+    if quiz.start_time and now < quiz.start_time:
+        return 'This quiz has not started yet'
+    if quiz.end_time and now >= quiz.end_time:
+        return 'This quiz has ended'
+    return None
+
+def is_expired(draft, now, grace_seconds):
+    """Whether the draft's time, plus grace, is up"""
+    return draft.deadline is not None and now > draft.deadline + timedelta(seconds=grace_seconds)
+
+def create_attempt(user_id, key, answers, submitted_at, started_at=None):
+    """
+    Grade answers against a compiled key and add the attempt (caller commits)
+    Returns (attempt, obtained_marks, question_results)
+    """
+    obtained_marks, question_results = grade_attempt(key, answers)
+    total_marks = key['total_marks']
+    score = (obtained_marks / total_marks * 100) if total_marks > 0 else 0
+    
+    attempt = QuizAttempt(
+        user_id=user_id,
+        quiz_id=key['quiz_id'],
+        answers=json.dumps(answers),
+        score=score,
+        total_marks=total_marks,
+        submitted_at=submitted_at
+    )
+    if started_at:
+        attempt.started_at = started_at
+        attempt.time_taken_minutes = int((submitted_at - started_at).total_seconds() // 60)
+    
+    db.session.add(attempt)
+    record_quiz_attempt(attempt)
+    return attempt, obtained_marks, question_results
+
+def finalize_draft(draft, now):
+    """
+    Submit an attempt from its saved draft (caller commits)
+    Deleting the row claims it, so an attempt is never submitted twice.
+    Returns the attempt, or None if the draft was already claimed or the quiz is gone.
+    """
+    claimed = QuizDraft.query.filter_by(id=draft.id).delete(synchronize_session=False)
+    key = get_answer_key(draft.quiz_id) if claimed else None
+    if key is None:
+        return None
+    
+    # Answers stop counting at the deadline
+    submitted_at = min(now, draft.deadline) if draft.deadline else now
+    attempt, _, _ = create_attempt(draft.user_id, key, json.loads(draft.answers or '{}'),
+                                   submitted_at, started_at=draft.started_at)
+    db.session.flush()
+    notify(
+        draft.user_id,
+        title='Quiz Submitted',
+        message=f'Time ran out on your quiz "{key["title"]}", so your saved answers were submitted. '
+                f'Score: {attempt.score:.2f}%',
+        type='quiz_result',
+        link=f'/quiz/{draft.quiz_id}/result/{attempt.id}'
+    )
+    return attempt
+
+def start_attempt(user_id, quiz):
+    """
+    The open draft of the user's attempt at quiz, creating it if needed (commits)
+    An earlier attempt whose time is up is submitted first.
+    """
+    now = datetime.utcnow()
+    grace_seconds = current_app.config.get('QUIZ_SUBMIT_GRACE_SECONDS', 30)
+    draft = QuizDraft.query.filter_by(user_id=user_id, quiz_id=quiz.id).first()
+    if draft and is_expired(draft, now, grace_seconds):
+        attempt = finalize_draft(draft, now)
+        db.session.commit()
+        if attempt:
+            update_leaderboards([user_id])
+        draft = None
+    if draft:
+        return draft
+    
+    draft = QuizDraft(user_id=user_id, quiz_id=quiz.id, answers='{}', started_at=now, saved_at=now,
+                      deadline=attempt_deadline(quiz, now))
+    db.session.add(draft)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent start of the same attempt won
+        db.session.rollback()
+        return QuizDraft.query.filter_by(user_id=user_id, quiz_id=quiz.id).first()
+    
+    if draft.deadline:
+        get_quiz_timers().schedule(draft.deadline + timedelta(seconds=grace_seconds), draft.id)
+    return draft
+
+class QuizTimerScheduler:
+    """Per-process timer thread; finalizes expired attempts while it holds the lease"""
+    
+    def __init__(self, app, grace_seconds=30.0, lease_seconds=30.0, reload_seconds=30.0, batch_size=100):
+        self.app = app
+        self.grace_seconds = grace_seconds
+        self.lease_seconds = lease_seconds
+        # Attempts started in other workers are picked up by the next reload
+        self.reload_seconds = reload_seconds
+        self.batch_size = batch_size
+        self.holder = lease_holder_id()
+        self.is_leader = False
+        self._heap = []  # (due_at, draft_id)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._next_reload = 0.0
+    
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_forever, name='quiz-timers', daemon=True)
+                self._thread.start()
+    
+    def schedule(self, due_at, draft_id):
+        """Add a due time (attempts started in this process)"""
+        with self._lock:
+            if not self.is_leader:
+                return
+            heapq.heappush(self._heap, (due_at, draft_id))
+        self._wakeup.set()
+    
+    def run_once(self):
+        """One scheduler pass (needs an app context); returns attempts finalized"""
+        leader = acquire_lease(LEASE_NAME, self.holder, self.lease_seconds)
+        with self._lock:
+            if leader and not self.is_leader:
+                self._next_reload = 0.0
+            if not leader:
+                self._heap = []
+            self.is_leader = leader
+        if not leader:
+            return 0
+        
+        if time.monotonic() >= self._next_reload:
+            self._reload()
+        return self._finalize_due()
+    
+    def _reload(self):
+        """Rebuild the heap from the drafts due before the next reload"""
+        horizon = datetime.utcnow() + timedelta(seconds=self.reload_seconds)
+        rows = db.session.query(QuizDraft.deadline, QuizDraft.id)\
+            .filter(QuizDraft.deadline <= horizon - timedelta(seconds=self.grace_seconds)).all()
+        db.session.rollback()
+        heap = [(deadline + timedelta(seconds=self.grace_seconds), draft_id) for deadline, draft_id in rows]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap = heap
+            self._next_reload = time.monotonic() + self.reload_seconds
+    
+    def _pop_due(self, now):
+        with self._lock:
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                due.append(heapq.heappop(self._heap)[1])
+            return due
+    
+    def _finalize_due(self):
+        # Answers this worker still buffers count too
+        get_draft_buffer().flush()
+        finalized = 0
+        while True:
+            now = datetime.utcnow()
+            draft_ids = self._pop_due(now)
+            if not draft_ids:
+                return finalized
+            
+            drafts = QuizDraft.query.filter(
+                QuizDraft.id.in_(draft_ids),
+                QuizDraft.deadline < now - timedelta(seconds=self.grace_seconds)
+            ).all()
+            attempts = [attempt for attempt in (finalize_draft(draft, now) for draft in drafts) if attempt]
+            db.session.commit()
+            if attempts:
+                update_leaderboards(sorted({attempt.user_id for attempt in attempts}))
+            finalized += len(attempts)
+    
+    def _sleep_seconds(self):
+        delay = self.lease_seconds / 3
+        with self._lock:
+            if self.is_leader:
+                delay = min(delay, max(self._next_reload - time.monotonic(), 0))
+                if self._heap:
+                    until_due = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                    delay = min(delay, max(until_due, 0))
+        return max(delay, 0.05)
+    
+    def _run_forever(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    finalized = self.run_once()
+                    if finalized:
+                        print(f"[OK] Auto-submitted {finalized} expired quiz attempt(s)")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[WARN] Quiz timer pass failed: {e}")
+                finally:
+                    db.session.remove()
+            self._wakeup.wait(self._sleep_seconds())
+            self._wakeup.clear()
+
+def get_quiz_timers():
+    """The quiz timer scheduler of the current app (one per process)"""
+    timers = current_app.extensions.get('quiz_timers')
+    if timers is None:
+        config = current_app.config
+        timers = QuizTimerScheduler(
+            current_app._get_current_object(),
+            grace_seconds=config.get('QUIZ_SUBMIT_GRACE_SECONDS', 30),
+            lease_seconds=config.get('QUIZ_TIMER_LEASE_SECONDS', 30),
+            reload_seconds=config.get('QUIZ_TIMER_RELOAD_SECONDS', 30),
+            batch_size=config.get('QUIZ_FINALIZE_BATCH', 100)
+        )
+        timers = current_app.extensions.setdefault('quiz_timers', timers)
+    return timers
+
+def register_quiz_timers(app):
+    """Start the scheduler thread of each worker on its first request"""
+    if not app.config.get('QUIZ_TIMERS_ENABLED', True):
+        return
+    
+    @app.before_request
+    def start_quiz_timers():
+        get_quiz_timers().start()
@@ -0,0 +1,59 @@
+"""
+Additive schema upgrades for existing databases
+
+db.create_all() only creates missing tables. upgrade_schema() also adds
+columns and indexes that were introduced after a table was created, so
+deployments pick up new model fields and access paths without a manual
+migration.
+"""
+from models import db
+from sqlalchemy import inspect, text
+
+def _literal(value):
+    """Render a scalar column default as a SQL literal"""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _add_column_ddl(table, column, dialect):
+    preparer = dialect.identifier_preparer
+    ddl = f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=dialect)}'
+    
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        ddl += f' DEFAULT {_literal(default)}'
+        if not column.nullable:
+            ddl += ' NOT NULL'
+    return ddl
+
+def upgrade_schema():
+    """
+    Add model columns and indexes that are missing from existing tables
+    Returns: list of 'table.column' and 'table.index' names that were added
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    dialect = db.engine.dialect
+    added = []
+    
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue  # Created by db.create_all()
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            new_columns = [column for column in table.columns if column.name not in existing_columns]
+            
+            for column in new_columns:
+                conn.execute(text(_add_column_ddl(table, column, dialect)))
+                added.append(f'{table.name}.{column.name}')
+            
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    added.append(f'{table.name}.{index.name}')
+    
+    return added
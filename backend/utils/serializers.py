@@ -0,0 +1,52 @@
+"""
+Relationship-aware serialization for list endpoints
+
+to_dict() on several models reads related rows (company names, quiz
+questions, post authors, leaderboard usernames). Queries built through
+with_list_loaders() eager-load exactly those relationships, so serializing
+a page costs a constant number of queries regardless of its size.
+
+with_summary_columns() pairs with the models' to_summary_dict() list
+projections and defers the heavy text columns those projections skip.
+"""
+from models import Question, Quiz, QuizQuestion, Post, Resource, Leaderboard, CodeSubmission
+from sqlalchemy.orm import joinedload, defer
+
+def _list_loaders(model):
+    # Built on demand: backref attributes such as Question.company only
+    # exist once the mappers are configured
+    if model is Question:
+        return (joinedload(Question.company),)
+    if model is Quiz:
+        return (joinedload(Quiz.company),)
+    if model is QuizQuestion:
+        return (joinedload(QuizQuestion.question).joinedload(Question.company),)
+    if model is Post:
+        return (joinedload(Post.company), joinedload(Post.user))
+    if model is Resource:
+        return (joinedload(Resource.company),)
+    if model is Leaderboard:
+        return (joinedload(Leaderboard.user),)
+    return ()
+
+def with_list_loaders(query, model):
+    """Add the eager-loading options that model.to_dict() needs"""
+    loaders = _list_loaders(model)
+    return query.options(*loaders) if loaders else query
+
+def with_summary_columns(query, model, question_type=None):
+    """
+    Defer the columns that model.to_summary_dict() does not read
+    question_type: pass 'coding' when the query only returns coding questions,
+                   whose summaries also skip the description
+    """
+    if model is Question:
+        columns = [Question.test_cases, Question.starter_code, Question.solution]
+        if question_type == 'coding':
+            # MCQ/fill-blank summaries show the description as the question text
+            columns.append(Question.description)
+    elif model is CodeSubmission:
+        columns = [CodeSubmission.code, CodeSubmission.output]
+    else:
+        return query
+    return query.options(*(defer(column) for column in columns))
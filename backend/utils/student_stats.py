@@ -0,0 +1,363 @@
+"""
+Materialized per-student statistics
+
+The record_* helpers are called right before the commit that stores the raw
+row, so the rollup (and the user's daily activity bucket) is updated in the
+same transaction. rebuild_student_stats recomputes rows from scratch for
+backfills and repairs.
+"""
+from models import StudentStats, StudentDailyActivity, CodeSubmission, QuizAttempt, InterviewSession, Question, db
+from utils.transactions import insert_or_select
+from sqlalchemy import func, case
+from datetime import datetime, date, timedelta
+import json
+
+MAX_TREND_DAYS = 366
+
+# Placement readiness weights: Code Practice 40%, Non-Technical 30%, AI Virtual Interview 30%
+READINESS_WEIGHTS = {
+    'code_practice': 0.40,
+    'non_technical': 0.30,
+    'interview': 0.30
+}
+
+def empty_stats(user_id, persist=False):
+    """Create a zeroed stats row (defaults are only applied on flush)"""
+    stats = StudentStats(
+        user_id=user_id,
+        total_submissions=0,
+        accepted_submissions=0,
+        code_practice_sum=0.0,
+        code_practice_count=0,
+        language_stats='{}',
+        difficulty_stats='{}',
+        total_quizzes=0,
+        quiz_score_sum=0.0,
+        total_interviews=0,
+        interview_score_sum=0.0,
+        readiness_score=0.0
+    )
+    if persist:
+        db.session.add(stats)
+    return stats
+
+def read_stats(user_id):
+    """Get the stats row for a user, or an unsaved zeroed row if there is none"""
+    return StudentStats.query.filter_by(user_id=user_id).first() or empty_stats(user_id)
+
+def get_stats(user_id, for_update=False):
+    """Get the stats row for a user, creating it if missing"""
+    query = StudentStats.query.filter_by(user_id=user_id)
+    if for_update:
+        # Lock the row so concurrent writers don't lose counter updates
+        query = query.with_for_update()
+    stats = query.first()
+    if not stats:
+        # A missing row can't be locked, so two first writers may both get here
+        stats = insert_or_select(empty_stats(user_id), query)
+    return stats
+
+def get_daily_activity(user_id, timestamp=None):
+    """Get (creating if missing) the locked activity bucket for the UTC day of a timestamp"""
+    day = (timestamp or datetime.utcnow()).date()
+    query = StudentDailyActivity.query.filter_by(user_id=user_id, day=day).with_for_update()
+    activity = query.first()
+    if not activity:
+        activity = insert_or_select(StudentDailyActivity(
+            user_id=user_id,
+            day=day,
+            submissions=0,
+            accepted_submissions=0,
+            quiz_attempts=0,
+            quiz_score_sum=0.0,
+            interviews=0,
+            interview_score_sum=0.0
+        ), query)
+    return activity
+
+def readiness_components(stats):
+    """Return {component: (score, has_data)} for the readiness breakdown"""
+    return {
+        'code_practice': (stats.code_practice_score, stats.code_practice_count > 0),
+        'non_technical': (stats.avg_quiz_score, stats.total_quizzes > 0),
+        'interview': (stats.interview_score, stats.total_interviews > 0)
+    }
+
+def compute_readiness(stats):
+    """Weighted average of the components that have data (normalized over their weights)"""
+    total_weight = 0
+    weighted_sum = 0
+    for component, (score, has_data) in readiness_components(stats).items():
+        if has_data:
+            weighted_sum += score * READINESS_WEIGHTS[component]
+            total_weight += READINESS_WEIGHTS[component]
+    return weighted_sum / total_weight if total_weight > 0 else 0
+
+def _bump_counter(json_text, key, accepted):
+    counters = json.loads(json_text) if json_text else {}
+    entry = counters.setdefault(key, {'total': 0, 'accepted': 0})
+    entry['total'] += 1
+    if accepted:
+        entry['accepted'] += 1
+    return json.dumps(counters)
+
+def record_submission(submission, difficulty=None):
+    """Add a new code submission to its author's rollup (call before commit)"""
+    stats = get_stats(submission.user_id, for_update=True)
+    accepted = submission.status == 'accepted'
+    
+    stats.total_submissions += 1
+    if accepted:
+        stats.accepted_submissions += 1
+    
+    if submission.total_test_cases and submission.total_test_cases > 0:
+        stats.code_practice_sum += (submission.test_cases_passed or 0) / submission.total_test_cases * 100
+        stats.code_practice_count += 1
+    
+    difficulty = difficulty or 'unknown'
+    stats.language_stats = _bump_counter(stats.language_stats, submission.language, accepted)
+    stats.difficulty_stats = _bump_counter(stats.difficulty_stats, difficulty, accepted)
+    stats.readiness_score = compute_readiness(stats)
+    
+    activity = get_daily_activity(submission.user_id, submission.submitted_at)
+    activity.submissions += 1
+    if accepted:
+        activity.accepted_submissions += 1
+    return stats
+
+def record_quiz_attempt(attempt):
+    """Add a submitted quiz attempt to its author's rollup (call before commit)"""
+    stats = get_stats(attempt.user_id, for_update=True)
+    stats.total_quizzes += 1
+    stats.quiz_score_sum += attempt.score or 0
+    stats.readiness_score = compute_readiness(stats)
+    
+    activity = get_daily_activity(attempt.user_id, attempt.submitted_at)
+    activity.quiz_attempts += 1
+    activity.quiz_score_sum += attempt.score or 0
+    return stats
+
+def record_interview(session):
+    """Add a completed interview to its candidate's rollup (call before commit)"""
+    stats = get_stats(session.user_id, for_update=True)
+    if session.final_score is not None:
+        stats.total_interviews += 1
+        stats.interview_score_sum += session.final_score
+        stats.readiness_score = compute_readiness(stats)
+        
+        activity = get_daily_activity(session.user_id, session.ended_at)
+        activity.interviews += 1
+        activity.interview_score_sum += session.final_score
+    return stats
+
+def rebuild_student_stats(user_ids=None):
+    """
+    Recompute stats rows from the raw tables
+    user_ids: optional list of users to rebuild; rebuilds everyone by default
+    Returns: number of rows written
+    """
+    def restrict(query, column):
+        return query.filter(column.in_(user_ids)) if user_ids is not None else query
+    
+    rows = {}
+    
+    def row_for(user_id):
+        if user_id not in rows:
+            rows[user_id] = {
+                'total_submissions': 0, 'accepted_submissions': 0,
+                'code_practice_sum': 0.0, 'code_practice_count': 0,
+                'language_stats': {}, 'difficulty_stats': {},
+                'total_quizzes': 0, 'quiz_score_sum': 0.0,
+                'total_interviews': 0, 'interview_score_sum': 0.0
+            }
+        return rows[user_id]
+    
+    accepted_sum = func.sum(case((CodeSubmission.status == 'accepted', 1), else_=0))
+    has_tests = CodeSubmission.total_test_cases > 0
+    difficulty = func.coalesce(Question.difficulty, 'unknown')
+    
+    submission_query = db.session.query(
+        CodeSubmission.user_id,
+        CodeSubmission.language,
+        difficulty,
+        func.count(CodeSubmission.id),
+        accepted_sum,
+        func.sum(case((has_tests, CodeSubmission.test_cases_passed * 100.0 / CodeSubmission.total_test_cases), else_=0)),
+        func.sum(case((has_tests, 1), else_=0))
+    ).outerjoin(Question, Question.id == CodeSubmission.question_id)
+    submission_query = restrict(submission_query, CodeSubmission.user_id)
+    
+    for user_id, language, diff, total, accepted, practice_sum, practice_count in \
+            submission_query.group_by(CodeSubmission.user_id, CodeSubmission.language, difficulty).all():
+        row = row_for(user_id)
+        accepted = int(accepted or 0)
+        row['total_submissions'] += total
+        row['accepted_submissions'] += accepted
+        row['code_practice_sum'] += float(practice_sum or 0)
+        row['code_practice_count'] += int(practice_count or 0)
+        for key, counters in ((language, row['language_stats']), (diff, row['difficulty_stats'])):
+            entry = counters.setdefault(key, {'total': 0, 'accepted': 0})
+            entry['total'] += total
+            entry['accepted'] += accepted
+    
+    quiz_query = restrict(db.session.query(
+        QuizAttempt.user_id,
+        func.count(QuizAttempt.id),
+        func.sum(QuizAttempt.score)
+    ), QuizAttempt.user_id)
+    for user_id, attempts, score_sum in quiz_query.group_by(QuizAttempt.user_id).all():
+        row = row_for(user_id)
+        row['total_quizzes'] = attempts
+        row['quiz_score_sum'] = float(score_sum or 0)
+    
+    interview_query = restrict(db.session.query(
+        InterviewSession.user_id,
+        func.count(InterviewSession.id),
+        func.sum(InterviewSession.final_score)
+    ).filter(
+        InterviewSession.is_completed == True,
+        InterviewSession.final_score.isnot(None)
+    ), InterviewSession.user_id)
+    for user_id, interviews, score_sum in interview_query.group_by(InterviewSession.user_id).all():
+        row = row_for(user_id)
+        row['total_interviews'] = interviews
+        row['interview_score_sum'] = float(score_sum or 0)
+    
+    # Replace existing rows (users with no activity are reset to zero)
+    existing_query = restrict(StudentStats.query, StudentStats.user_id)
+    existing = {stats.user_id: stats for stats in existing_query.all()}
+    for user_id in set(existing) | set(rows):
+        stats = existing.get(user_id) or empty_stats(user_id, persist=True)
+        values = rows.get(user_id) or row_for(user_id)
+        for field, value in values.items():
+            if field in ('language_stats', 'difficulty_stats'):
+                value = json.dumps(value)
+            setattr(stats, field, value)
+        stats.readiness_score = compute_readiness(stats)
+    
+    rebuild_daily_activity(user_ids)
+    
+    db.session.commit()
+    return len(set(existing) | set(rows))
+
+def _as_date(value):
+    """func.date() yields a date on MySQL and an ISO string on SQLite"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+def rebuild_daily_activity(user_ids=None):
+    """
+    Recompute daily activity buckets from the raw tables (caller commits)
+    user_ids: optional list of users to rebuild; rebuilds everyone by default
+    """
+    def restrict(query, column):
+        return query.filter(column.in_(user_ids)) if user_ids is not None else query
+    
+    buckets = {}
+    
+    def bucket_for(user_id, day):
+        key = (user_id, _as_date(day))
+        if key not in buckets:
+            buckets[key] = StudentDailyActivity(
+                user_id=key[0], day=key[1],
+                submissions=0, accepted_submissions=0,
+                quiz_attempts=0, quiz_score_sum=0.0,
+                interviews=0, interview_score_sum=0.0
+            )
+        return buckets[key]
+    
+    submission_day = func.date(CodeSubmission.submitted_at)
+    submission_query = restrict(db.session.query(
+        CodeSubmission.user_id,
+        submission_day,
+        func.count(CodeSubmission.id),
+        func.sum(case((CodeSubmission.status == 'accepted', 1), else_=0))
+    ).filter(CodeSubmission.submitted_at.isnot(None)), CodeSubmission.user_id)
+    for user_id, day, total, accepted in submission_query.group_by(CodeSubmission.user_id, submission_day).all():
+        bucket = bucket_for(user_id, day)
+        bucket.submissions = total
+        bucket.accepted_submissions = int(accepted or 0)
+    
+    quiz_day = func.date(QuizAttempt.submitted_at)
+    quiz_query = restrict(db.session.query(
+        QuizAttempt.user_id,
+        quiz_day,
+        func.count(QuizAttempt.id),
+        func.sum(QuizAttempt.score)
+    ).filter(QuizAttempt.submitted_at.isnot(None)), QuizAttempt.user_id)
+    for user_id, day, attempts, score_sum in quiz_query.group_by(QuizAttempt.user_id, quiz_day).all():
+        bucket = bucket_for(user_id, day)
+        bucket.quiz_attempts = attempts
+        bucket.quiz_score_sum = float(score_sum or 0)
+    
+    interview_day = func.date(InterviewSession.ended_at)
+    interview_query = restrict(db.session.query(
+        InterviewSession.user_id,
+        interview_day,
+        func.count(InterviewSession.id),
+        func.sum(InterviewSession.final_score)
+    ).filter(
+        InterviewSession.is_completed == True,
+        InterviewSession.final_score.isnot(None),
+        InterviewSession.ended_at.isnot(None)
+    ), InterviewSession.user_id)
+    for user_id, day, interviews, score_sum in interview_query.group_by(InterviewSession.user_id, interview_day).all():
+        bucket = bucket_for(user_id, day)
+        bucket.interviews = interviews
+        bucket.interview_score_sum = float(score_sum or 0)
+    
+    restrict(StudentDailyActivity.query, StudentDailyActivity.user_id).delete(synchronize_session=False)
+    db.session.add_all(buckets.values())
+    return len(buckets)
+
+def activity_series(user_id, start, end):
+    """
+    Daily activity between two dates (inclusive) as parallel arrays
+    Index i of every array is the day start + i; days without activity are zero
+    (or None for averages). Reads one indexed range of bucket rows.
+    """
+    length = (end - start).days + 1
+    series = {
+        'submissions': [0] * length,
+        'accepted_submissions': [0] * length,
+        'accuracy': [None] * length,
+        'quiz_attempts': [0] * length,
+        'avg_quiz_score': [None] * length,
+        'interviews': [0] * length,
+        'avg_interview_score': [None] * length
+    }
+    
+    rows = StudentDailyActivity.query.filter(
+        StudentDailyActivity.user_id == user_id,
+        StudentDailyActivity.day >= start,
+        StudentDailyActivity.day <= end
+    ).all()
+    for row in rows:
+        i = (row.day - start).days
+        series['submissions'][i] = row.submissions
+        series['accepted_submissions'][i] = row.accepted_submissions
+        series['quiz_attempts'][i] = row.quiz_attempts
+        series['interviews'][i] = row.interviews
+        if row.submissions:
+            series['accuracy'][i] = round(row.accepted_submissions / row.submissions * 100, 2)
+        if row.quiz_attempts:
+            series['avg_quiz_score'][i] = round(row.quiz_score_sum / row.quiz_attempts, 2)
+        if row.interviews:
+            series['avg_interview_score'][i] = round(row.interview_score_sum / row.interviews, 2)
+    return series
+
+def trend_range(days=None, start=None, end=None):
+    """
+    Resolve the requested trend window into (start, end) dates
+    Defaults to the last 30 days ending today (UTC); raises ValueError for bad ranges
+    """
+    end = date.fromisoformat(end) if end else datetime.utcnow().date()
+    if start:
+        start = date.fromisoformat(start)
+    else:
+        start = end - timedelta(days=(days or 30) - 1)
+    
+    if start > end:
+        raise ValueError('from must not be after to')
+    if (end - start).days + 1 > MAX_TREND_DAYS:
+        raise ValueError(f'Range cannot exceed {MAX_TREND_DAYS} days')
+    return start, end
@@ -0,0 +1,137 @@
+"""
+Question tag utilities
+
+Tags live in the normalized tags/question_tags tables; Question.tags keeps a
+comma-separated copy for display. Tag rows also carry batch-wide submission
+counters that are bumped on every code submission and moved along when a
+question is retagged.
+"""
+from models import Tag, QuestionTag, Question, CodeSubmission, db
+from sqlalchemy import func, case
+from sqlalchemy.orm import selectinload
+from utils.catalog_cache import catalog_changed
+from utils.transactions import insert_or_select
+
+MAX_TAG_LENGTH = 50
+
+def parse_tags(value):
+    """Normalize a list or comma-separated string of tags into unique lowercase names"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    
+    names = []
+    for tag in value:
+        name = str(tag).strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def get_or_create_tags(names):
+    """Return Tag rows for the given names, creating any that are missing"""
+    if not names:
+        return []
+    existing = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names)).all()}
+    tags = []
+    for name in names:
+        tag = existing.get(name)
+        if not tag:
+            # Another request may be creating the same tag
+            tag = insert_or_select(Tag(name=name, total_attempts=0, accepted_attempts=0),
+                                   Tag.query.filter_by(name=name).with_for_update())
+            existing[name] = tag
+        tags.append(tag)
+    return tags
+
+def set_question_tags(question, value):
+    """
+    Replace a question's tags (list or comma-separated string)
+    The question's submissions move from the counters of the tags it loses to
+    those of the tags it gains (caller commits).
+    """
+    names = parse_tags(value)
+    tags = get_or_create_tags(names)
+    if question.id is not None:
+        old_ids = {link.tag_id for link in question.tag_links}
+        new_ids = {tag.id for tag in tags}
+        move_tag_counters(question.id, old_ids - new_ids, new_ids - old_ids)
+    with db.session.no_autoflush:
+        question.tag_links = [QuestionTag(tag=tag) for tag in tags]
+    question.tags = ','.join(names)
+
+def move_tag_counters(question_id, removed_tag_ids, added_tag_ids):
+    """Take a question's submissions off the removed tags' counters and add them to the added tags'"""
+    if not removed_tag_ids and not added_tag_ids:
+        return
+    total, accepted = db.session.query(
+        func.count(CodeSubmission.id),
+        func.sum(case((CodeSubmission.status == 'accepted', 1), else_=0))
+    ).filter(CodeSubmission.question_id == question_id).one()
+    if not total:
+        return
+    
+    accepted = int(accepted or 0)
+    for tag_ids, sign in ((removed_tag_ids, -1), (added_tag_ids, 1)):
+        if tag_ids:
+            Tag.query.filter(Tag.id.in_(tag_ids)).update({
+                Tag.total_attempts: Tag.total_attempts + sign * total,
+                Tag.accepted_attempts: Tag.accepted_attempts + sign * accepted
+            })
+
+def filter_questions_by_tag(query, tag_name):
+    """Restrict a Question query to questions carrying the given tag (indexed lookup)"""
+    tagged_ids = db.session.query(QuestionTag.question_id)\
+        .join(Tag, Tag.id == QuestionTag.tag_id)\
+        .filter(Tag.name == tag_name.strip().lower())
+    return query.filter(Question.id.in_(tagged_ids))
+
+def record_tag_attempt(question_id, accepted):
+    """Bump the counters of every tag on a question (call before commit)"""
+    tag_ids = db.session.query(QuestionTag.tag_id).filter(QuestionTag.question_id == question_id)
+    values = {Tag.total_attempts: Tag.total_attempts + 1}
+    if accepted:
+        values[Tag.accepted_attempts] = Tag.accepted_attempts + 1
+    # Atomic increments so concurrent submissions never lose updates
+    Tag.query.filter(Tag.id.in_(tag_ids)).update(values, synchronize_session=False)
+
+def rebuild_tags():
+    """
+    Backfill question_tags from Question.tags and recompute tag counters
+    Returns: number of tags
+    """
+    questions = Question.query.options(
+        selectinload(Question.tag_links).joinedload(QuestionTag.tag)
+    ).all()
+    for question in questions:
+        names = parse_tags(question.tags)
+        current = sorted(link.tag.name for link in question.tag_links)
+        if current != sorted(names) or question.tags != ','.join(names):
+            set_question_tags(question, names)
+    db.session.flush()
+    
+    # Question.tags is part of the cached catalog
+    catalog_changed()
+    return refresh_tag_counters()
+
+def refresh_tag_counters():
+    """
+    Recompute every tag's counters from code submissions with one GROUP BY
+    Returns: number of tags
+    """
+    counts = dict(
+        (tag_id, (total, int(accepted or 0)))
+        for tag_id, total, accepted in db.session.query(
+            QuestionTag.tag_id,
+            func.count(CodeSubmission.id),
+            func.sum(case((CodeSubmission.status == 'accepted', 1), else_=0))
+        ).join(CodeSubmission, CodeSubmission.question_id == QuestionTag.question_id)
+        .group_by(QuestionTag.tag_id).all()
+    )
+    
+    tags = Tag.query.all()
+    for tag in tags:
+        tag.total_attempts, tag.accepted_attempts = counts.get(tag.id, (0, 0))
+    
+    db.session.commit()
+    return len(tags)
@@ -0,0 +1,43 @@
+"""
+Transaction helpers
+
+after_commit() runs callbacks once the current database transaction commits,
+for side effects that must not be visible before the data is (cache
+invalidation, pushing events); callbacks are dropped on rollback.
+insert_or_select() creates a row under a unique key that concurrent
+transactions may be creating too.
+"""
+from models import db
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+def after_commit(callback):
+    """Call callback() once the current transaction commits (dropped on rollback)"""
+    db.session.info.setdefault('after_commit', []).append(callback)
+
+def insert_or_select(row, query):
+    """
+    Insert row in a savepoint and return it; if a concurrent transaction already
+    inserted the same unique key, return query.one() instead (query selects that
+    row, with_for_update() to wait for the other transaction's lock).
+    Only the savepoint is rolled back, so the caller's transaction carries on.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.add(row)
+        return row
+    except IntegrityError:
+        return query.one()
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session):
+    for callback in session.info.pop('after_commit', []):
+        callback()
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    # A rolled-back savepoint (or a failed flush inside one) leaves the outer
+    # transaction, and its callbacks, intact
+    if previous_transaction.parent is None:
+        session.info.pop('after_commit', None)
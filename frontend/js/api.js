@@ -118,6 +118,13 @@ async function apiRequest(endpoint, options = {}) {
     }
 }
 
+// Request one page of a cursor-paginated list (pass the previous page's next_cursor)
+function withCursor(endpoint, cursor) {
+    if (!cursor) return endpoint;
+    const separator = endpoint.includes('?') ? '&' : '?';
+    return `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}`;
+}
+
 // ================= Auth API =================
 
 const authAPI = {
@@ -168,14 +175,16 @@ const studentAPI = {
     
     getPerformance: async () => apiRequest('/student/performance'),
 
-    getQuestions: async (filters = {}) => {
+    getQuestions: async (filters = {}, cursor = null) => {
         const params = new URLSearchParams(filters);
-        return apiRequest(`/student/questions?${params}`);
+        return apiRequest(withCursor(`/student/questions?${params}`, cursor));
     },
 
-    getResources: async (filters = {}) => {
+    getQuestion: async (questionId) => apiRequest(`/student/questions/${questionId}`),
+
+    getResources: async (filters = {}, cursor = null) => {
         const params = new URLSearchParams(filters);
-        return apiRequest(`/student/resources?${params}`);
+        return apiRequest(withCursor(`/student/resources?${params}`, cursor));
     },
 
     getPlacementReadiness: async (userId = null) => {
@@ -207,11 +216,13 @@ const codingAPI = {
             body: JSON.stringify({ question_id: questionId, code, language })
         }),
 
-    getSubmissions: async (questionId = null) => {
+    getSubmissions: async (questionId = null, cursor = null) => {
         const params = questionId ? `?question_id=${questionId}` : '';
-        return apiRequest(`/coding/submissions${params}`);
+        return apiRequest(withCursor(`/coding/submissions${params}`, cursor));
     },
 
+    getSolvedQuestionIds: async () => apiRequest('/coding/submissions/solved'),
+
     getLastSubmission: async (questionId, language = null) => {
         const params = new URLSearchParams({ question_id: questionId });
         if (language) {
@@ -237,16 +248,28 @@ const quizAPI = {
             body: JSON.stringify({ answers })
         }),
 
-    getAttempts: async (quizId = null) => {
+    startQuiz: async (quizId) => apiRequest(`/quiz/${quizId}/start`, { method: 'POST' }),
+
+    getDraft: async (quizId) => apiRequest(`/quiz/${quizId}/draft`),
+
+    saveDraft: async (quizId, answers) =>
+        apiRequest(`/quiz/${quizId}/draft`, {
+            method: 'PUT',
+            body: JSON.stringify({ answers })
+        }),
+
+    getAttempts: async (quizId = null, cursor = null) => {
         const params = quizId ? `?quiz_id=${quizId}` : '';
-        return apiRequest(`/quiz/attempts${params}`);
+        return apiRequest(withCursor(`/quiz/attempts${params}`, cursor));
     }
 };
 
 // ================= Company API =================
 
 const companyAPI = {
-    listCompanies: async () => apiRequest('/admin/companies'),
+    listCompanies: async (cursor = null) => apiRequest(withCursor('/admin/companies', cursor)),
+
+    findCompany: async (name) => apiRequest(`/admin/companies?${new URLSearchParams({ name })}`),
     
     deleteCompany: async (companyId) => {
         return apiRequest(`/admin/companies/${companyId}`, {
@@ -277,9 +300,9 @@ const resourcesAPI = {
         return await response.json();
     },
 
-    getResources: async (filters = {}) => {
+    getResources: async (filters = {}, cursor = null) => {
         const params = new URLSearchParams(filters);
-        return apiRequest(`/student/resources?${params}`);
+        return apiRequest(withCursor(`/student/resources?${params}`, cursor));
     },
 
     deleteResource: async (resourceId) =>
@@ -303,8 +326,10 @@ const notificationsAPI = {
         return apiRequest(`/notifications${params}`);
     },
 
-    markAsRead: async (notificationId) =>
-        apiRequest(`/notifications/${notificationId}/read`, { method: 'PUT' }),
+    markAsRead: async (notificationId, isBroadcast = false) =>
+        apiRequest(isBroadcast
+            ? `/notifications/broadcast/${notificationId}/read`
+            : `/notifications/${notificationId}/read`, { method: 'PUT' }),
 
     markAllAsRead: async () =>
         apiRequest('/notifications/read-all', { method: 'PUT' }),
@@ -313,6 +338,13 @@ const notificationsAPI = {
         apiRequest('/notifications/unread-count')
 };
 
+// ================= Event Stream =================
+
+// EventSource cannot send an Authorization header, so the token goes in the query string
+const streamAPI = {
+    open: () => new EventSource(`${API_BASE_URL}/stream/?jwt=${encodeURIComponent(authToken)}`)
+};
+
 // ================= Interview API =================
 
 const interviewAPI = {
@@ -499,12 +531,12 @@ const facultyAPI = {
 const adminAPI = {
     getDashboard: async () => apiRequest('/admin/dashboard'),
     
-    getUsers: async (role = null, isActive = null) => {
+    getUsers: async (role = null, isActive = null, cursor = null) => {
         const params = new URLSearchParams();
         if (role) params.append('role', role);
         if (isActive !== null) params.append('is_active', isActive);
         const url = params.toString() ? `/admin/users?${params}` : '/admin/users';
-        return apiRequest(url);
+        return apiRequest(withCursor(url, cursor));
     },
 
     updateUser: async (userId, data) => {
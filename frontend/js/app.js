@@ -6,6 +6,11 @@ let currentQuiz = null;
 let companies = [];
 let questions = [];
 let codingQuestions = [];
+let codingQuestionFilters = { type: 'coding' };
+let codingCursor = null;
+let codingLoadId = 0;
+let solvedQuestionIds = new Set();
+let companiesCursor = null;
 let codingFilter = 'all';
 let codingSearch = '';
 let cpTopicTags = [];
@@ -24,6 +29,16 @@ function setText(id, value) {
     if (el) el.textContent = value;
 }
 
+// "Load more" row at the end of a cursor-paginated list ('' on the last page)
+function loadMoreButton(nextCursor, onclick) {
+    if (!nextCursor) return '';
+    return `
+        <div class="load-more" style="grid-column: 1 / -1; text-align: center; margin: 15px 0;">
+            <button class="btn btn-sm btn-secondary" onclick="event.stopPropagation(); this.disabled = true; ${onclick}">Load more</button>
+        </div>
+    `;
+}
+
 // Initialize App
 document.addEventListener('DOMContentLoaded', () => {
     checkAuth();
@@ -179,6 +194,7 @@ async function register() {
 }
 
 function logout() {
+    closeEventStream();
     authAPI.logout();
     showAuthPage();
 }
@@ -828,32 +844,48 @@ function addTopicChip(label) {
     clearError('topics');
 }
 
-async function loadCodingPage() {
+async function loadCodingPage(filters = { type: 'coding' }) {
+    // A later call (e.g. a company's questions) wins over one still in flight
+    const loadId = ++codingLoadId;
     try {
-        const [questionRes, submissionsRes] = await Promise.all([
-            studentAPI.getQuestions({ type: 'coding', per_page: 200 }),
-            codingAPI.getSubmissions()
+        const [questionRes, solvedRes] = await Promise.all([
+            studentAPI.getQuestions(filters),
+            codingAPI.getSolvedQuestionIds()
         ]);
+        if (loadId !== codingLoadId) return;
 
-        const solvedIds = new Set(
-            (submissionsRes.submissions || [])
-                .filter(s => s.status === 'accepted')
-                .map(s => s.question_id)
-        );
-
-        codingQuestions = questionRes.questions.map(q => ({
-            ...q,
-            status: solvedIds.has(q.id) ? 'solved' : 'unsolved',
-            company_name: q.company_name || 'General',
-            tags: q.tags || []
-        }));
-
-        renderCodingQuestions();
+        codingQuestionFilters = filters;
+        solvedQuestionIds = new Set(solvedRes.question_ids || []);
+        codingQuestions = [];
+        addCodingQuestions(questionRes);
     } catch (error) {
         console.error('Error loading coding page:', error);
     }
 }
 
+async function loadMoreCodingQuestions() {
+    const loadId = codingLoadId;
+    try {
+        const questionRes = await studentAPI.getQuestions(codingQuestionFilters, codingCursor);
+        if (loadId !== codingLoadId) return;
+        addCodingQuestions(questionRes);
+    } catch (error) {
+        console.error('Error loading more questions:', error);
+        renderCodingQuestions();
+    }
+}
+
+function addCodingQuestions(questionRes) {
+    codingQuestions.push(...questionRes.questions.map(q => ({
+        ...q,
+        status: solvedQuestionIds.has(q.id) ? 'solved' : 'unsolved',
+        company_name: q.company_name || 'General',
+        tags: q.tags || []
+    })));
+    codingCursor = questionRes.next_cursor;
+    renderCodingQuestions();
+}
+
 function renderCodingQuestions() {
     const listEl = document.getElementById('cp-question-list');
     if (!listEl) return;
@@ -862,10 +894,12 @@ function renderCodingQuestions() {
     const solved = codingQuestions.filter(q => q.status === 'solved').length;
     const unsolved = total - solved;
     const progress = total ? Math.round((solved / total) * 100) : 0;
+    // Counts cover the pages loaded so far
+    const more = codingCursor ? '+' : '';
 
-    setText('cp-total', total);
+    setText('cp-total', `${total}${more}`);
     setText('cp-solved', solved);
-    setText('cp-unsolved', unsolved);
+    setText('cp-unsolved', `${unsolved}${more}`);
 
     const filtered = codingQuestions.filter(q => {
         const matchesFilter = codingFilter === 'all' ? true : q.status === codingFilter;
@@ -877,8 +911,10 @@ function renderCodingQuestions() {
         return matchesFilter && matchesSearch;
     });
 
+    const loadMore = loadMoreButton(codingCursor, 'loadMoreCodingQuestions()');
+
     if (filtered.length === 0) {
-        listEl.innerHTML = `<div class="card">No questions found.</div>`;
+        listEl.innerHTML = `<div class="card">No questions found.</div>` + loadMore;
         return;
     }
 
@@ -909,7 +945,7 @@ function renderCodingQuestions() {
                 <span class="cp-star">☆</span>
             </div>
         </div>
-    `).join('');
+    `).join('') + loadMore;
 }
 
 async function loadQuestion(questionId) {
@@ -1617,10 +1653,13 @@ function parseTestCases() {
     return cases;
 }
 
-function findCompanyIdByName(name) {
+async function findCompanyIdByName(name) {
     if (!name) return null;
     const found = companies.find(c => c.name.toLowerCase() === name.toLowerCase());
-    return found ? found.id : null;
+    if (found) return found.id;
+    // Not among the companies loaded so far
+    const data = await companyAPI.findCompany(name);
+    return data.companies.length ? data.companies[0].id : null;
 }
 
 async function submitNewQuestion() {
@@ -1642,19 +1681,18 @@ async function submitNewQuestion() {
     
     if (hasError) return;
 
-    const payload = {
-        title,
-        description,
-        type: 'coding',
-        difficulty: 'medium',
-        company_id: findCompanyIdByName(companyName),
-        tags: cpTopicTags,
-        test_cases: parsedCases,
-        starter_code: '',  // Optional but include it
-        solution: ''  // Optional but include it
-    };
-
     try {
+        const payload = {
+            title,
+            description,
+            type: 'coding',
+            difficulty: 'medium',
+            company_id: await findCompanyIdByName(companyName),
+            tags: cpTopicTags,
+            test_cases: parsedCases,
+            starter_code: '',  // Optional but include it
+            solution: ''  // Optional but include it
+        };
         const result = await facultyAPI.createQuestion(payload);
         closeQuestionModal();
         await loadCodingPage();
@@ -1683,6 +1721,10 @@ function clearAllErrors() {
 }
 
 // Non-Technical Questions Page
+const NON_TECH_FILTERS = { type: 'mcq', exclude_quiz_questions: 'true' };
+let nonTechQuestions = [];
+let nonTechCursor = null;
+
 async function loadNonTechnicalPage() {
     try {
         // Check user role for +Add button visibility
@@ -1693,41 +1735,58 @@ async function loadNonTechnicalPage() {
         }
         
         // Load non-technical questions (MCQ type) - exclude quiz questions
-        const data = await studentAPI.getQuestions({ type: 'mcq', per_page: 200, exclude_quiz_questions: 'true' });
-        const questionsDiv = document.getElementById('non-technical-questions-list');
-        
-        // Check if user is faculty or admin (can delete questions)
-        const canDelete = currentUser && (currentUser.role === 'faculty' || currentUser.role === 'admin');
-        
-        if (data.questions && data.questions.length > 0) {
-            questionsDiv.innerHTML = data.questions.map(q => `
-                <div class="question-card" onclick="openNonTechQuestion(${q.id})" style="cursor: pointer;">
-                    <div class="question-card-content">
-                        <div class="question-card-left">
-                            <h4 class="question-title-clickable">${q.title}</h4>
-                            <p>${q.description || ''}</p>
-                            ${q.options ? `<div class="options-preview">Options: ${q.options.join(', ')}</div>` : ''}
-                            <small>Marks: ${q.marks || 1}</small>
-                        </div>
-                        <div class="question-card-right" onclick="event.stopPropagation();">
-                            <button class="btn btn-sm btn-open" onclick="openNonTechQuestion(${q.id})">Open</button>
-                            ${canDelete ? `
-                                <button class="btn btn-sm btn-delete-question" onclick="deleteNonTechQuestion(${q.id}, '${q.title.replace(/'/g, "\\'")}')" title="Delete Question">
-                                    🗑️
-                                </button>
-                            ` : ''}
-                        </div>
-                    </div>
-                </div>
-            `).join('');
-        } else {
-            questionsDiv.innerHTML = '<p>No non-technical questions available yet.</p>';
-        }
+        const data = await studentAPI.getQuestions(NON_TECH_FILTERS);
+        nonTechQuestions = data.questions || [];
+        nonTechCursor = data.next_cursor;
+        renderNonTechQuestions();
     } catch (error) {
         console.error('Error loading non-technical page:', error);
     }
 }
 
+async function loadMoreNonTechQuestions() {
+    try {
+        const data = await studentAPI.getQuestions(NON_TECH_FILTERS, nonTechCursor);
+        nonTechQuestions.push(...(data.questions || []));
+        nonTechCursor = data.next_cursor;
+    } catch (error) {
+        console.error('Error loading more questions:', error);
+    }
+    renderNonTechQuestions();
+}
+
+function renderNonTechQuestions() {
+    const questionsDiv = document.getElementById('non-technical-questions-list');
+    
+    // Check if user is faculty or admin (can delete questions)
+    const canDelete = currentUser && (currentUser.role === 'faculty' || currentUser.role === 'admin');
+    
+    if (nonTechQuestions.length > 0) {
+        questionsDiv.innerHTML = nonTechQuestions.map(q => `
+            <div class="question-card" onclick="openNonTechQuestion(${q.id})" style="cursor: pointer;">
+                <div class="question-card-content">
+                    <div class="question-card-left">
+                        <h4 class="question-title-clickable">${q.title}</h4>
+                        <p>${q.description || ''}</p>
+                        ${q.options ? `<div class="options-preview">Options: ${q.options.join(', ')}</div>` : ''}
+                        <small>Marks: ${q.marks || 1}</small>
+                    </div>
+                    <div class="question-card-right" onclick="event.stopPropagation();">
+                        <button class="btn btn-sm btn-open" onclick="openNonTechQuestion(${q.id})">Open</button>
+                        ${canDelete ? `
+                            <button class="btn btn-sm btn-delete-question" onclick="deleteNonTechQuestion(${q.id}, '${q.title.replace(/'/g, "\\'")}')" title="Delete Question">
+                                🗑️
+                            </button>
+                        ` : ''}
+                    </div>
+                </div>
+            </div>
+        `).join('') + loadMoreButton(nonTechCursor, 'loadMoreNonTechQuestions()');
+    } else {
+        questionsDiv.innerHTML = '<p>No non-technical questions available yet.</p>';
+    }
+}
+
 // Non-Technical Question Modal Functions
 let ntOptionCount = 2; // Start with A and B
 
@@ -1921,8 +1980,8 @@ let currentNonTechQuestion = null;
 // Open Non-Technical Question in Modal
 async function openNonTechQuestion(questionId) {
     try {
-        const data = await studentAPI.getQuestions({ per_page: 1000 });
-        const question = data.questions.find(q => q.id === questionId);
+        const data = await studentAPI.getQuestion(questionId);
+        const question = data.question;
         
         if (!question) {
             alert('Question not found');
@@ -2708,6 +2767,14 @@ function openQuiz(quizId) {
 
 async function takeQuiz(quizId) {
     try {
+        // Starts the server-side timer (or resumes the attempt in progress)
+        let started;
+        try {
+            started = await quizAPI.startQuiz(quizId);
+        } catch (error) {
+            alert(error.message);
+            return;
+        }
         const data = await quizAPI.getQuiz(quizId);
         currentQuiz = data.quiz;
         currentQuizId = quizId;
@@ -2753,14 +2820,112 @@ async function takeQuiz(quizId) {
             html += '</div>';
             return html;
         }).join('');
+        
+        // Resume autosaved answers, then autosave on every change
+        restoreQuizDraft(started.draft);
+        questionsDiv.oninput = scheduleQuizAutosave;
+        questionsDiv.onchange = scheduleQuizAutosave;
+        startQuizTimer(started.remaining_seconds);
     } catch (error) {
         console.error('Error loading quiz:', error);
     }
 }
 
-async function submitQuiz() {
+// Autosave sends the full answer set this long after the last change
+const QUIZ_AUTOSAVE_DELAY = 2000;
+let quizAutosaveTimer = null;
+
+function scheduleQuizAutosave() {
+    if (!currentQuiz) return;
+    const quizId = currentQuiz.id;
+    clearTimeout(quizAutosaveTimer);
+    quizAutosaveTimer = setTimeout(() => {
+        quizAutosaveTimer = null;
+        quizAPI.saveDraft(quizId, collectQuizAnswers())
+            .catch(error => console.error('Error autosaving quiz:', error));
+    }, QUIZ_AUTOSAVE_DELAY);
+}
+
+function stopQuizAutosave() {
+    clearTimeout(quizAutosaveTimer);
+    quizAutosaveTimer = null;
+    const questionsDiv = document.getElementById('quiz-questions');
+    questionsDiv.oninput = null;
+    questionsDiv.onchange = null;
+}
+
+let quizTimerInterval = null;
+
+function startQuizTimer(remainingSeconds) {
+    const timerEl = document.getElementById('quiz-timer');
+    clearInterval(quizTimerInterval);
+    quizTimerInterval = null;
+    if (remainingSeconds === null || remainingSeconds === undefined) {
+        timerEl.style.display = 'none';
+        return;
+    }
+    
+    const endsAt = Date.now() + remainingSeconds * 1000;
+    const render = () => {
+        const left = Math.max(0, Math.round((endsAt - Date.now()) / 1000));
+        timerEl.textContent = `Time left: ${Math.floor(left / 60)}:${String(left % 60).padStart(2, '0')}`;
+        if (left === 0) quizTimeUp();
+    };
+    timerEl.style.display = 'block';
+    render();
+    if (remainingSeconds > 0) quizTimerInterval = setInterval(render, 1000);
+}
+
+function stopQuizTimer() {
+    clearInterval(quizTimerInterval);
+    quizTimerInterval = null;
+    document.getElementById('quiz-timer').style.display = 'none';
+}
+
+// The server submits the saved answers once time is up, so the page only
+// saves them one last time instead of every student submitting at once
+async function quizTimeUp() {
     if (!currentQuiz) return;
+    const quizId = currentQuiz.id;
+    clearInterval(quizTimerInterval);
+    quizTimerInterval = null;
+    stopQuizAutosave();
+    
+    document.querySelectorAll('#quiz-questions input').forEach(input => { input.disabled = true; });
+    const submitBtn = document.querySelector('#quiz-taking button[onclick="submitQuiz()"]');
+    if (submitBtn) submitBtn.style.display = 'none';
+    document.getElementById('quiz-timer').textContent =
+        'Time is up. Your saved answers will be submitted automatically; the result will appear in your notifications.';
     
+    try {
+        await quizAPI.saveDraft(quizId, collectQuizAnswers());
+    } catch (error) {
+        console.error('Error saving final quiz answers:', error);
+    }
+}
+
+function restoreQuizDraft(draft) {
+    try {
+        if (!draft) return;
+        
+        const questionsDiv = document.getElementById('quiz-questions');
+        Object.entries(draft.answers || {}).forEach(([qId, answer]) => {
+            if (typeof answer === 'string') {
+                const radio = questionsDiv.querySelector(`input[name="q${qId}"][value="${CSS.escape(answer)}"]`);
+                if (radio) radio.checked = true;
+            } else if (answer && typeof answer === 'object') {
+                Object.entries(answer).forEach(([blankId, value]) => {
+                    const input = questionsDiv.querySelector(`input[name="q${qId}_${blankId}"]`);
+                    if (input) input.value = value;
+                });
+            }
+        });
+    } catch (error) {
+        console.error('Error restoring quiz draft:', error);
+    }
+}
+
+function collectQuizAnswers() {
     const answers = {};
     const questionElements = document.querySelectorAll('.quiz-question');
     
@@ -2780,9 +2945,21 @@ async function submitQuiz() {
             });
         }
     });
+    return answers;
+}
+
+async function submitQuiz() {
+    if (!currentQuiz) return;
+    
+    const answers = collectQuizAnswers();
     
     try {
         const result = await quizAPI.attemptQuiz(currentQuiz.id, answers);
+        stopQuizAutosave();
+        stopQuizTimer();
+        if (result.auto_submitted) {
+            alert('Time was up, so your last saved answers were submitted.');
+        }
         
         // Display results with ✅/❌
         displayQuizResults(result, currentQuiz);
@@ -2885,11 +3062,23 @@ async function loadCompanies() {
     try {
         const data = await companyAPI.listCompanies();
         companies = data.companies;
+        companiesCursor = data.next_cursor;
     } catch (error) {
         console.error('Error loading companies:', error);
     }
 }
 
+async function loadMoreCompanies() {
+    try {
+        const data = await companyAPI.listCompanies(companiesCursor);
+        companies.push(...data.companies);
+        companiesCursor = data.next_cursor;
+    } catch (error) {
+        console.error('Error loading more companies:', error);
+    }
+    renderCompanies();
+}
+
 let companyDeleteMode = false;
 let selectedCompanyIds = new Set();
 
@@ -2934,7 +3123,7 @@ function renderCompanies() {
                 <p>${c.description || ''}</p>
             </div>
         </div>
-    `).join('');
+    `).join('') + loadMoreButton(companiesCursor, 'loadMoreCompanies()');
 }
 
 async function openCompanyQuestions(companyId) {
@@ -2943,26 +3132,9 @@ async function openCompanyQuestions(companyId) {
         showCodePractice();
         
         // Filter questions by company
-        const data = await studentAPI.getQuestions({ type: 'coding', company_id: companyId, per_page: 200 });
-        const submissionsRes = await codingAPI.getSubmissions();
-        
-        const solvedIds = new Set(
-            (submissionsRes.submissions || [])
-                .filter(s => s.status === 'accepted')
-                .map(s => s.question_id)
-        );
-        
-        codingQuestions = data.questions.map(q => ({
-            ...q,
-            status: solvedIds.has(q.id) ? 'solved' : 'unsolved',
-            company_name: q.company_name || 'General',
-            tags: q.tags || []
-        }));
-        
-        // Set filter to show only this company's questions
         codingFilter = 'all';
         codingSearch = '';
-        renderCodingQuestions();
+        await loadCodingPage({ type: 'coding', company_id: companyId });
         
         // Show success message
         const company = companies.find(c => c.id === companyId);
@@ -3228,19 +3400,25 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 });
 
-async function loadCompanyQuestions(companyId) {
+let companyQuestions = [];
+let companyQuestionsCursor = null;
+
+async function loadCompanyQuestions(companyId, cursor = null) {
     try {
-        const data = await studentAPI.getQuestions({ company_id: companyId });
+        const data = await studentAPI.getQuestions({ company_id: companyId }, cursor);
+        companyQuestions = cursor ? companyQuestions.concat(data.questions) : data.questions;
+        companyQuestionsCursor = data.next_cursor;
         const questionsDiv = document.getElementById('company-questions');
         
         questionsDiv.innerHTML = `
             <h3>Questions</h3>
-            ${data.questions.map(q => `
+            ${companyQuestions.map(q => `
                 <div class="question-item" onclick="loadQuestion(${q.id})">
                     <h4>${q.title}</h4>
                     <p>${q.type} - ${q.difficulty}</p>
                 </div>
             `).join('')}
+            ${loadMoreButton(companyQuestionsCursor, `loadCompanyQuestions(${companyId}, companyQuestionsCursor)`)}
         `;
     } catch (error) {
         console.error('Error loading company questions:', error);
@@ -3248,18 +3426,23 @@ async function loadCompanyQuestions(companyId) {
 }
 
 // Resources Page
-async function loadResourcesPage() {
+let resources = [];
+let resourcesCursor = null;
+
+async function loadResourcesPage(cursor = null) {
     try {
-        const data = await resourcesAPI.getResources();
+        const data = await resourcesAPI.getResources({}, cursor);
+        resources = cursor ? resources.concat(data.resources) : data.resources;
+        resourcesCursor = data.next_cursor;
         const resourcesDiv = document.getElementById('resources-list');
         
         
-        if (!data.resources || data.resources.length === 0) {
+        if (!resources || resources.length === 0) {
             resourcesDiv.innerHTML = '<p style="text-align: center; color: rgba(242, 244, 255, 0.6); padding: 40px;">No resources uploaded yet.</p>';
             return;
         }
         
-        resourcesDiv.innerHTML = data.resources.map(r => {
+        resourcesDiv.innerHTML = resources.map(r => {
             // Check if resource has a file (file_path exists and is not empty/null)
             const hasFile = r.file_path && r.file_path.trim() !== '' && r.file_path !== null && r.file_path !== 'None';
             const uploadDate = r.created_at ? new Date(r.created_at).toLocaleDateString('en-US', { 
@@ -3289,7 +3472,7 @@ async function loadResourcesPage() {
                 <button onclick="deleteResource(${r.id})" class="btn btn-sm btn-delete">🗑️ Delete</button>
             </div>
         `;
-        }).join('');
+        }).join('') + loadMoreButton(resourcesCursor, 'loadResourcesPage(resourcesCursor)');
     } catch (error) {
         console.error('Error loading resources:', error);
         const resourcesDiv = document.getElementById('resources-list');
@@ -3958,6 +4141,44 @@ async function submitAnswer() {
 
 // Notifications
 let notificationDropdownOpen = false;
+let eventStream = null;
+
+// Open the push channel once per session; events replace badge polling
+function startEventStream() {
+    if (eventStream || !authToken || !currentUser || typeof EventSource === 'undefined') {
+        return;
+    }
+    
+    eventStream = streamAPI.open();
+    
+    eventStream.addEventListener('notification', () => {
+        loadNotificationBadge();
+        if (notificationDropdownOpen) {
+            loadNotifications();
+        }
+    });
+    
+    // Verdicts and rank changes are re-dispatched for whichever page is showing
+    ['submission', 'rank'].forEach(name => {
+        eventStream.addEventListener(name, (event) => {
+            window.dispatchEvent(new CustomEvent(`stream:${name}`, { detail: JSON.parse(event.data) }));
+        });
+    });
+    
+    eventStream.onerror = () => {
+        // A closed stream is reopened by the browser; a rejected token is not
+        if (eventStream && eventStream.readyState === EventSource.CLOSED) {
+            closeEventStream();
+        }
+    };
+}
+
+function closeEventStream() {
+    if (eventStream) {
+        eventStream.close();
+        eventStream = null;
+    }
+}
 
 // Load notification badge count
 async function loadNotificationBadge() {
@@ -3967,6 +4188,8 @@ async function loadNotificationBadge() {
             return;
         }
         
+        startEventStream();
+        
         const data = await notificationsAPI.getUnreadCount();
         const badge = document.getElementById('notification-badge');
         if (!badge) return;
@@ -4013,10 +4236,10 @@ async function loadNotifications() {
         notificationList.innerHTML = data.notifications.map(n => {
             const date = n.created_at ? new Date(n.created_at).toLocaleString() : '';
             const unreadClass = !n.is_read ? 'unread' : '';
-            const linkAttr = n.link ? `onclick="window.location.href='${n.link}'; markNotificationRead(${n.id});"` : '';
+            const linkAttr = n.link ? `onclick="window.location.href='${n.link}'; markNotificationRead(${n.id}, ${!!n.broadcast});"` : '';
             
             return `
-                <div class="notification-item ${unreadClass}" ${linkAttr || `onclick="markNotificationRead(${n.id})"`}>
+                <div class="notification-item ${unreadClass}" ${linkAttr || `onclick="markNotificationRead(${n.id}, ${!!n.broadcast})"`}>
                     <div class="notification-content">
                         <div class="notification-title">${n.title}</div>
                         <div class="notification-message">${n.message}</div>
@@ -4053,13 +4276,13 @@ function toggleNotificationDropdown() {
 }
 
 // Mark notification as read
-async function markNotificationRead(notificationId) {
+async function markNotificationRead(notificationId, isBroadcast = false) {
     try {
         if (!authToken || !currentUser) {
             console.warn('User not authenticated');
             return;
         }
-        await notificationsAPI.markAsRead(notificationId);
+        await notificationsAPI.markAsRead(notificationId, isBroadcast);
         // Reload notifications and badge
         await loadNotifications();
         await loadNotificationBadge();